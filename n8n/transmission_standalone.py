@@ -7,18 +7,95 @@ This script is completely independent and doesn't require any repository depende
 
 import argparse
 import base64
+import copy
+import hashlib
+import http.client
 import json
 import os
+import stat
 import sys
-from typing import Any, Dict, List, Optional
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Dict, Iterable, List, Optional, Tuple, Union
 
 # Standard library imports only - no external dependencies
-try:
-    from urllib.error import HTTPError, URLError
-    from urllib.request import Request, urlopen
-except ImportError:
-    print("❌ Error: urllib module not available")
-    sys.exit(1)
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+# Maximum number of torrent ids or hashes sent in a single torrent-get
+ID_CHUNK_SIZE = 500
+
+
+def _uid() -> Optional[int]:
+    """Return the user id, None on platforms without one (Windows)"""
+    return os.getuid() if hasattr(os, "getuid") else None
+
+
+def session_cache_path(base_url: str, username: Optional[str]) -> str:
+    """
+    Return the session id cache file of an endpoint and user
+
+    The layout matches the transmission_pusher package, so both share ids.
+    """
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    uid = _uid()
+    if runtime_dir:
+        directory = os.path.join(runtime_dir, "transmission-pusher")
+    elif uid is None:
+        # The temporary directory is already per user on Windows
+        directory = os.path.join(tempfile.gettempdir(), "transmission-pusher")
+    else:
+        directory = os.path.join(tempfile.gettempdir(), f"transmission-pusher-{uid}")
+    key = hashlib.sha256(f"{username or ''}\n{base_url}".encode()).hexdigest()[:32]
+    return os.path.join(directory, f"{key}.session")
+
+
+def _private_directory(directory: str) -> bool:
+    """Check a directory belongs to this user and is closed to others"""
+    info = os.stat(directory)
+    uid = _uid()
+    if uid is None:
+        return stat.S_ISDIR(info.st_mode)
+    return stat.S_ISDIR(info.st_mode) and info.st_uid == uid and not info.st_mode & 0o077
+
+
+def load_cached_session_id(base_url: str, username: Optional[str]) -> Optional[str]:
+    """Read a cached session id, returning None if there is none or it can't be read"""
+    path = session_cache_path(base_url, username)
+    try:
+        if not _private_directory(os.path.dirname(path)):
+            return None
+        with open(path, encoding="ascii") as f:
+            return f.read().strip() or None
+    except (OSError, ValueError):
+        return None
+
+
+def store_session_id(base_url: str, username: Optional[str], session_id: str) -> None:
+    """Cache a session id in a private directory, replacing the file atomically"""
+    path = session_cache_path(base_url, username)
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        if not _private_directory(directory):
+            return
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".session-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="ascii") as f:
+                f.write(session_id)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except (OSError, ValueError):
+        # The cache only saves a handshake; never fail a request over it
+        pass
+
+
+# Errors meaning the daemon closed a kept-alive connection while it was idle
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
 
 
 class TransmissionClient:
@@ -29,6 +106,10 @@ class TransmissionClient:
         username: Optional[str] = None,
         password: Optional[str] = None,
         base_url: Optional[str] = None,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 30.0,
+        deadline: Optional[float] = None,
+        session_cache: bool = False,
     ) -> None:
         """
         Initialize Transmission client
@@ -39,6 +120,14 @@ class TransmissionClient:
             username (str): Transmission username (optional)
             password (str): Transmission password (optional)
             base_url (str): Complete base URL (optional, overrides host/port)
+            connect_timeout (float): Seconds to wait for a connection (default: 10.0)
+            read_timeout (float): Seconds to wait for each read from the
+                daemon (default: 30.0)
+            deadline (float): Seconds a whole request may take, including the
+                session-id retry (optional)
+            session_cache (bool): Start from the session id cached by an
+                earlier run instead of a handshake, and cache new ids
+                (default: False)
         """
         if base_url:
             # If a complete base URL is provided, use it
@@ -51,90 +140,194 @@ class TransmissionClient:
         self.username = username
         self.password = password
         self.session_id: Optional[str] = None
+        self.session_cache = session_cache
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+
+        url = urlsplit(self.base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"Unsupported Transmission URL: {self.base_url}")
+        self._scheme = url.scheme
+        self._host = url.hostname
+        self._port = url.port
+        self._path = url.path + (f"?{url.query}" if url.query else "")
+        self._connection: Optional[http.client.HTTPConnection] = None
+
+        # Headers sent with every request; the session id is added per request
+        self._headers = {"Content-Type": "application/json"}
+        if username and password:
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            self._headers["Authorization"] = f"Basic {credentials}"
+
+        # Get session-id on first call, unless an earlier run left one; a
+        # stale one is replaced by the 409 answer to the first request
+        if session_cache:
+            self.session_id = load_cached_session_id(self.base_url, username)
+        if self.session_id is None:
+            self._get_session_id()
+
+    def __enter__(self) -> "TransmissionClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def clone(self) -> "TransmissionClient":
+        """
+        Return a client for the same daemon with its own connection
+
+        The clone starts with this client's session id, so it needs no
+        handshake. Use one clone per thread: a connection can't be shared.
+
+        Returns:
+            TransmissionClient: New client
+        """
+        other = copy.copy(self)
+        other._connection = None
+        return other
+
+    def close(self) -> None:
+        """Close the kept-alive connection; the next request opens a new one"""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _connect(self) -> http.client.HTTPConnection:
+        """Create a connection to the daemon (it is opened by the first request)"""
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self.connect_timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self.connect_timeout)
+
+    def _request(
+        self, method: str, body: Optional[bytes], expires: Optional[float]
+    ) -> Tuple[int, http.client.HTTPMessage, bytes]:
+        """
+        Send a request over the kept-alive connection, opening it if needed
+
+        If the daemon closed the connection while it sat idle, the request is
+        sent once more over a new connection.
+
+        Args:
+            method (str): HTTP method
+            body (bytes): Request body (optional)
+            expires (float): Monotonic time the request must finish by (optional)
+
+        Returns:
+            tuple: Status, headers and body of the response
+        """
+        headers = dict(self._headers)
+        if self.session_id:
+            headers["X-Transmission-Session-Id"] = self.session_id
+
+        while True:
+            if self._connection is None:
+                self._connection = self._connect()
+            connection = self._connection
+            reused = connection.sock is not None
+
+            connect_timeout, read_timeout = self._timeout(expires)
+
+            try:
+                # Connect under the connect timeout, then wait for the answer under the read timeout
+                if connection.sock is None:
+                    connection.timeout = connect_timeout
+                    connection.connect()
+                connection.sock.settimeout(read_timeout)
+                connection.request(method, self._path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except STALE_CONNECTION_ERRORS:
+                self.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                # Don't reuse a connection left in the middle of a request
+                self.close()
+                raise
+            return response.status, response.headers, data
 
-        # Get session-id on first call
-        self._get_session_id()
+    def _check_status(self, status: int, headers: http.client.HTTPMessage) -> None:
+        """Raise HTTPError for an error status, as urlopen would"""
+        if status >= 400:
+            raise HTTPError(self.base_url, status, http.client.responses.get(status, ""), headers, None)
 
     def _get_session_id(self) -> None:
         """Gets the session-id required for API calls"""
         try:
-            request = Request(self.base_url)
-            if self.username and self.password:
-                # Basic authentication
-                import base64
-
-                credentials = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
-                request.add_header("Authorization", f"Basic {credentials}")
-
-            urlopen(request)
-            # If we get here, no session-id is needed for this request
-        except HTTPError as e:
-            if e.code == 409:  # Conflict - session-id required
-                session_id = e.headers.get("X-Transmission-Session-Id")
-                if session_id is not None:
-                    self.session_id = session_id
-            else:
-                raise
-        except URLError as e:
+            status, headers, _ = self._request("GET", None, self._expiry())
+        except (OSError, http.client.HTTPException) as e:
             print(f"❌ Error connecting to Transmission: {e}")
             raise
+
+        if status == 409:  # Conflict - session-id required
+            session_id = headers.get("X-Transmission-Session-Id")
+            if session_id is not None:
+                self._set_session_id(session_id)
+            return None
+        # If we get here, no session-id is needed for this request
+        self._check_status(status, headers)
         return None
 
-    def _make_request(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _set_session_id(self, session_id: str) -> None:
+        """Use a new session id, caching it if enabled"""
+        self.session_id = session_id
+        if self.session_cache:
+            store_session_id(self.base_url, self.username, session_id)
+
+    def _expiry(self) -> Optional[float]:
+        """Return the monotonic time a request started now must finish by"""
+        return None if self.deadline is None else time.monotonic() + self.deadline
+
+    def _timeout(self, expires: Optional[float]) -> Tuple[float, float]:
+        """Return the (connect, read) timeout of a request, clipped to its deadline"""
+        if expires is None:
+            return self.connect_timeout, self.read_timeout
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Deadline of {self.deadline}s exceeded calling {self.base_url}")
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def _make_request(self, data: Dict[str, Any], expires: Optional[float] = None) -> Dict[str, Any]:
         """
         Make a request to the Transmission API
 
         Args:
             data (dict): JSON data to send
+            expires (float): Monotonic time the request must finish by
+                (default: now plus the client's deadline)
 
         Returns:
             dict: API response
         """
+        if expires is None:
+            expires = self._expiry()
         try:
-            # Prepare the request
-            request = Request(
-                self.base_url,
-                data=json.dumps(data).encode("utf-8"),
-                headers={
-                    "Content-Type": "application/json",
-                },
-            )
-
-            # Add session ID if we have one
-            if self.session_id:
-                request.add_header("X-Transmission-Session-Id", self.session_id)
-
-            # Add authentication if provided
-            if self.username and self.password:
-                import base64
-
-                credentials = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
-                request.add_header("Authorization", f"Basic {credentials}")
-
-            # Make the request
-            response = urlopen(request)
-            response_data = response.read().decode("utf-8")
-            result: Dict[str, Any] = json.loads(response_data)
-            return result
-
-        except HTTPError as e:
-            if e.code == 409:  # Conflict - session-id required
-                session_id = e.headers.get("X-Transmission-Session-Id")
-                if session_id is not None:
-                    self.session_id = session_id
-                    # Retry the request with the new session ID
-                    return self._make_request(data)
-            raise
-        except URLError as e:
+            status, headers, response_data = self._request("POST", json.dumps(data).encode("utf-8"), expires)
+        except (OSError, http.client.HTTPException) as e:
             print(f"❌ Error communicating with Transmission: {e}")
             raise
 
-    def add_torrent_file(self, torrent_file_path: str) -> Dict[str, Any]:
+        if status == 409:  # Conflict - session-id required
+            session_id = headers.get("X-Transmission-Session-Id")
+            if session_id is not None:
+                self._set_session_id(session_id)
+                # Retry the request with the new session ID
+                return self._make_request(data, expires)
+        self._check_status(status, headers)
+
+        result: Dict[str, Any] = json.loads(response_data.decode("utf-8"))
+        return result
+
+    def add_torrent_file(self, torrent_file_path: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Add a .torrent file to Transmission
 
         Args:
             torrent_file_path (str): Path to the .torrent file
+            options (dict): Further torrent-add arguments, e.g.
+                {"download-dir": "/data", "paused": true} (optional)
 
         Returns:
             dict: API response
@@ -149,7 +342,7 @@ class TransmissionClient:
         # Prepare data for the API
         data = {
             "method": "torrent-add",
-            "arguments": {"metainfo": torrent_data},
+            "arguments": dict(options or {}, metainfo=torrent_data),
         }
 
         try:
@@ -172,19 +365,20 @@ class TransmissionClient:
             print(f"❌ Error communicating with Transmission: {e}")
             raise
 
-    def add_torrent_url(self, torrent_url: str) -> Dict[str, Any]:
+    def add_torrent_url(self, torrent_url: str, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Add a torrent from a URL
 
         Args:
             torrent_url (str): URL of the .torrent file
+            options (dict): Further torrent-add arguments (optional)
 
         Returns:
             dict: API response
         """
         data = {
             "method": "torrent-add",
-            "arguments": {"filename": torrent_url},
+            "arguments": dict(options or {}, filename=torrent_url),
         }
 
         try:
@@ -205,37 +399,165 @@ class TransmissionClient:
             print(f"❌ Error communicating with Transmission: {e}")
             raise
 
-    def get_torrents(self) -> List[Dict[str, Any]]:
+    def get_torrents(self, ids: Union[int, str, Iterable[Union[int, str]], None] = None) -> List[Dict[str, Any]]:
         """
         Get the list of torrents
 
+        Args:
+            ids (list): Only return these torrents, given by id or hash string,
+                or a single id or hash. Long lists are split into several
+                requests (optional)
+
         Returns:
             list of dicts: List of torrents
         """
-        data = {
-            "method": "torrent-get",
-            "arguments": {
-                "fields": [
-                    "id",
-                    "name",
-                    "status",
-                    "percentDone",
-                    "downloadDir",
-                ]
-            },
+        arguments: Dict[str, Any] = {
+            "fields": [
+                "id",
+                "name",
+                "status",
+                "percentDone",
+                "downloadDir",
+            ]
         }
 
         try:
-            result = self._make_request(data)
-            torrents = result.get("arguments", {}).get("torrents", [])
-            if not isinstance(torrents, list):
-                return []
-            return [t for t in torrents if isinstance(t, dict)]
+            if ids is None:
+                return self._torrent_get(arguments)
+
+            id_list = [ids] if isinstance(ids, (int, str)) else list(ids)
+            torrents: List[Dict[str, Any]] = []
+            for start in range(0, len(id_list), ID_CHUNK_SIZE):
+                chunk_arguments = dict(arguments, ids=id_list[start : start + ID_CHUNK_SIZE])
+                torrents.extend(self._torrent_get(chunk_arguments))
+            return torrents
 
         except Exception as e:
             print(f"❌ Error getting torrents: {e}")
             raise
 
+    def _torrent_get(self, arguments: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Perform a torrent-get call
+
+        Args:
+            arguments (dict): torrent-get request arguments
+
+        Returns:
+            list of dicts: Torrents in the response
+        """
+        result = self._make_request({"method": "torrent-get", "arguments": arguments})
+        torrents = result.get("arguments", {}).get("torrents", [])
+        if not isinstance(torrents, list):
+            return []
+        return [t for t in torrents if isinstance(t, dict)]
+
+
+def run_job(client: TransmissionClient, job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run one batch job
+
+    Args:
+        client (TransmissionClient): Client to run it with
+        job (dict): {"action": "add-file", "path": ...}, {"action": "add-url",
+            "url": ...} or {"action": "list", "ids": [...] or one id}; adds take
+            torrent-add arguments in "options"
+
+    Returns:
+        dict: "ok", and "result" or "error"
+    """
+    action = job.get("action")
+    options = job.get("options")
+    if action in ("add-file", "add-url"):
+        field = "path" if action == "add-file" else "url"
+        if field not in job:
+            raise ValueError(f"job is missing {field!r}")
+        if not isinstance(job[field], str):
+            raise ValueError(f"job {field!r} must be a string")
+        if action == "add-file":
+            response = client.add_torrent_file(job["path"], options)
+        else:
+            response = client.add_torrent_url(job["url"], options)
+        if response.get("result") != "success":
+            return {"ok": False, "error": response.get("result")}
+        arguments = response.get("arguments", {})
+        if "torrent-duplicate" in arguments:
+            return {"ok": True, "status": "duplicate", "result": arguments["torrent-duplicate"]}
+        return {"ok": True, "status": "added", "result": arguments.get("torrent-added", {})}
+    if action == "list":
+        return {"ok": True, "result": client.get_torrents(job.get("ids"))}
+    raise ValueError(f"Unknown action: {action!r}")
+
+
+def run_batch(client: TransmissionClient, lines: Iterable[str], output: IO[str], jobs: int = 1) -> int:
+    """
+    Run newline-delimited JSON jobs, writing one JSON result line per job
+
+    Results are written as each job finishes, so with several jobs they may
+    come out of order; each carries the job's line number and its "id" if
+    it had one. Lines are read as workers free up, at most 2 * jobs ahead,
+    so a long stream is not buffered in memory.
+
+    Args:
+        client (TransmissionClient): Connected client; further workers use clones of it
+        lines (iterable): Job lines, e.g. sys.stdin
+        output (file): Where to write the result lines
+        jobs (int): Number of jobs run at once (default: 1)
+
+    Returns:
+        int: 0 if every job succeeded, 1 otherwise
+    """
+    jobs = max(1, jobs)
+    local = threading.local()
+    clients: List[TransmissionClient] = []
+    lock = threading.Lock()
+    # Jobs read but not finished yet
+    slots = threading.BoundedSemaphore(jobs * 2)
+    failed = False
+
+    def worker_client() -> TransmissionClient:
+        if not hasattr(local, "client"):
+            # The first worker takes the connected client, the others clone it
+            with lock:
+                local.client = client.clone() if clients else client
+                clients.append(local.client)
+        worker: TransmissionClient = local.client
+        return worker
+
+    def run(number: int, line: str) -> None:
+        nonlocal failed
+        entry: Dict[str, Any] = {"line": number}
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("Job must be a JSON object")
+            if "id" in job:
+                entry["id"] = job["id"]
+            entry.update(run_job(worker_client(), job))
+        except Exception as e:
+            entry.update(ok=False, error=str(e))
+        with lock:
+            failed = failed or not entry["ok"]
+            output.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            output.flush()
+
+    def run_in_slot(number: int, line: str) -> None:
+        try:
+            run(number, line)
+        finally:
+            slots.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            for number, line in enumerate(lines, 1):
+                if line.strip():
+                    slots.acquire()
+                    executor.submit(run_in_slot, number, line)
+    finally:
+        for worker in clients:
+            worker.close()
+    return 1 if failed else 0
+
 
 def load_env_file(env_file: str = ".env") -> None:
     """
@@ -278,10 +600,42 @@ def main() -> int:
     parser.add_argument("--password", help="Transmission password")
     parser.add_argument("--folder", help="Process all .torrent files in a folder")
     parser.add_argument("--list", action="store_true", help="List existing torrents")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Read JSON jobs from stdin, one per line, and write one JSON result line per job",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="Batch jobs run at once (default: 1)")
+    parser.add_argument(
+        "--session-cache",
+        action="store_true",
+        default=None,
+        help="Reuse the session id of earlier runs (default: $TRANSMISSION_SESSION_CACHE)",
+    )
     parser.add_argument("--env-file", default=".env", help="Path to .env file (default: .env)")
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        help="Seconds to wait for a connection (default: $TRANSMISSION_CONNECT_TIMEOUT or 10)",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        help="Seconds to wait for each read (default: $TRANSMISSION_READ_TIMEOUT or 30)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help="Seconds a single request may take in total (default: $TRANSMISSION_DEADLINE or none)",
+    )
 
     args = parser.parse_args()
 
+    results = sys.stdout
+    if args.batch:
+        # stdout carries only the JSON result lines; messages go to stderr
+        sys.stdout = sys.stderr
+
     try:
         # Load environment variables
         load_env_file(args.env_file)
@@ -290,6 +644,16 @@ def main() -> int:
         username = args.username or os.getenv("TRANSMISSION_USERNAME")
         password = args.password or os.getenv("TRANSMISSION_PASSWORD")
         base_url = args.base_url or os.getenv("TRANSMISSION_URL")
+        connect_timeout = args.connect_timeout
+        if connect_timeout is None:
+            connect_timeout = float(os.getenv("TRANSMISSION_CONNECT_TIMEOUT") or 10)
+        read_timeout = args.read_timeout
+        if read_timeout is None:
+            read_timeout = float(os.getenv("TRANSMISSION_READ_TIMEOUT") or 30)
+        deadline = args.deadline if args.deadline is not None else os.getenv("TRANSMISSION_DEADLINE")
+        session_cache = args.session_cache
+        if session_cache is None:
+            session_cache = os.getenv("TRANSMISSION_SESSION_CACHE", "").lower() in ("1", "true", "yes")
 
         # Create Transmission client
         client = TransmissionClient(
@@ -298,9 +662,15 @@ def main() -> int:
             username=username,
             password=password,
             base_url=base_url,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            deadline=float(deadline) if deadline else None,
+            session_cache=session_cache,
         )
 
-        if args.list:
+        if args.batch:
+            return run_batch(client, sys.stdin, results, args.jobs)
+        elif args.list:
             print("📋 Listing existing torrents:")
             torrents = client.get_torrents()
             for torrent in torrents:
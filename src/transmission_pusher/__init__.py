@@ -9,14 +9,61 @@ Example:
     >>> from transmission_pusher import TransmissionClient
     >>> client = TransmissionClient(host='localhost', port=9091)
     >>> client.add_torrent_file('/path/to/file.torrent')
+
+The client reports through the "transmission_pusher" logger and stays silent
+unless the application configures logging.
 """
 
-from .diagnose_connection import check_rpc_endpoint
-from .diagnose_connection import main as diagnose_connection
-from .transmission_client import TransmissionClient
+import importlib
+import logging
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .async_client import AsyncTransmissionClient
+    from .diagnose_connection import check_rpc_endpoint
+    from .diagnose_connection import main as diagnose_connection
+    from .limiter import AdaptiveLimiter
+    from .session_cache import SessionIdCache
+    from .sharding import ShardedTransmissionClient
+    from .transmission_client import TransmissionClient
+
+logging.getLogger(__name__).addHandler(logging.NullHandler())
+
+# Public names and the (module, attribute) they come from. They are imported
+# on first access, so running one entry point doesn't import the others.
+_EXPORTS = {
+    "AdaptiveLimiter": (".limiter", "AdaptiveLimiter"),
+    "AsyncTransmissionClient": (".async_client", "AsyncTransmissionClient"),
+    "SessionIdCache": (".session_cache", "SessionIdCache"),
+    "ShardedTransmissionClient": (".sharding", "ShardedTransmissionClient"),
+    "TransmissionClient": (".transmission_client", "TransmissionClient"),
+    "check_rpc_endpoint": (".diagnose_connection", "check_rpc_endpoint"),
+    "diagnose_connection": (".diagnose_connection", "main"),
+}
 
 __version__ = "1.0.0"
 __author__ = "Transmission Pusher Team"
 __email__ = "contact@transmission-pusher.com"
 
-__all__ = ["TransmissionClient", "check_rpc_endpoint", "diagnose_connection"]
+__all__ = [
+    "AdaptiveLimiter",
+    "AsyncTransmissionClient",
+    "SessionIdCache",
+    "ShardedTransmissionClient",
+    "TransmissionClient",
+    "check_rpc_endpoint",
+    "diagnose_connection",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _EXPORTS[name]
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Asyncio client for Transmission's RPC API
+Speaks HTTP/1.1 over keep-alive connections using only the standard library
+"""
+
+import asyncio
+import base64
+import json
+import os
+import ssl
+from typing import Any, Iterable
+from urllib.parse import urlsplit
+
+from .fields import resolve_fields
+from .session_cache import SessionIdCache
+
+SESSION_ID_HEADER = "X-Transmission-Session-Id"
+
+
+class TransmissionHTTPError(Exception):
+    """Raised when Transmission answers with an unexpected HTTP status"""
+
+    def __init__(self, status: int, reason: str) -> None:
+        super().__init__(f"HTTP {status}: {reason}")
+        self.status = status
+        self.reason = reason
+
+
+class _Response:
+    """A fully read HTTP response"""
+
+    def __init__(self, status: int, reason: str, headers: dict[str, str], body: bytes, keep_alive: bool) -> None:
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+        self.keep_alive = keep_alive
+
+
+class _Connection:
+    """A single keep-alive HTTP/1.1 connection"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, method: str, target: str, headers: dict[str, str], body: bytes = b"") -> _Response:
+        """Send a request and read the complete response"""
+        lines = [f"{method} {target} HTTP/1.1"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b"\r\n")
+        _, status, *reason = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+
+        response_headers: dict[str, str] = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            response_body = await self._read_chunked()
+        elif "content-length" in response_headers:
+            response_body = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            response_body = await self.reader.read()
+            keep_alive = False
+
+        return _Response(int(status), reason[0] if reason else "", response_headers, response_body, keep_alive)
+
+    async def _read_chunked(self) -> bytes:
+        """Read a chunked transfer-encoded body"""
+        chunks: list[bytes] = []
+        while True:
+            size_line = await self.reader.readuntil(b"\r\n")
+            size = int(size_line.split(b";", 1)[0], 16)
+            if size == 0:
+                # Skip optional trailers up to the terminating blank line
+                while await self.reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b"".join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    def close(self) -> None:
+        """Close the underlying transport"""
+        self.writer.close()
+
+
+class AsyncTransmissionClient:
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 9091,
+        username: str | None = None,
+        password: str | None = None,
+        base_url: str | None = None,
+        max_connections: int = 10,
+        session_cache: SessionIdCache | None = None,
+    ) -> None:
+        """
+        Initialize asyncio Transmission client
+
+        Connections are opened on demand, kept alive between requests and
+        shared by all coroutines using the client. At most max_connections
+        requests are in flight at any time.
+
+        Args:
+            host (str): Transmission host (default: localhost)
+            port (int): Transmission port (default: 9091)
+            username (str): Transmission username (optional)
+            password (str): Transmission password (optional)
+            base_url (str): Complete base URL (optional, overrides host/port)
+            max_connections (int): Maximum number of concurrent requests (default: 10)
+            session_cache (SessionIdCache): Starts from the session-id last
+                negotiated by any process and stores new ones (optional)
+        """
+        if base_url:
+            # If a complete base URL is provided, use it
+            if base_url.endswith("/"):
+                base_url = base_url[:-1]
+            self.base_url = f"{base_url}/rpc"
+        else:
+            self.base_url = f"http://{host}:{port}/transmission/rpc"
+
+        url = urlsplit(self.base_url)
+        self._tls = url.scheme == "https"
+        self._host = url.hostname or "localhost"
+        self._port = url.port or (443 if self._tls else 80)
+        self._target = url.path or "/"
+        if url.query:
+            self._target += f"?{url.query}"
+
+        self._headers = {
+            "Host": url.netloc,
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        }
+        if username and password:
+            credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+            self._headers["Authorization"] = f"Basic {credentials}"
+
+        self.session_cache = session_cache
+        self._username = username
+        self.session_id = session_cache.load(self.base_url, username) if session_cache is not None else None
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._idle: list[_Connection] = []
+
+    async def __aenter__(self) -> "AsyncTransmissionClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close all idle connections"""
+        while self._idle:
+            self._idle.pop().close()
+
+    async def _open(self) -> _Connection:
+        """Open a new connection to the daemon"""
+        reader, writer = await asyncio.open_connection(
+            self._host, self._port, ssl=ssl.create_default_context() if self._tls else None
+        )
+        return _Connection(reader, writer)
+
+    async def _send(self, method: str, body: bytes = b"") -> _Response:
+        """Send one request, reusing an idle connection when possible"""
+        headers = dict(self._headers)
+        if self.session_id:
+            headers[SESSION_ID_HEADER] = self.session_id
+
+        while self._idle:
+            connection = self._idle.pop()
+            try:
+                response = await connection.request(method, self._target, headers, body)
+            except (OSError, asyncio.IncompleteReadError):
+                # The daemon closed the idle connection; try the next one
+                connection.close()
+                continue
+            except BaseException:
+                connection.close()
+                raise
+            self._release(connection, response)
+            return response
+
+        connection = await self._open()
+        try:
+            response = await connection.request(method, self._target, headers, body)
+        except BaseException:
+            connection.close()
+            raise
+        self._release(connection, response)
+        return response
+
+    def _release(self, connection: _Connection, response: _Response) -> None:
+        """Return a connection to the idle pool if it can be reused"""
+        if response.keep_alive:
+            self._idle.append(connection)
+        else:
+            connection.close()
+
+    def _update_session_id(self, response: _Response) -> bool:
+        """Store the session-id from a 409 response, returning True if one was found"""
+        session_id = response.headers.get(SESSION_ID_HEADER.lower())
+        if session_id:
+            self.session_id = session_id
+            if self.session_cache is not None:
+                self.session_cache.store(self.base_url, self._username, session_id)
+            return True
+        return False
+
+    async def _get_session_id(self) -> None:
+        """Gets the session-id required for API calls"""
+        async with self._semaphore:
+            response = await self._send("GET")
+        if response.status == 409:  # Conflict - session-id required
+            self._update_session_id(response)
+
+    async def _post(self, data: dict[str, Any]) -> Any:
+        """
+        Make a request to the Transmission API
+
+        A 409 response means the session-id is missing or has been rotated;
+        the new id is stored and the request retried once.
+
+        Args:
+            data (dict): JSON data to send
+
+        Returns:
+            dict: API response
+        """
+        body = json.dumps(data).encode("utf-8")
+        async with self._semaphore:
+            response = await self._send("POST", body)
+            if response.status == 409 and self._update_session_id(response):
+                response = await self._send("POST", body)
+
+        if not 200 <= response.status < 300:
+            raise TransmissionHTTPError(response.status, response.reason)
+        return json.loads(response.body)
+
+    async def add_torrent_file(self, torrent_file_path: str) -> Any:
+        """
+        Add a .torrent file to Transmission
+
+        Args:
+            torrent_file_path (str): Path to the .torrent file
+
+        Returns:
+            dict: API response
+        """
+        if not os.path.exists(torrent_file_path):
+            raise FileNotFoundError(f"File {torrent_file_path} does not exist")
+
+        # Read and encode the .torrent file in base64 without blocking the event loop
+        torrent_data = await asyncio.to_thread(_read_base64, torrent_file_path)
+
+        data = {
+            "method": "torrent-add",
+            "arguments": {"metainfo": torrent_data},
+        }
+        return await self._post(data)
+
+    async def add_torrent_url(self, torrent_url: str) -> Any:
+        """
+        Add a torrent from a URL
+
+        Args:
+            torrent_url (str): URL of the .torrent file
+
+        Returns:
+            dict: API response
+        """
+        data = {
+            "method": "torrent-add",
+            "arguments": {"filename": torrent_url},
+        }
+        return await self._post(data)
+
+    async def get_torrents(self, fields: str | Iterable[str] | None = None) -> list[dict[str, Any]]:
+        """
+        Get the list of torrents
+
+        Args:
+            fields (str or list): Preset name (minimal, list, default, full) or
+                torrent field names to request (default: id, name, status,
+                percentDone and downloadDir)
+
+        Returns:
+            list of dicts: List of torrents
+
+        Raises:
+            ValueError: If a preset or field name is unknown
+        """
+        data = {
+            "method": "torrent-get",
+            "arguments": {"fields": resolve_fields(fields)},
+        }
+
+        result = await self._post(data)
+        torrents = result.get("arguments", {}).get("torrents", [])
+        if not isinstance(torrents, list):
+            return []
+        return [t for t in torrents if isinstance(t, dict)]
+
+
+def _read_base64(path: str) -> str:
+    """Read a file and return its base64-encoded contents"""
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("utf-8")
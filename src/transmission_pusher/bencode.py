@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Minimal bencode parser for .torrent metainfo
+Decodes metainfo and computes infohashes without uploading anything
+"""
+
+import hashlib
+import mmap
+import os
+from typing import Any
+
+# Anything supporting indexing, slicing and find(): bytes, bytearray, mmap
+Buffer = Any
+
+_DIGITS = b"0123456789"
+
+
+class BencodeError(ValueError):
+    """Raised when data is not valid bencode"""
+
+
+def decode(data: Buffer) -> Any:
+    """
+    Decode a complete bencoded value
+
+    Strings are returned as bytes, dictionaries with bytes keys.
+
+    Args:
+        data (bytes): Bencoded data
+
+    Returns:
+        The decoded value
+
+    Raises:
+        BencodeError: If data is not a single valid bencoded value
+    """
+    try:
+        value, end = _decode(data, 0)
+    except RecursionError:
+        raise BencodeError("Data is nested too deeply") from None
+    if end != len(data):
+        raise BencodeError(f"Trailing data at offset {end}")
+    return value
+
+
+def info_hash(data: Buffer) -> str:
+    """
+    Compute the infohash of .torrent metainfo
+
+    The info dictionary is located by walking the top-level dictionary and
+    hashed as it appears in the file, without decoding its contents.
+
+    Args:
+        data (bytes): Contents of a .torrent file
+
+    Returns:
+        str: Lowercase hex SHA-1 of the bencoded info dictionary
+
+    Raises:
+        BencodeError: If data is not valid metainfo
+    """
+    start, end = _info_span(data)
+    return hashlib.sha1(data[start:end]).hexdigest()
+
+
+def file_info_hash(path: str) -> str:
+    """
+    Compute the infohash of a .torrent file
+
+    Args:
+        path (str): Path to the .torrent file
+
+    Returns:
+        str: Lowercase hex SHA-1 of the bencoded info dictionary
+
+    Raises:
+        BencodeError: If the file is not valid metainfo
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise BencodeError("Metainfo is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return info_hash(data)
+
+
+def torrent_size(data: Buffer) -> int:
+    """
+    Compute the total payload size of .torrent metainfo
+
+    Only the lengths are decoded; everything else is skipped over like
+    info_hash() does, so deeply nested values can't exhaust the stack.
+
+    Args:
+        data (bytes): Contents of a .torrent file
+
+    Returns:
+        int: Sum of the lengths of all files in the torrent, in bytes
+
+    Raises:
+        BencodeError: If data is not valid metainfo
+    """
+    start, _ = _info_span(data)
+    info = _dict_offsets(data, start)
+    if b"length" in info:
+        length = _int_at(data, info[b"length"])
+    else:
+        index = info.get(b"files")
+        if index is None or data[index] != ord("l"):
+            raise BencodeError("info has neither length nor files")
+        length = 0
+        index += 1
+        while _peek(data, index) != ord("e"):
+            entry = _dict_offsets(data, index) if data[index] == ord("d") else {}
+            entry_length = _int_at(data, entry[b"length"]) if b"length" in entry else None
+            if entry_length is None:
+                raise BencodeError("files entry without a valid length")
+            length += entry_length
+            index = _skip(data, index)
+    if length is None or length < 0:
+        raise BencodeError(f"Invalid torrent length {length!r}")
+    return length
+
+
+def file_torrent_size(path: str) -> int:
+    """
+    Compute the total payload size of a .torrent file
+
+    Args:
+        path (str): Path to the .torrent file
+
+    Returns:
+        int: Sum of the lengths of all files in the torrent, in bytes
+
+    Raises:
+        BencodeError: If the file is not valid metainfo
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise BencodeError("Metainfo is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return torrent_size(data)
+
+
+def _info_span(data: Buffer) -> tuple[int, int]:
+    """Return the start and end offsets of the info dictionary"""
+    if not len(data) or data[0] != ord("d"):
+        raise BencodeError("Metainfo is not a dictionary")
+
+    index = 1
+    while _peek(data, index) != ord("e"):
+        key, index = _decode_string(data, index)
+        end = _skip(data, index)
+        if key == b"info":
+            if data[index] != ord("d"):
+                raise BencodeError("info is not a dictionary")
+            return index, end
+        index = end
+    raise BencodeError("Metainfo has no info dictionary")
+
+
+def _peek(data: Buffer, index: int) -> int:
+    """Return the byte at index, failing cleanly at the end of data"""
+    if index >= len(data):
+        raise BencodeError("Unexpected end of data")
+    return int(data[index])
+
+
+def _dict_offsets(data: Buffer, index: int) -> dict[bytes, int]:
+    """Map the keys of the dictionary starting at index to the offsets of their values"""
+    offsets = {}
+    index += 1
+    while _peek(data, index) != ord("e"):
+        key, index = _decode_string(data, index)
+        offsets[key] = index
+        index = _skip(data, index)
+    return offsets
+
+
+def _int_at(data: Buffer, index: int) -> int | None:
+    """Decode the integer starting at index, or return None for any other value"""
+    if _peek(data, index) != ord("i"):
+        return None
+    return _parse_int(data[index + 1 : _find(data, b"e", index + 1)])
+
+
+def _decode(data: Buffer, index: int) -> tuple[Any, int]:
+    """Decode the value starting at index, returning it and the offset after it"""
+    token = _peek(data, index)
+    if token == ord("i"):
+        end = _find(data, b"e", index + 1)
+        return _parse_int(data[index + 1 : end]), end + 1
+    if token == ord("l"):
+        items = []
+        index += 1
+        while _peek(data, index) != ord("e"):
+            item, index = _decode(data, index)
+            items.append(item)
+        return items, index + 1
+    if token == ord("d"):
+        result = {}
+        index += 1
+        while _peek(data, index) != ord("e"):
+            key, index = _decode_string(data, index)
+            result[key], index = _decode(data, index)
+        return result, index + 1
+    return _decode_string(data, index)
+
+
+def _skip(data: Buffer, index: int) -> int:
+    """Return the offset after the value starting at index without building it"""
+    depth = 0
+    while True:
+        token = _peek(data, index)
+        if token == ord("i"):
+            index = _find(data, b"e", index + 1) + 1
+        elif token in (ord("l"), ord("d")):
+            depth += 1
+            index += 1
+        elif token == ord("e"):
+            if depth == 0:
+                raise BencodeError(f"Unexpected end marker at offset {index}")
+            depth -= 1
+            index += 1
+        else:
+            colon = _find(data, b":", index)
+            index = colon + 1 + _parse_length(data[index:colon])
+            if index > len(data):
+                raise BencodeError("String runs past the end of data")
+        if depth == 0:
+            return index
+
+
+def _decode_string(data: Buffer, index: int) -> tuple[bytes, int]:
+    """Decode the byte string starting at index"""
+    if _peek(data, index) not in _DIGITS:
+        raise BencodeError(f"Expected a string at offset {index}")
+    colon = _find(data, b":", index)
+    start = colon + 1
+    end = start + _parse_length(data[index:colon])
+    if end > len(data):
+        raise BencodeError("String runs past the end of data")
+    return bytes(data[start:end]), end
+
+
+def _find(data: Buffer, marker: bytes, index: int) -> int:
+    """Find marker at or after index"""
+    position = int(data.find(marker, index))
+    if position < 0:
+        raise BencodeError(f"Missing {marker.decode()!r} after offset {index}")
+    return position
+
+
+def _parse_length(raw: bytes) -> int:
+    """Parse a string length prefix"""
+    if not raw or not raw.isdigit():
+        raise BencodeError(f"Invalid string length {bytes(raw)!r}")
+    return int(raw)
+
+
+def _parse_int(raw: bytes) -> int:
+    """Parse the body of an integer value"""
+    try:
+        return int(raw)
+    except ValueError:
+        raise BencodeError(f"Invalid integer {bytes(raw)!r}") from None
@@ -8,9 +8,6 @@ import os
 import requests
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
 
 def test_url(url: str, description: str) -> bool:
     """Test a specific URL"""
@@ -57,6 +54,9 @@ def check_rpc_endpoint(base_url: str, username: str | None = None, password: str
 
 
 def main() -> None:
+    # Load environment variables
+    load_dotenv()
+
     print("🔧 Transmission Connection Diagnostic")
     print("=" * 50)
 
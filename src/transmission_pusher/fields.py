@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Torrent field names accepted by Transmission's torrent-get method
+and the presets used to request them
+"""
+
+from typing import Iterable
+
+# Every field documented for torrent-get in the Transmission RPC spec
+TORRENT_FIELDS = frozenset(
+    [
+        "activityDate",
+        "addedDate",
+        "availability",
+        "bandwidthPriority",
+        "comment",
+        "corruptEver",
+        "creator",
+        "dateCreated",
+        "desiredAvailable",
+        "doneDate",
+        "downloadDir",
+        "downloadedEver",
+        "downloadLimit",
+        "downloadLimited",
+        "editDate",
+        "error",
+        "errorString",
+        "eta",
+        "etaIdle",
+        "file-count",
+        "files",
+        "fileStats",
+        "group",
+        "hashString",
+        "haveUnchecked",
+        "haveValid",
+        "honorsSessionLimits",
+        "id",
+        "isFinished",
+        "isPrivate",
+        "isStalled",
+        "labels",
+        "leftUntilDone",
+        "magnetLink",
+        "manualAnnounceTime",
+        "maxConnectedPeers",
+        "metadataPercentComplete",
+        "name",
+        "peer-limit",
+        "peers",
+        "peersConnected",
+        "peersFrom",
+        "peersGettingFromUs",
+        "peersSendingToUs",
+        "percentComplete",
+        "percentDone",
+        "pieces",
+        "pieceCount",
+        "pieceSize",
+        "priorities",
+        "primary-mime-type",
+        "queuePosition",
+        "rateDownload",
+        "rateUpload",
+        "recheckProgress",
+        "secondsDownloading",
+        "secondsSeeding",
+        "seedIdleLimit",
+        "seedIdleMode",
+        "seedRatioLimit",
+        "seedRatioMode",
+        "sequentialDownload",
+        "sizeWhenDone",
+        "startDate",
+        "status",
+        "torrentFile",
+        "totalSize",
+        "trackerList",
+        "trackerStats",
+        "trackers",
+        "uploadLimit",
+        "uploadLimited",
+        "uploadRatio",
+        "uploadedEver",
+        "wanted",
+        "webseeds",
+        "webseedsSendingToUs",
+    ]
+)
+
+# Fields returned by get_torrents when the caller doesn't choose any
+DEFAULT_FIELDS = ["id", "name", "status", "percentDone", "downloadDir"]
+
+FIELD_PRESETS = {
+    # Enough to track progress by id
+    "minimal": ["id", "status"],
+    # What the CLI prints for --list
+    "list": ["name", "status", "percentDone"],
+    "default": DEFAULT_FIELDS,
+    # Every per-torrent summary field; excludes the per-file, per-peer and
+    # per-piece arrays, which dwarf everything else on large daemons
+    "full": [
+        "id",
+        "hashString",
+        "name",
+        "status",
+        "error",
+        "errorString",
+        "percentDone",
+        "totalSize",
+        "sizeWhenDone",
+        "leftUntilDone",
+        "downloadedEver",
+        "uploadedEver",
+        "uploadRatio",
+        "rateDownload",
+        "rateUpload",
+        "eta",
+        "downloadDir",
+        "addedDate",
+        "doneDate",
+        "activityDate",
+        "peersConnected",
+        "isFinished",
+        "isPrivate",
+        "queuePosition",
+        "labels",
+    ],
+}
+
+
+def resolve_fields(fields: str | Iterable[str] | None = None) -> list[str]:
+    """
+    Turn a preset name or a list of field names into a validated field list
+
+    Args:
+        fields (str or list): Preset name (minimal, list, default, full),
+            field names, or None for the default fields
+
+    Returns:
+        list: Field names without duplicates, in the order given
+
+    Raises:
+        ValueError: If the preset or any field name is unknown
+    """
+    if fields is None:
+        return list(DEFAULT_FIELDS)
+
+    if isinstance(fields, str):
+        if fields not in FIELD_PRESETS:
+            presets = ", ".join(sorted(FIELD_PRESETS))
+            raise ValueError(f"Unknown field preset '{fields}' (expected one of: {presets})")
+        return list(FIELD_PRESETS[fields])
+
+    resolved = list(dict.fromkeys(fields))
+    if not resolved:
+        raise ValueError("At least one torrent field is required")
+
+    unknown = [field for field in resolved if field not in TORRENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown torrent field(s): {', '.join(unknown)}")
+    return resolved
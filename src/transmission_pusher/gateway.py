@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Local RPC gateway
+Keeps Transmission sessions warm in a long-running process and exposes a
+small HTTP API over TCP or a Unix socket, so per-event callers such as
+webhooks or n8n skip interpreter startup and session handshakes
+"""
+
+import hmac
+import json
+import logging
+import os
+import socketserver
+import stat
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Hashable, TypeVar
+from urllib.parse import parse_qs, urlsplit
+
+from .bencode import BencodeError, file_info_hash, info_hash
+from .fields import FIELD_PRESETS, resolve_fields
+from .metrics import ADD_OUTCOMES, CONTENT_TYPE, REGISTRY
+from .transmission_client import TransmissionClient, add_outcome
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Largest .torrent upload accepted; real ones are rarely over a few MiB
+MAX_UPLOAD_BYTES = 32 * 1024 * 1024
+
+TORRENT_CONTENT_TYPE = "application/x-bittorrent"
+
+OUTCOMES = ("added", "duplicate", "skipped", "error")
+
+
+class GatewayError(Exception):
+    """Raised for requests the gateway refuses, carrying the HTTP status to answer with"""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class _Call:
+    """A call in flight and the callers waiting for it"""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Run a call once for all callers asking for the same key at the same time"""
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> tuple[T, bool]:
+        """
+        Call func, or wait for the call already running under key
+
+        Args:
+            key (hashable): Identifies calls that would give the same result
+            func (callable): The call to make
+
+        Returns:
+            tuple: (result, shared) where shared is True if another caller's
+                call produced the result
+
+        Raises:
+            Exception: Whatever func raised, in every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+def add_response(result: Any) -> dict[str, Any]:
+    """
+    Summarize a torrent-add result for gateway callers
+
+    Args:
+        result (dict): API response returned by an add method
+
+    Returns:
+        dict: outcome, and the torrent's id, hash and name when known; the
+            backend for sharded clients and the error for failed adds
+    """
+    arguments = result.get("arguments", {})
+    torrent_info = arguments.get("torrent-added") or arguments.get("torrent-duplicate") or {}
+    response: dict[str, Any] = {"outcome": add_outcome(result)}
+    for key, field in (("id", "id"), ("hashString", "hash"), ("name", "name")):
+        if torrent_info.get(key) is not None:
+            response[field] = torrent_info[key]
+    if "backend" in result:
+        response["backend"] = result["backend"]
+    if response["outcome"] == "error":
+        response["error"] = str(result.get("result"))
+    return response
+
+
+class Gateway:
+    def __init__(self, client: Any, jobs: int = 4) -> None:
+        """
+        Initialize a gateway around a client
+
+        At most jobs adds run at once; further callers wait. Identical
+        requests that arrive while one is in flight share its answer: lists
+        with the same fields, and adds of the same infohash or URL.
+
+        Args:
+            client (TransmissionClient): Client whose sessions stay warm, or a
+                ShardedTransmissionClient
+            jobs (int): Number of adds sent to Transmission at once (default: 4)
+        """
+        if jobs < 1:
+            raise ValueError("jobs must be at least 1")
+
+        self.client = client
+        self.jobs = jobs
+        self._slots = threading.BoundedSemaphore(jobs)
+        self._flights = SingleFlight()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._coalesced = 0
+        self._in_flight = 0
+
+    def _run(self, key: Hashable | None, func: Callable[[], T]) -> T:
+        """Run a call, joining an identical one in flight if key is given"""
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if key is None:
+                return func()
+            result, shared = self._flights.do(key, func)
+            if shared:
+                with self._lock:
+                    self._coalesced += 1
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                self._requests += 1
+
+    def _add(self, key: Hashable | None, func: Callable[[], Any]) -> dict[str, Any]:
+        """Run an add within the job limit"""
+
+        def limited() -> Any:
+            with self._slots:
+                return func()
+
+        return add_response(self._run(key, limited))
+
+    def add_file(self, path: str) -> dict[str, Any]:
+        """
+        Add a .torrent file the gateway can read
+
+        Args:
+            path (str): Path to the .torrent file
+
+        Returns:
+            dict: See add_response
+        """
+        if not os.path.isfile(path):
+            raise GatewayError(400, f"File {path} does not exist")
+        try:
+            key: Hashable | None = ("add", file_info_hash(path))
+        except (BencodeError, OSError):
+            # Let the daemon report what is wrong with the file
+            key = None
+        return self._add(key, lambda: self.client.add_torrent_file(path))
+
+    def add_metainfo(self, metainfo: bytes) -> dict[str, Any]:
+        """
+        Add an uploaded .torrent file
+
+        Args:
+            metainfo (bytes): Contents of the .torrent file
+
+        Returns:
+            dict: See add_response
+        """
+        try:
+            key: Hashable | None = ("add", info_hash(metainfo))
+        except BencodeError:
+            key = None
+        return self._add(key, lambda: self.client.add_torrent_metainfo(metainfo))
+
+    def add_url(self, url: str) -> dict[str, Any]:
+        """
+        Add a torrent from a URL
+
+        Args:
+            url (str): URL of the .torrent file or magnet link
+
+        Returns:
+            dict: See add_response
+        """
+        return self._add(("url", url), lambda: self.client.add_torrent_url(url))
+
+    def list_torrents(self, fields: str | list[str] | None = None) -> list[dict[str, Any]]:
+        """
+        List the torrents
+
+        A single client answers from its delta-refreshed torrent cache.
+
+        Args:
+            fields (str or list): Preset name or field names (default: list)
+
+        Returns:
+            list of dicts: Torrents
+
+        Raises:
+            ValueError: If a preset or field name is unknown
+        """
+        field_list = resolve_fields(fields or "list")
+        key = ("list", tuple(field_list))
+        if isinstance(self.client, TransmissionClient):
+            client = self.client
+            return self._run(key, lambda: client.get_torrents(field_list, cached=True))
+        return self._run(key, lambda: list(self.client.iter_torrents(fields=field_list)))
+
+    def status(self) -> dict[str, Any]:
+        """
+        Describe the gateway
+
+        Returns:
+            dict: uptime in seconds, requests served, requests in flight,
+                requests that shared another's answer, the job limit, the
+                backends and the add outcomes of this process
+        """
+        clients = getattr(self.client, "clients", None)
+        backends = list(clients) if isinstance(clients, dict) else [self.client.base_url]
+        with self._lock:
+            return {
+                "uptime": round(time.monotonic() - self._started, 3),
+                "requests": self._requests,
+                "in_flight": self._in_flight,
+                "coalesced": self._coalesced,
+                "jobs": self.jobs,
+                "backends": backends,
+                "outcomes": {outcome: int(ADD_OUTCOMES.value(outcome=outcome)) for outcome in OUTCOMES},
+            }
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class GatewayServer:
+    def __init__(
+        self,
+        gateway: Gateway,
+        host: str = "127.0.0.1",
+        port: int = 9092,
+        socket_path: str | None = None,
+        token: str | None = None,
+    ) -> None:
+        """
+        Serve a gateway over HTTP
+
+        Endpoints:
+            POST /torrents: add a torrent. Send the .torrent file itself with
+                Content-Type application/x-bittorrent, or JSON {"path": ...}
+                or {"url": ...}
+            GET /torrents?fields=list: list the torrents
+            GET /status: gateway status
+            GET /metrics: Prometheus metrics
+
+        Connections are kept alive, so a caller pays one connection setup for
+        any number of requests.
+
+        Without a token, TCP requests must name the listen address or
+        localhost in their Host header. Otherwise a web page could reach the
+        gateway through DNS rebinding. With a token, any Host is accepted.
+
+        Args:
+            gateway (Gateway): Gateway to serve
+            host (str): Address to bind (default: 127.0.0.1)
+            port (int): TCP port, 0 to pick a free one (default: 9092)
+            socket_path (str): Listen on this Unix socket instead of TCP;
+                access is then governed by the socket file's permissions (optional)
+            token (str): Require "Authorization: Bearer <token>" (optional)
+        """
+        self.gateway = gateway
+        self.socket_path = socket_path
+        self._serving = False
+        # Bound TCP address, None on a Unix socket
+        self._tcp_address: tuple[str, int] | None = None
+        check_host = socket_path is None and token is None
+        allowed_hosts = {host.lower(), "localhost", "127.0.0.1", "::1"}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without TCP_NODELAY
+            # the body waits for a delayed ACK (Unix sockets have no Nagle)
+            disable_nagle_algorithm = socket_path is None
+
+            def do_GET(self) -> None:
+                self._dispatch("GET")
+
+            def do_POST(self) -> None:
+                self._dispatch("POST")
+
+            def _dispatch(self, method: str) -> None:
+                url = urlsplit(self.path)
+                body: bytes | None = None
+                try:
+                    self._authorize()
+                    body = self._read_body()
+                    if method == "GET" and url.path == "/metrics":
+                        self._send(200, REGISTRY.render().encode("utf-8"), CONTENT_TYPE)
+                        return
+                    self._send_json(200, self._route(method, url.path, url.query, body))
+                except GatewayError as e:
+                    self._send_error(e.status, e, body)
+                except ValueError as e:
+                    self._send_error(400, e, body)
+                except Exception as e:
+                    logger.error(f"❌ Gateway request {method} {url.path} failed: {e}")
+                    self._send_error(502, e, body)
+
+            def _authorize(self) -> None:
+                """Check the Host header and the token, before reading any body"""
+                if check_host:
+                    try:
+                        hostname = urlsplit(f"//{self.headers.get('Host', '')}").hostname
+                    except ValueError:
+                        hostname = None
+                    if hostname not in allowed_hosts:
+                        raise GatewayError(421, "Host not allowed; use the listen address, localhost or a token")
+                if token is not None and not hmac.compare_digest(
+                    self.headers.get("Authorization", ""), f"Bearer {token}"
+                ):
+                    raise GatewayError(401, "Missing or wrong token")
+
+            def _read_body(self) -> bytes:
+                if "Transfer-Encoding" in self.headers:
+                    raise GatewayError(411, "Send the body with a Content-Length")
+                length = (self.headers.get("Content-Length") or "0").strip()
+                if not length.isdigit():
+                    raise GatewayError(400, f"Invalid Content-Length: {length!r}")
+                if int(length) > MAX_UPLOAD_BYTES:
+                    raise GatewayError(413, f"Request body over {MAX_UPLOAD_BYTES} bytes")
+                return self.rfile.read(int(length)) if int(length) else b""
+
+            def _route(self, method: str, path: str, query: str, body: bytes) -> Any:
+                if path == "/status" and method == "GET":
+                    return gateway.status()
+                if path == "/torrents" and method == "GET":
+                    names = [name for name in parse_qs(query).get("fields", [""])[0].split(",") if name]
+                    fields = names[0] if len(names) == 1 and names[0] in FIELD_PRESETS else names
+                    return {"torrents": gateway.list_torrents(fields)}
+                if path == "/torrents" and method == "POST":
+                    content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+                    if content_type == TORRENT_CONTENT_TYPE:
+                        return gateway.add_metainfo(body)
+                    if content_type != "application/json":
+                        raise GatewayError(415, f"Send JSON or {TORRENT_CONTENT_TYPE}")
+                    job = json.loads(body or b"null")
+                    if isinstance(job, dict) and isinstance(job.get("path"), str):
+                        return gateway.add_file(job["path"])
+                    if isinstance(job, dict) and isinstance(job.get("url"), str):
+                        return gateway.add_url(job["url"])
+                    raise GatewayError(400, 'Expected {"path": ...} or {"url": ...}')
+                if path in ("/status", "/torrents"):
+                    raise GatewayError(405, f"{method} not allowed on {path}")
+                raise GatewayError(404, f"No such endpoint: {path}")
+
+            def _send_error(self, status: int, error: Exception, body: bytes | None) -> None:
+                unread = "Transfer-Encoding" in self.headers or self.headers.get("Content-Length", "0").strip() != "0"
+                if body is None and unread:
+                    # Don't read the next request from the middle of this body
+                    self.close_connection = True
+                self._send_json(status, {"error": str(error)})
+
+            def _send_json(self, status: int, payload: Any) -> None:
+                self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+            def _send(self, status: int, body: bytes, content_type: str) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                logger.debug(f"   Gateway {format % args}", extra={"event": "gateway-request"})
+
+        self._server: socketserver.BaseServer
+        if socket_path is not None:
+            try:
+                if stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                    # Left behind by a previous run that didn't shut down cleanly
+                    os.unlink(socket_path)
+            except FileNotFoundError:
+                pass
+            self._server = _UnixHTTPServer(socket_path, Handler)
+        else:
+            server = ThreadingHTTPServer((host, port), Handler)
+            server.daemon_threads = True
+            self._server = server
+            self._tcp_address = (host, server.server_port)
+
+    @property
+    def address(self) -> str:
+        """Where the gateway listens, as a URL"""
+        if self._tcp_address is None:
+            return f"unix://{self.socket_path}"
+        host, port = self._tcp_address
+        if ":" in host:
+            host = f"[{host}]"
+        return f"http://{host}:{port}"
+
+    def serve_forever(self) -> None:
+        """Handle requests until close() is called from another thread"""
+        self._serving = True
+        self._server.serve_forever()
+
+    def close(self) -> None:
+        """Stop serving and remove the Unix socket"""
+        if self._serving:
+            # shutdown() waits for serve_forever(), which may never have run
+            self._server.shutdown()
+        self._server.server_close()
+        if self.socket_path is not None:
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
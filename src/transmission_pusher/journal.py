@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Persistent ingest journal for folder runs
+Records the outcome of every .torrent file so interrupted runs can resume
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+# Outcomes that mean a file needs no further work
+COMPLETED_OUTCOMES = ("added", "duplicate", "skipped")
+
+
+class IngestJournal:
+    def __init__(self, path: str) -> None:
+        """
+        Open (or create) an ingest journal
+
+        Files are keyed by path and considered done only while their size and
+        modification time match what was recorded, so a replaced file is
+        uploaded again. Failed files are retried on the next run.
+
+        Args:
+            path (str): Path to the SQLite journal file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        # WAL keeps every recorded outcome safe across a crash of this process
+        # without paying an fsync per file
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                infohash TEXT,
+                outcome TEXT NOT NULL,
+                error TEXT,
+                updated REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def __enter__(self) -> "IngestJournal":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the journal"""
+        with self._lock:
+            self._connection.close()
+
+    def is_done(self, path: str) -> bool:
+        """
+        Check whether a file was already handled successfully
+
+        Args:
+            path (str): Path to the .torrent file
+
+        Returns:
+            bool: True if the file's last outcome was completed and it hasn't
+                changed since
+        """
+        key = os.path.abspath(path)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime_ns, outcome FROM entries WHERE path = ?", (key,)
+            ).fetchone()
+        if row is None or row[2] not in COMPLETED_OUTCOMES:
+            return False
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return bool(row[0] == stat.st_size and row[1] == stat.st_mtime_ns)
+
+    def record(self, path: str, outcome: str, infohash: str | None = None, error: str | None = None) -> None:
+        """
+        Record the outcome of a file
+
+        Args:
+            path (str): Path to the .torrent file
+            outcome (str): "added", "duplicate", "skipped" or "error"
+            infohash (str): Infohash of the torrent (optional)
+            error (str): Error message for failed files (optional)
+        """
+        key = os.path.abspath(path)
+        try:
+            stat = os.stat(path)
+            size, mtime_ns = stat.st_size, stat.st_mtime_ns
+        except OSError:
+            size, mtime_ns = -1, -1
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries (path, size, mtime_ns, infohash, outcome, error, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, size, mtime_ns, infohash, outcome, error, time.time()),
+            )
+            self._connection.commit()
+
+    def outcome(self, path: str) -> str | None:
+        """
+        Get the last recorded outcome of a file
+
+        Args:
+            path (str): Path to the .torrent file
+
+        Returns:
+            str: Recorded outcome, or None if the file was never recorded
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT outcome FROM entries WHERE path = ?", (os.path.abspath(path),)
+            ).fetchone()
+        return str(row[0]) if row else None
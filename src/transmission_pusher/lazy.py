@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Deferred imports for the command line entry points
+A module is only imported once one of its attributes is used, so --help
+and argument errors don't pay for HTTP libraries they never touch
+"""
+
+import importlib
+import sys
+import types
+from typing import Any
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a module that imports it on first attribute access
+
+    Setting or deleting attributes goes to the real module, so
+    unittest.mock.patch("pkg.mod.requests.Session") works as with a plain
+    import.
+    """
+
+    def _load(self) -> types.ModuleType:
+        """Import the real module, or return it if already imported"""
+        module = sys.modules.get(self.__name__)
+        if module is None:
+            module = importlib.import_module(self.__name__)
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._load(), attr)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._load())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Adaptive concurrency limiter
+Raises the number of in-flight RPCs while latency stays flat and halves it
+on latency spikes or errors (additive increase, multiplicative decrease)
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """
+    Compute a percentile by the nearest-rank method
+
+    Args:
+        samples (list): Samples, in any order (must not be empty)
+        fraction (float): Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        float: The smallest sample with at least fraction of the samples at or below it
+    """
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        initial_limit: int = 1,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        window: int = 100,
+        tolerance: float = 2.0,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize an adaptive concurrency limiter
+
+        Every successful request whose latency stays within tolerance times
+        the baseline p95 raises the limit by 1/limit, i.e. by one per round of
+        limit requests. A slower request or a failure multiplies the limit by
+        backoff, at most once per congestion event: requests that started
+        before the last decrease don't decrease it again.
+
+        The baseline is the lowest p95 seen, allowed to creep up by 1% per
+        request so it follows a daemon that has become permanently slower.
+
+        Args:
+            initial_limit (int): Starting number of concurrent requests (default: 1)
+            min_limit (int): Lowest limit (default: 1)
+            max_limit (int): Highest limit (default: 16)
+            window (int): Number of recent latencies kept for percentiles (default: 100)
+            tolerance (float): Latency over baseline counted as a spike (default: 2.0)
+            backoff (float): Factor applied to the limit on congestion (default: 0.5)
+            clock (callable): Monotonic clock in seconds (default: time.monotonic)
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= max_limit")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self._clock = clock
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._baseline: float | None = None
+        self._last_decrease = -math.inf
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently in flight"""
+        return self._in_flight
+
+    @property
+    def p95(self) -> float | None:
+        """95th percentile of recent latencies in seconds, None before the first sample"""
+        with self._condition:
+            return percentile(list(self._latencies), 0.95) if self._latencies else None
+
+    @property
+    def baseline(self) -> float | None:
+        """Latency considered normal, in seconds"""
+        return self._baseline
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Get the current state, e.g. for graphing
+
+        Returns:
+            dict: limit, in_flight, and p50, p95 and baseline latencies in seconds
+        """
+        with self._condition:
+            samples = list(self._latencies)
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "p50": percentile(samples, 0.5) if samples else None,
+                "p95": percentile(samples, 0.95) if samples else None,
+                "baseline": self._baseline,
+            }
+
+    def acquire(self, timeout: float | None = None) -> float | None:
+        """
+        Wait for a free slot
+
+        Args:
+            timeout (float): Longest wait in seconds (default: no limit)
+
+        Returns:
+            float: Start time to pass to release(), or None if no slot came
+                free within timeout
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < self.limit, timeout):
+                return None
+            self._in_flight += 1
+            return self._clock()
+
+    def cancel(self) -> None:
+        """Free a slot without counting a request, e.g. one that was never sent"""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def release(self, started: float, ok: bool = True) -> None:
+        """
+        Free a slot and adjust the limit
+
+        Args:
+            started (float): Value returned by acquire()
+            ok (bool): False if the request failed from overload, e.g. a
+                connection error or 5xx answer (default: True)
+        """
+        now = self._clock()
+        latency = now - started
+        with self._condition:
+            self._in_flight -= 1
+            spike = False
+            if ok:
+                self._latencies.append(latency)
+                spike = self._baseline is not None and latency > self._baseline * self.tolerance
+                p95 = percentile(list(self._latencies), 0.95)
+                self._baseline = p95 if self._baseline is None else min(p95, self._baseline * 1.01)
+
+            if not ok or spike:
+                if started >= self._last_decrease:
+                    self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                    self._last_decrease = now
+            else:
+                self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._condition.notify_all()
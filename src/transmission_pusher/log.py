@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Logging setup for the command line tools
+Plain emoji lines for people, JSON lines for machines, and a quiet mode
+that only shows summaries and errors
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import IO, Any
+
+LOGGER_NAME = "transmission_pusher"
+
+# Attributes every LogRecord has; anything else was passed through extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+def summary(**fields: Any) -> dict[str, Any]:
+    """
+    Build the extra= argument of a record that quiet mode still shows
+
+    Args:
+        **fields: Further structured fields for the record
+
+    Returns:
+        dict: Fields including summary=True
+    """
+    return {"summary": True, **fields}
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage().strip(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key != "summary":
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class QuietFilter(logging.Filter):
+    """Let through only summary records and errors"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return bool(getattr(record, "summary", False)) or record.levelno >= logging.ERROR
+
+
+def configure_logging(
+    log_format: str = "text", quiet: bool = False, verbose: bool = False, stream: IO[str] | None = None
+) -> logging.Handler:
+    """
+    Send the package's log records to a stream
+
+    Calling it again replaces the handler installed by the previous call.
+
+    Args:
+        log_format (str): "text" for the usual emoji lines or "json" for
+            JSON lines with structured fields (default: text)
+        quiet (bool): Only show summaries and errors (default: False)
+        verbose (bool): Also show per-RPC debug records (default: False)
+        stream (file): Where to write (default: sys.stdout)
+
+    Returns:
+        logging.Handler: The installed handler
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if getattr(handler, "_transmission_pusher_cli", False):
+            logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    handler._transmission_pusher_cli = True  # type: ignore[attr-defined]
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(message)s"))
+    if quiet:
+        handler.addFilter(QuietFilter())
+
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+    # The CLI owns the output; don't pass records on to the root logger too
+    logger.propagate = False
+    return handler
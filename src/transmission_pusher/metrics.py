@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Prometheus-style metrics without external dependencies
+Counters, gauges and histograms rendered in the text exposition format,
+served over HTTP or written to a textfile for node_exporter
+"""
+
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets in seconds, from a fast LAN daemon to a struggling one
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = tuple[str, ...]
+
+M = TypeVar("M", bound="Metric")
+
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value"""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric(ABC):
+    """Base class for metrics with an optional fixed set of label names"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        """Turn label keyword arguments into a key, checking the names"""
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, extra: dict[str, str] | None = None) -> str:
+        """Render a label set"""
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    @abstractmethod
+    def samples(self) -> Iterator[str]:
+        """Yield the metric's sample lines"""
+
+    def render(self) -> str:
+        """Render the metric with its HELP and TYPE lines"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines) + "\n"
+
+
+class _SingleValueMetric(Metric):
+    """Metric with one value per label set"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def _add(self, amount: float, labels: dict[str, str]) -> None:
+        """Add amount to the value of a label set"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value for a label set"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{self._labels(key)} {_format_value(value)}"
+
+
+class Counter(_SingleValueMetric):
+    """Monotonically increasing value"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add amount (must not be negative)"""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        self._add(amount, labels)
+
+
+class Gauge(_SingleValueMetric):
+    """Value that goes up and down"""
+
+    kind = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add amount"""
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        """Subtract amount"""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the value"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket counts (not cumulative), sum and count
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation"""
+        key = self._key(labels)
+        with self._lock:
+            if key not in self._series:
+                self._series[key] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+            counts, totals = self._series[key]
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            counts[index] += 1
+            totals[0] += value
+            totals[1] += 1
+
+    def count(self, **labels: str) -> int:
+        """Number of observations for a label set"""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[1][1]) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), list(totals))) for key, (counts, totals) in self._series.items())
+        for key, (counts, (total, count)) in series:
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                labels = self._labels(key, {"le": _format_value(bound)})
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{self._labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{self._labels(key)} {_format_value(count)}"
+
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric, returning the one already registered under its name if any"""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def _get_or_register(self, metric: M) -> M:
+        """Register a metric, or get the one of the same type registered under its name"""
+        registered = self.register(metric)
+        if not isinstance(registered, type(metric)):
+            raise ValueError(f"{metric.name} is already registered as a {registered.kind}")
+        return registered
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._get_or_register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._get_or_register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram"""
+        return self._get_or_register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "".join(metric.render() for metric in metrics)
+
+    def write_textfile(self, path: str) -> None:
+        """
+        Write the metrics to a file for node_exporter's textfile collector
+
+        The file is replaced atomically, so the collector never reads a
+        partial file.
+
+        Args:
+            path (str): Destination, usually ending in .prom
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+class MetricsServer:
+    def __init__(self, registry: "Registry", port: int, host: str = "127.0.0.1") -> None:
+        """
+        Serve a registry on /metrics from a background thread
+
+        Args:
+            registry (Registry): Metrics to expose
+            port (int): TCP port, 0 to pick a free one
+            host (str): Address to bind (default: 127.0.0.1)
+        """
+        # Only needed when serving, so the CLI doesn't import it on every start
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                # Scrapes every few seconds would drown the CLI output
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on"""
+        return int(self._server.server_address[1])
+
+    def close(self) -> None:
+        """Stop serving"""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# Metrics recorded by every client in this process
+REGISTRY = Registry()
+
+RPC_DURATION = REGISTRY.histogram(
+    "transmission_rpc_duration_seconds", "Time from sending an RPC to receiving its answer", ["method"]
+)
+RPC_REQUESTS = REGISTRY.counter(
+    "transmission_rpc_requests_total", "RPC requests sent, by HTTP status or error", ["method", "status"]
+)
+RPC_REQUEST_BYTES = REGISTRY.counter("transmission_rpc_request_bytes_total", "Bytes sent in RPC bodies", ["method"])
+RPC_RESPONSE_BYTES = REGISTRY.counter(
+    "transmission_rpc_response_bytes_total", "Bytes received in RPC bodies", ["method"]
+)
+RPC_RETRIES = REGISTRY.counter("transmission_rpc_retries_total", "RPC requests sent again after a failure", ["method"])
+RPC_IN_FLIGHT = REGISTRY.gauge("transmission_rpc_in_flight", "RPC requests waiting for an answer", ["method"])
+ADD_OUTCOMES = REGISTRY.counter(
+    "transmission_torrent_add_outcomes_total",
+    "Torrents handled, by outcome (added, duplicate, skipped, error)",
+    ["outcome"],
+)
+CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "transmission_concurrency_limit", "Current adaptive concurrency limit per daemon", ["endpoint"]
+)
+CONCURRENCY_P95 = REGISTRY.gauge(
+    "transmission_concurrency_p95_seconds", "95th percentile RPC latency seen by the adaptive limiter", ["endpoint"]
+)
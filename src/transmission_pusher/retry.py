@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Retry policy and circuit breaker for RPC calls
+Retries transient failures with jittered exponential backoff within a
+deadline, and fails fast while an endpoint is known to be down
+"""
+
+import random
+import threading
+import time
+from typing import Callable, TypeVar
+
+import requests
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: session-id churn and server-side failures
+RETRYABLE_STATUSES = frozenset({409, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling an endpoint whose circuit is open"""
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when a call's overall deadline has passed"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Check whether a failed RPC may succeed if tried again
+
+    Connection errors (refused, reset) and timeouts are retryable, as are
+    409 and 5xx answers. Other HTTP errors such as 401 are not, nor is a
+    call that ran out of its deadline or anything that isn't a requests error.
+
+    Args:
+        error (Exception): Error raised by the call
+
+    Returns:
+        bool: True if the call should be retried
+    """
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+        return False
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = error.response
+        return response is not None and response.status_code in RETRYABLE_STATUSES
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+class CircuitBreaker:
+    def __init__(
+        self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Initialize a circuit breaker
+
+        After failure_threshold consecutive failures the circuit opens and
+        calls fail immediately. Once reset_timeout has passed a single trial
+        call is let through; its success closes the circuit, its failure
+        opens it again.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit (default: 5)
+            reset_timeout (float): Seconds before a trial call is allowed (default: 30.0)
+            clock (callable): Monotonic clock in seconds (default: time.monotonic)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: closed, open or half-open"""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may go through, claiming the trial call when half-open
+
+        Returns:
+            bool: False while the circuit is open
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at < self.reset_timeout or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful call"""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release(self) -> None:
+        """Give back a trial call whose outcome says nothing about the endpoint"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the circuit at the threshold"""
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial_running = False
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        deadline: float | None = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Initialize a retry policy
+
+        The delay before retry n is drawn uniformly between 0 and
+        min(max_delay, base_delay * 2**n) ("full jitter"), so workers that
+        failed together don't retry together. No retry is started that
+        couldn't begin before the deadline.
+
+        One policy may be shared by several clients; each endpoint gets its
+        own circuit breaker.
+
+        Args:
+            max_attempts (int): Attempts per call, including the first (default: 4)
+            base_delay (float): Backoff before the first retry in seconds (default: 0.5)
+            max_delay (float): Longest backoff in seconds (default: 10.0)
+            deadline (float): Seconds a call may take including retries, None
+                for no limit (default: 60.0)
+            failure_threshold (int): Consecutive failures that open an
+                endpoint's circuit (default: 5)
+            reset_timeout (float): Seconds an open circuit fails fast (default: 30.0)
+            clock (callable): Monotonic clock in seconds (default: time.monotonic)
+            sleep (callable): Function used to wait (default: time.sleep)
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._sleep = sleep
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """
+        Get the circuit breaker of an endpoint
+
+        Args:
+            endpoint (str): RPC URL
+
+        Returns:
+            CircuitBreaker: The endpoint's breaker, created on first use
+        """
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout, self._clock)
+            return self._breakers[endpoint]
+
+    def backoff(self, retry: int) -> float:
+        """
+        Pick the delay before a retry
+
+        Args:
+            retry (int): Number of the retry, starting at 0
+
+        Returns:
+            float: Seconds to wait
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**retry))
+
+    def call(self, func: Callable[[], T], endpoint: str, expires: float | None = None) -> T:
+        """
+        Call func, retrying retryable failures
+
+        Args:
+            func (callable): The RPC to perform
+            endpoint (str): RPC URL, selecting the circuit breaker
+            expires (float): Clock time after which no retry may start, in
+                addition to the policy's deadline (optional)
+
+        Returns:
+            Whatever func returns
+
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+            Exception: The last error once retries or the deadline run out
+        """
+        breaker = self.breaker(endpoint)
+        started = self._clock()
+        if self.deadline is not None:
+            expires = started + self.deadline if expires is None else min(expires, started + self.deadline)
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {endpoint}, not calling it")
+            try:
+                result = func()
+            except Exception as e:
+                if isinstance(e, requests.exceptions.HTTPError) and not is_retryable(e):
+                    # The endpoint answered, it just didn't like the request
+                    breaker.record_success()
+                    raise
+                if not is_retryable(e):
+                    breaker.release()
+                    raise
+                breaker.record_failure()
+                attempt += 1
+                delay = self.backoff(attempt - 1)
+                out_of_time = expires is not None and self._clock() + delay >= expires
+                if attempt >= self.max_attempts or out_of_time:
+                    raise
+                self._sleep(delay)
+                continue
+            breaker.record_success()
+            return result
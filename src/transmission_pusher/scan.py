@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Streaming directory scanner for .torrent files
+Walks folders lazily with os.scandir so memory doesn't grow with folder size
+"""
+
+import os
+from fnmatch import fnmatchcase
+from typing import Iterable, Iterator
+
+DEFAULT_INCLUDE = ("*.torrent",)
+
+
+def iter_torrent_files(
+    root: str,
+    recursive: bool = False,
+    include: Iterable[str] = DEFAULT_INCLUDE,
+    exclude: Iterable[str] = (),
+    max_depth: int | None = None,
+) -> Iterator[str]:
+    """
+    Yield the paths of matching files under a folder as they are found
+
+    Patterns are shell-style globs matched case-insensitively against both
+    the entry name and its path relative to root, so "*.torrent" matches by
+    name and "incoming/*" by location ("*" also matches "/", as in fnmatch).
+    Excluded directories are not entered and symbolic links to directories
+    are not followed.
+
+    Args:
+        root (str): Folder to scan
+        recursive (bool): Descend into subfolders (default: False)
+        include (list): Patterns a file must match (default: *.torrent)
+        exclude (list): Patterns of files and folders to skip (optional)
+        max_depth (int): Deepest subfolder level to enter when recursive;
+            0 scans only root (default: unlimited)
+
+    Yields:
+        str: Path of each matching file
+    """
+    include_patterns = [pattern.lower() for pattern in include]
+    exclude_patterns = [pattern.lower() for pattern in exclude]
+
+    def matches(patterns: list[str], name: str, relative: str) -> bool:
+        name, relative = name.lower(), relative.lower()
+        return any(fnmatchcase(name, pattern) or fnmatchcase(relative, pattern) for pattern in patterns)
+
+    # Depth-first walk keeping one open scandir iterator per level
+    stack = [(os.scandir(root), "", 0)]
+    try:
+        while stack:
+            entries, prefix, depth = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                entries.close()
+                stack.pop()
+                continue
+
+            relative = prefix + entry.name
+            if matches(exclude_patterns, entry.name, relative):
+                continue
+
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+
+            if is_dir:
+                if recursive and (max_depth is None or depth < max_depth):
+                    try:
+                        stack.append((os.scandir(entry.path), relative + "/", depth + 1))
+                    except OSError:
+                        # Unreadable folders are skipped rather than aborting the scan
+                        pass
+            elif matches(include_patterns, entry.name, relative):
+                yield entry.path
+    finally:
+        for entries, _, _ in stack:
+            entries.close()
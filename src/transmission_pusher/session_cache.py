@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Cross-process cache of Transmission session ids
+Lets short-lived invocations reuse the id negotiated by a previous one
+instead of starting with a 409 handshake
+"""
+
+import hashlib
+import logging
+import os
+import stat
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+def _uid() -> int | None:
+    """Get the user id, None on platforms without one (Windows)"""
+    return os.getuid() if hasattr(os, "getuid") else None
+
+
+def default_cache_dir() -> str:
+    """
+    Get the default cache directory
+
+    Returns:
+        str: $XDG_RUNTIME_DIR/transmission-pusher, or a per-user folder in the
+            temporary directory if XDG_RUNTIME_DIR is not set (on Windows the
+            temporary directory itself is per user)
+    """
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "transmission-pusher")
+    uid = _uid()
+    if uid is None:
+        return os.path.join(tempfile.gettempdir(), "transmission-pusher")
+    return os.path.join(tempfile.gettempdir(), f"transmission-pusher-{uid}")
+
+
+class SessionIdCache:
+    def __init__(self, directory: str | None = None) -> None:
+        """
+        Initialize a session id cache
+
+        Ids are stored one file per endpoint and user, named by a hash of
+        both. The directory is private to the user (0700) and the files are
+        0600 and replaced atomically. A directory that other users can
+        access, or that belongs to someone else, is not used. Without POSIX
+        user ids (Windows) the directory is trusted to be per user.
+
+        The cache is best effort: errors reading or writing it are logged at
+        debug level and otherwise ignored, the 409 handshake still works.
+
+        Args:
+            directory (str): Cache directory (default: see default_cache_dir)
+        """
+        self.directory = directory or default_cache_dir()
+
+    def path(self, endpoint: str, username: str | None = None) -> str:
+        """
+        Get the cache file of an endpoint and user
+
+        Args:
+            endpoint (str): RPC URL
+            username (str): User the id was negotiated for (optional)
+
+        Returns:
+            str: Path of the cache file
+        """
+        key = hashlib.sha256(f"{username or ''}\n{endpoint}".encode()).hexdigest()[:32]
+        return os.path.join(self.directory, f"{key}.session")
+
+    def _private_directory(self, create: bool) -> bool:
+        """Check the directory is ours and closed to others, creating it if asked"""
+        if create:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        try:
+            info = os.stat(self.directory)
+        except FileNotFoundError:
+            return False
+        uid = _uid()
+        if uid is None:
+            return stat.S_ISDIR(info.st_mode)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != uid or info.st_mode & 0o077:
+            logger.debug(f"Not using session id cache {self.directory}: not a private directory")
+            return False
+        return True
+
+    def load(self, endpoint: str, username: str | None = None) -> str | None:
+        """
+        Read the cached session id of an endpoint and user
+
+        Args:
+            endpoint (str): RPC URL
+            username (str): User the id was negotiated for (optional)
+
+        Returns:
+            str: The cached id, or None if there is none
+        """
+        try:
+            if not self._private_directory(create=False):
+                return None
+            with open(self.path(endpoint, username), encoding="ascii") as f:
+                session_id = f.read().strip()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not read cached session id: {e}")
+            return None
+        return session_id or None
+
+    def store(self, endpoint: str, username: str | None, session_id: str) -> None:
+        """
+        Cache the session id of an endpoint and user
+
+        Args:
+            endpoint (str): RPC URL
+            username (str): User the id was negotiated for (optional)
+            session_id (str): Id to cache
+        """
+        try:
+            if not self._private_directory(create=True):
+                return
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".session-", suffix=".tmp")
+            try:
+                # mkstemp creates the file 0600
+                with os.fdopen(fd, "w", encoding="ascii") as f:
+                    f.write(session_id)
+                os.replace(temp_path, self.path(endpoint, username))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not cache session id: {e}")
@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+Sharded ingestion across several Transmission daemons
+Places each torrent on one daemon by consistent hashing of its infohash, or
+on the daemon with the most headroom
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+from .bencode import BencodeError, file_info_hash, file_torrent_size, info_hash, torrent_size
+from .fields import resolve_fields
+from .limiter import AdaptiveLimiter
+from .retry import RetryPolicy
+from .transmission_client import TransmissionClient
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BackendError(Exception):
+    """Wraps an error raised while talking to one backend"""
+
+    def __init__(self, backend: str, error: Exception) -> None:
+        super().__init__(f"{backend}: {error}")
+        self.backend = backend
+        self.error = error
+
+
+class HashRing:
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 100) -> None:
+        """
+        Initialize a consistent hash ring
+
+        Every node is placed on the ring replicas times, so keys spread evenly
+        and adding or removing a node only moves about 1/N of the keys.
+
+        Args:
+            nodes (list): Node names
+            replicas (int): Virtual points per node (default: 100)
+        """
+        self.replicas = replicas
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> list[str]:
+        """Distinct nodes on the ring"""
+        return sorted(set(self._owners))
+
+    def add(self, node: str) -> None:
+        """Add a node to the ring"""
+        for replica in range(self.replicas):
+            point = _hash(f"{node}#{replica}")
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._owners.insert(index, node)
+
+    def remove(self, node: str) -> None:
+        """Remove a node from the ring"""
+        kept = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != node]
+        self._points = [point for point, _ in kept]
+        self._owners = [owner for _, owner in kept]
+
+    def node_for(self, key: str) -> str:
+        """
+        Find the node owning a key
+
+        Args:
+            key (str): Key to place, e.g. an infohash
+
+        Returns:
+            str: The first node clockwise from the key's position
+        """
+        if not self._points:
+            raise ValueError("The hash ring has no nodes")
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class BackendLoad:
+    """Snapshot of a daemon's capacity"""
+
+    def __init__(self, free_bytes: int, active_torrents: int, torrent_count: int) -> None:
+        """
+        Args:
+            free_bytes (int): Free space in the daemon's download folder
+            active_torrents (int): Torrents currently transferring
+            torrent_count (int): Torrents on the daemon
+        """
+        self.free_bytes = free_bytes
+        self.active_torrents = active_torrents
+        self.torrent_count = torrent_count
+        self.fetched = time.monotonic()
+        # Bytes placed on the daemon since the snapshot was taken
+        self.reserved = 0
+
+    def headroom(self, size: int = 0) -> float:
+        """
+        Score how well a torrent fits on the daemon
+
+        Args:
+            size (int): Payload size of the torrent in bytes
+
+        Returns:
+            float: Free bytes left after the torrent, shared among the active
+                torrents; negative if it doesn't fit
+        """
+        left = self.free_bytes - self.reserved - size
+        if left < 0:
+            return float(left)
+        return left / (self.active_torrents + 1)
+
+
+def _hash(value: str) -> int:
+    """Map a string to a position on the ring"""
+    return int.from_bytes(hashlib.sha1(value.encode("utf-8")).digest()[:8], "big")
+
+
+class ShardedTransmissionClient:
+    def __init__(
+        self,
+        base_urls: list[str],
+        username: str | None = None,
+        password: str | None = None,
+        jobs_per_backend: int = 4,
+        placement: str = "hash",
+        load_ttl: float = 10.0,
+        adaptive: bool = False,
+        retry: RetryPolicy | None = None,
+        **client_options: Any,
+    ) -> None:
+        """
+        Initialize a client spreading torrents over several daemons
+
+        Every backend has its own worker pool, so a slow or unreachable daemon
+        only delays the torrents placed on it.
+
+        With "hash" placement a torrent always lands on the same daemon. With
+        "load" placement it goes to the daemon with the most headroom (see
+        BackendLoad.headroom), sized from its local metainfo; the same torrent
+        may then land on different daemons across runs, so combine it with
+        known_hashes() to avoid duplicates.
+
+        Args:
+            base_urls (list): Complete base URLs of the daemons
+            username (str): Transmission username shared by all daemons (optional)
+            password (str): Transmission password shared by all daemons (optional)
+            jobs_per_backend (int): Concurrent uploads per daemon (default: 4)
+            placement (str): "hash" or "load" (default: hash)
+            load_ttl (float): Seconds to reuse a daemon's load snapshot (default: 10.0)
+            adaptive (bool): Give every daemon an AdaptiveLimiter capped at
+                jobs_per_backend (default: False)
+            retry (RetryPolicy): Retry policy shared by all daemons, each
+                with its own circuit breaker (optional)
+            **client_options: Further TransmissionClient options, e.g.
+                connect_timeout, read_timeout and deadline
+        """
+        if not base_urls:
+            raise ValueError("At least one backend is required")
+        if placement not in ("hash", "load"):
+            raise ValueError(f"Unknown placement: {placement}")
+
+        self.clients = {
+            url: TransmissionClient(
+                username=username,
+                password=password,
+                base_url=url,
+                pool_size=max(jobs_per_backend, 10),
+                limiter=AdaptiveLimiter(max_limit=jobs_per_backend) if adaptive else None,
+                retry=retry,
+                **client_options,
+            )
+            for url in base_urls
+        }
+        self.ring = HashRing(base_urls)
+        self._executors = {url: ThreadPoolExecutor(max_workers=jobs_per_backend) for url in base_urls}
+        # Uploads submitted to one backend and not finished yet, so a dead
+        # backend can't queue up a whole folder of futures
+        self._max_pending = jobs_per_backend * 2
+        self.placement = placement
+        self.load_ttl = load_ttl
+        # Load snapshots are fetched on their own pool so probes don't queue
+        # behind uploads; None marks a daemon that didn't answer
+        self._loads: dict[str, BackendLoad | None] = {}
+        self._load_times: dict[str, float] = {}
+        self._load_lock = threading.Lock()
+        self._probes = ThreadPoolExecutor(max_workers=len(base_urls))
+
+    def __enter__(self) -> "ShardedTransmissionClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the backend worker pools and close the connections"""
+        for executor in [*self._executors.values(), self._probes]:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for client in self.clients.values():
+            client.close()
+
+    def backend_for(self, torrent_file_path: str) -> str:
+        """
+        Pick the backend for a .torrent file
+
+        Args:
+            torrent_file_path (str): Path to the .torrent file
+
+        Returns:
+            str: Base URL of the backend; files that can't be parsed are
+                placed by file name instead of infohash
+        """
+        if self.placement == "load":
+            try:
+                size = file_torrent_size(torrent_file_path)
+            except (BencodeError, OSError):
+                size = 0
+            backend = self._least_loaded(size)
+            if backend is not None:
+                return backend
+
+        try:
+            key = file_info_hash(torrent_file_path)
+        except (BencodeError, OSError):
+            key = os.path.basename(torrent_file_path)
+        return self.ring.node_for(key)
+
+    def backend_for_metainfo(self, metainfo: bytes) -> str:
+        """
+        Pick the backend for the contents of a .torrent file
+
+        Args:
+            metainfo (bytes): Bencoded metainfo
+
+        Returns:
+            str: Base URL of the backend; metainfo that can't be parsed is
+                placed by a hash of the whole data
+        """
+        if self.placement == "load":
+            try:
+                size = torrent_size(metainfo)
+            except BencodeError:
+                size = 0
+            backend = self._least_loaded(size)
+            if backend is not None:
+                return backend
+
+        try:
+            key = info_hash(metainfo)
+        except BencodeError:
+            key = hashlib.sha1(metainfo).hexdigest()
+        return self.ring.node_for(key)
+
+    def backend_loads(self) -> dict[str, BackendLoad | None]:
+        """
+        Get the load of every backend, refreshing stale snapshots in parallel
+
+        Returns:
+            dict: Load snapshot per base URL, None for daemons that didn't answer
+        """
+        with self._load_lock:
+            now = time.monotonic()
+            stale = [url for url in self.clients if now - self._load_times.get(url, -self.load_ttl) >= self.load_ttl]
+            futures = {url: self._probes.submit(self._fetch_load, url) for url in stale}
+            for url, future in futures.items():
+                self._loads[url] = future.result()
+                self._load_times[url] = time.monotonic()
+            return dict(self._loads)
+
+    def _fetch_load(self, backend: str) -> BackendLoad | None:
+        """Query a daemon's free space and session statistics"""
+        client = self.clients[backend]
+        try:
+            stats = client.session_stats()
+            return BackendLoad(
+                free_bytes=client.free_space(),
+                active_torrents=int(stats.get("activeTorrentCount", 0)),
+                torrent_count=int(stats.get("torrentCount", 0)),
+            )
+        except Exception:
+            return None
+
+    def _least_loaded(self, size: int) -> str | None:
+        """Pick the backend with the most headroom and reserve size bytes on it"""
+        loads = self.backend_loads()
+        candidates = [(load.headroom(size), url) for url, load in loads.items() if load is not None]
+        if not candidates:
+            return None
+        # A torrent that fits nowhere still goes where the shortfall is smallest
+        _, backend = max(candidates)
+        load = loads[backend]
+        if load is not None:
+            with self._load_lock:
+                load.reserved += size
+        return backend
+
+    def add_torrent_file(
+        self, torrent_file_path: str, verbose: bool = True, known_hashes: set[str] | None = None
+    ) -> Any:
+        """
+        Add a .torrent file to its backend
+
+        Args:
+            torrent_file_path (str): Path to the .torrent file
+            verbose (bool): Print the outcome (default: True)
+            known_hashes (set): Infohashes to skip, see known_hashes() (optional)
+
+        Returns:
+            dict: API response, with the chosen backend under "backend"
+        """
+        backend = self.backend_for(torrent_file_path)
+        result = self.clients[backend].add_torrent_file(torrent_file_path, verbose, known_hashes)
+        result["backend"] = backend
+        return result
+
+    def add_torrent_metainfo(self, metainfo: bytes, verbose: bool = True) -> Any:
+        """
+        Add a torrent from the contents of a .torrent file to its backend
+
+        Args:
+            metainfo (bytes): Bencoded metainfo
+            verbose (bool): Print the outcome (default: True)
+
+        Returns:
+            dict: API response, with the chosen backend under "backend"
+        """
+        backend = self.backend_for_metainfo(metainfo)
+        result = self.clients[backend].add_torrent_metainfo(metainfo, verbose)
+        result["backend"] = backend
+        return result
+
+    def add_torrent_url(self, torrent_url: str) -> Any:
+        """
+        Add a torrent from a URL to the backend chosen by the URL
+
+        Args:
+            torrent_url (str): URL of the .torrent file
+
+        Returns:
+            dict: API response, with the chosen backend under "backend"
+        """
+        backend = self.ring.node_for(torrent_url)
+        result = self.clients[backend].add_torrent_url(torrent_url)
+        result["backend"] = backend
+        return result
+
+    def add_torrent_files(
+        self, paths: Iterable[str], known_hashes: set[str] | None = None
+    ) -> Iterator[tuple[str, Any, Exception | None]]:
+        """
+        Add many .torrent files, uploading to all backends in parallel
+
+        Results are yielded in completion order, so a slow backend never
+        holds back the results of the others. Each backend has at most
+        2 * jobs_per_backend uploads pending; further paths for a busy
+        backend are parked until one of its uploads finishes, while the
+        scan goes on placing paths on the other backends.
+
+        Args:
+            paths (iterable): Paths of the .torrent files
+            known_hashes (set): Infohashes to skip, see known_hashes() (optional)
+
+        Yields:
+            tuple: (path, result, error) where result carries the backend under
+                "backend" and error is a BackendError
+        """
+        completed: "queue.Queue[tuple[str, str, Future[Any]]]" = queue.Queue()
+        pending = dict.fromkeys(self.clients, 0)
+        parked: dict[str, deque[str]] = {url: deque() for url in self.clients}
+        remaining = 0
+
+        def submit(path: str, backend: str) -> None:
+            future = self._executors[backend].submit(self.clients[backend].add_torrent_file, path, False, known_hashes)
+            future.add_done_callback(lambda done: completed.put((path, backend, done)))
+
+        def finish(item: tuple[str, str, Future[Any]]) -> tuple[str, Any, Exception | None]:
+            backend = item[1]
+            if parked[backend]:
+                # Hand the freed slot to the backend's next parked path
+                submit(parked[backend].popleft(), backend)
+            else:
+                pending[backend] -= 1
+            return _unpack(*item)
+
+        for path in paths:
+            backend = self.backend_for(path)
+            remaining += 1
+            if pending[backend] < self._max_pending:
+                pending[backend] += 1
+                submit(path, backend)
+            else:
+                parked[backend].append(path)
+            # Report whatever finished meanwhile without waiting
+            while True:
+                try:
+                    item = completed.get_nowait()
+                except queue.Empty:
+                    break
+                remaining -= 1
+                yield finish(item)
+
+        while remaining:
+            remaining -= 1
+            yield finish(completed.get())
+
+    def _query_all(self, query: Callable[[TransmissionClient], T]) -> Iterator[tuple[str, T]]:
+        """
+        Run a query on every backend in parallel
+
+        Backends that fail are logged and skipped, so one unreachable daemon
+        doesn't hide the others.
+
+        Args:
+            query (callable): Function called with each backend's client
+
+        Yields:
+            tuple: (backend, result) in completion order
+
+        Raises:
+            BackendError: If every backend failed
+        """
+        futures = {self._probes.submit(query, client): backend for backend, client in self.clients.items()}
+        errors = []
+        for future in as_completed(futures):
+            backend = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                errors.append(BackendError(backend, e))
+                logger.warning(
+                    f"⚠️ Skipping backend {backend}: {e}",
+                    extra={"event": "backend-error", "backend": backend, "error": str(e)},
+                )
+                continue
+            yield backend, result
+        if len(errors) == len(futures):
+            raise errors[0]
+
+    def iter_torrents(self, fields: str | Iterable[str] | None = None) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over the torrents of every backend
+
+        The backends are listed in parallel and their torrents yielded as
+        each list completes. Backends that fail are logged and skipped.
+
+        Args:
+            fields (str or list): Preset name or torrent field names
+
+        Yields:
+            dict: One torrent at a time, with its backend under "backend"
+
+        Raises:
+            ValueError: If a preset or field name is unknown
+            BackendError: If no backend could be listed
+        """
+        field_list = resolve_fields(fields)
+        return self._iter_backend_torrents(field_list)
+
+    def _iter_backend_torrents(self, field_list: list[str]) -> Iterator[dict[str, Any]]:
+        """Generator behind iter_torrents, run once the fields are validated"""
+        for backend, torrents in self._query_all(lambda client: list(client.iter_torrents(fields=field_list))):
+            for torrent in torrents:
+                torrent["backend"] = backend
+                yield torrent
+
+    def known_hashes(self) -> set[str]:
+        """
+        Get the infohashes of every torrent on every backend
+
+        Backends that fail are logged and skipped.
+
+        Returns:
+            set: Lowercase hex infohashes
+
+        Raises:
+            BackendError: If no backend could be queried
+        """
+        hashes: set[str] = set()
+        for _, backend_hashes in self._query_all(lambda client: client.known_hashes()):
+            hashes |= backend_hashes
+        return hashes
+
+
+def _unpack(path: str, backend: str, future: Future[Any]) -> tuple[str, Any, Exception | None]:
+    """Turn a finished upload into (path, result, error)"""
+    try:
+        result = future.result()
+    except Exception as e:
+        return path, None, BackendError(backend, e)
+    result["backend"] = backend
+    return path, result, None
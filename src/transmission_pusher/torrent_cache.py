@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Client-side torrent state cache
+Keeps a mirror of the daemon's torrent list up to date using
+Transmission's "recently-active" torrent-get deltas
+"""
+
+import threading
+import time
+from typing import Any, Callable
+
+# torrent-get arguments in, torrent-get response arguments out
+TorrentGetter = Callable[[dict[str, Any]], dict[str, Any]]
+
+# Transmission only reports torrents active, and ids removed, in the last minute
+RECENTLY_ACTIVE_WINDOW = 60.0
+
+
+class TorrentStateCache:
+    def __init__(
+        self, torrent_get: TorrentGetter, fields: list[str], max_delta_age: float = RECENTLY_ACTIVE_WINDOW
+    ) -> None:
+        """
+        Initialize torrent state cache
+
+        The first refresh downloads the full torrent list; later refreshes
+        only request torrents that changed since the previous call and drop
+        the ids the daemon reports as removed. The daemon only remembers
+        changes for about a minute, so a refresh coming longer than
+        max_delta_age after the previous one downloads the full list again.
+
+        Args:
+            torrent_get (callable): Function performing a torrent-get call
+            fields (list): Torrent fields to keep ("id" is always included)
+            max_delta_age (float): Longest gap between refreshes, in seconds,
+                that is still bridged with a delta (default: 60)
+        """
+        self._torrent_get = torrent_get
+        self.fields = fields if "id" in fields else ["id", *fields]
+        self.max_delta_age = max_delta_age
+        self._torrents: dict[int, dict[str, Any]] = {}
+        # When the last refresh was requested, None until the first full sync
+        self._synced_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def torrents(self) -> list[dict[str, Any]]:
+        """Cached torrents, in the order the daemon first reported them"""
+        with self._lock:
+            return list(self._torrents.values())
+
+    def invalidate(self) -> None:
+        """Forget the cached state so the next refresh does a full sync"""
+        with self._lock:
+            self._torrents.clear()
+            self._synced_at = None
+
+    def refresh(self) -> list[dict[str, Any]]:
+        """
+        Bring the cache up to date with the daemon
+
+        Returns:
+            list of dicts: Cached torrents after applying the changes
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._synced_at is not None and now - self._synced_at < self.max_delta_age:
+                self._apply_delta()
+            else:
+                self._full_sync()
+            self._synced_at = now
+            return list(self._torrents.values())
+
+    def _full_sync(self) -> None:
+        """Replace the cache with the complete torrent list"""
+        arguments = self._torrent_get({"fields": self.fields})
+        self._torrents = {t["id"]: t for t in _torrent_dicts(arguments)}
+
+    def _apply_delta(self) -> None:
+        """Merge torrents changed since the last call and drop removed ones"""
+        arguments = self._torrent_get({"fields": self.fields, "ids": "recently-active"})
+        for torrent in _torrent_dicts(arguments):
+            self._torrents[torrent["id"]] = torrent
+        for torrent_id in arguments.get("removed", []):
+            self._torrents.pop(torrent_id, None)
+
+
+def _torrent_dicts(arguments: dict[str, Any]) -> list[dict[str, Any]]:
+    """Extract the well-formed torrents from torrent-get response arguments"""
+    torrents = arguments.get("torrents", [])
+    if not isinstance(torrents, list):
+        return []
+    return [t for t in torrents if isinstance(t, dict) and "id" in t]
@@ -6,14 +6,245 @@ Uses Transmission's REST API to add torrents
 
 import argparse
 import base64
+import logging
+import mmap
 import os
-from typing import Any
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, TypeVar
 
-import requests
-from dotenv import load_dotenv
+from .bencode import BencodeError, file_info_hash
+from .fields import resolve_fields
+from .lazy import LazyModule
+from .limiter import AdaptiveLimiter
+from .log import configure_logging, summary
+from .metrics import (
+    ADD_OUTCOMES,
+    CONCURRENCY_LIMIT,
+    CONCURRENCY_P95,
+    REGISTRY,
+    RPC_DURATION,
+    RPC_IN_FLIGHT,
+    RPC_REQUEST_BYTES,
+    RPC_REQUESTS,
+    RPC_RESPONSE_BYTES,
+    RPC_RETRIES,
+    MetricsServer,
+)
+from .scan import DEFAULT_INCLUDE, iter_torrent_files
+from .session_cache import SessionIdCache
+from .torrent_cache import TorrentStateCache
+from .watch import create_watcher
 
-# Load environment variables
-load_dotenv()
+if TYPE_CHECKING:
+    import requests
+
+    from .retry import RetryPolicy
+else:
+    # Imported on first use, keeping startup cheap for --help and bad arguments
+    requests = LazyModule("requests")
+
+# Named explicitly so records reach the package logger when run with python -m
+logger = logging.getLogger("transmission_pusher.transmission_client")
+
+SESSION_ID_HEADER = "X-Transmission-Session-Id"
+
+# Maximum number of torrent ids or hashes sent in a single torrent-get
+ID_CHUNK_SIZE = 500
+
+T = TypeVar("T")
+R = TypeVar("R")
+D = TypeVar("D", float, None)
+
+
+def add_outcome(result: Any) -> str:
+    """
+    Classify the result of a torrent-add call
+
+    Args:
+        result (dict): API response returned by add_torrent_file/add_torrent_url
+
+    Returns:
+        str: "added", "duplicate" (already on the daemon), "skipped" (known
+            duplicate that was never uploaded) or "error"
+    """
+    if result.get("skipped"):
+        return "skipped"
+    if result.get("result") != "success":
+        return "error"
+    if "torrent-duplicate" in result.get("arguments", {}):
+        return "duplicate"
+    return "added"
+
+
+def log_add_result(result: Any, details: bool = True, **fields: Any) -> None:
+    """
+    Log the outcome of a torrent-add call
+
+    The record carries the outcome and the torrent's id, hash and name as
+    structured fields for the JSON log format.
+
+    Args:
+        result (dict): API response
+        details (bool): Also show the torrent ID and hash (default: True)
+        **fields: Further structured fields, e.g. path or duration
+    """
+    outcome = add_outcome(result)
+    arguments = result.get("arguments", {})
+    torrent_info = arguments.get("torrent-added") or arguments.get("torrent-duplicate") or {}
+    fields = {"event": "torrent-add", "outcome": outcome, **fields}
+    for key, field in (("id", "torrent_id"), ("hashString", "hash"), ("name", "torrent_name")):
+        if torrent_info.get(key) is not None:
+            fields[field] = torrent_info[key]
+    if "backend" in result:
+        fields["backend"] = result["backend"]
+
+    if outcome == "added":
+        if torrent_info:
+            lines = [f"✅ Torrent added successfully: {torrent_info.get('name', 'N/A')}"]
+            if details:
+                lines += [f"   ID: {torrent_info.get('id')}", f"   Hash: {torrent_info.get('hashString')}"]
+        else:
+            lines = ["✅ Torrent added successfully"]
+    elif outcome == "duplicate":
+        lines = [f"⚠️ Torrent already exists: {torrent_info.get('name', 'N/A')}"]
+        if details:
+            lines.append(f"   Hash: {torrent_info.get('hashString')}")
+    elif outcome == "skipped":
+        lines = [f"⏭️ Skipped, already on Transmission: {torrent_info.get('hashString')}"]
+    else:
+        lines = [f"❌ Error adding torrent: {result}"]
+        fields["error"] = str(result.get("result"))
+
+    if "backend" in result:
+        lines.append(f"   Backend: {result['backend']}")
+    logger.log(logging.ERROR if outcome == "error" else logging.INFO, "\n".join(lines), extra=fields)
+
+
+def run_ordered(
+    func: Callable[[T], R], items: Iterable[T], jobs: int = 1
+) -> Iterator[tuple[T, R | None, Exception | None]]:
+    """
+    Apply func to every item on a bounded thread pool
+
+    Results are yielded in input order whatever the number of workers, and
+    at most ``jobs * 2`` items are in flight at any time.
+
+    Args:
+        func (callable): Function to call for each item
+        items (iterable): Items to process
+        jobs (int): Number of worker threads (default: 1)
+
+    Yields:
+        tuple: (item, result, error) where exactly one of result/error is set
+    """
+    jobs = max(1, jobs)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending: deque[tuple[T, Future[R]]] = deque()
+        for item in items:
+            pending.append((item, executor.submit(func, item)))
+            if len(pending) >= jobs * 2:
+                done, future = pending.popleft()
+                yield _collect(done, future.result)
+        while pending:
+            done, future = pending.popleft()
+            yield _collect(done, future.result)
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    """
+    Split items into lists of at most size elements
+
+    Args:
+        items (iterable): Items to split
+        size (int): Maximum chunk length
+
+    Yields:
+        list: Consecutive chunks of items
+    """
+    chunk: list[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def decode_table(rows: list[Any]) -> list[dict[str, Any]]:
+    """
+    Decode a table-format torrent-get result into a list of dicts
+
+    Args:
+        rows (list): Header row of field names followed by one row per torrent
+
+    Returns:
+        list of dicts: List of torrents
+    """
+    header = rows[0]
+    return [dict(zip(header, row)) for row in rows[1:] if isinstance(row, list)]
+
+
+def _torrent_list(arguments: dict[str, Any]) -> list[dict[str, Any]]:
+    """Extract the torrents from torrent-get response arguments"""
+    torrents = arguments.get("torrents", [])
+    if not isinstance(torrents, list):
+        return []
+    return [t for t in torrents if isinstance(t, dict)]
+
+
+def _request_size(kwargs: dict[str, Any], response: "requests.Response") -> int:
+    """Get the size of a sent request body"""
+    if isinstance(kwargs.get("data"), MetainfoBody):
+        return len(kwargs["data"])
+    # JSON bodies are serialized by requests; read the length it sent
+    request = getattr(response, "request", None)
+    length = getattr(request, "headers", {}).get("Content-Length") if request is not None else None
+    return int(length) if isinstance(length, str) and length.isdigit() else 0
+
+
+def _collect(item: T, result: Callable[[], R]) -> tuple[T, R | None, Exception | None]:
+    """Wait for a result, e.g. Future.result, and unpack it into (item, result, error)"""
+    try:
+        return item, result(), None
+    except Exception as e:
+        return item, None, e
+
+
+class MetainfoBody:
+    """
+    JSON body of a torrent-add request, base64-encoding a .torrent file on the fly
+
+    Iterating yields the request body in pieces, so at most one chunk of the
+    file is held in memory. The body length is known up front, so it can be
+    sent with a Content-Length header, and iterating again (e.g. to retry
+    after a 409) re-reads the file.
+    """
+
+    # A multiple of 3 so every chunk but the last encodes without padding
+    CHUNK_SIZE = 3 * 64 * 1024
+
+    PREFIX = b'{"method": "torrent-add", "arguments": {"metainfo": "'
+    SUFFIX = b'"}}'
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.size = os.path.getsize(path)
+
+    def __len__(self) -> int:
+        return len(self.PREFIX) + 4 * ((self.size + 2) // 3) + len(self.SUFFIX)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self.PREFIX
+        if self.size:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for offset in range(0, len(data), self.CHUNK_SIZE):
+                    yield base64.b64encode(data[offset : offset + self.CHUNK_SIZE])
+        yield self.SUFFIX
 
 
 class TransmissionClient:
@@ -24,6 +255,14 @@ class TransmissionClient:
         username: str | None = None,
         password: str | None = None,
         base_url: str | None = None,
+        pool_size: int = 10,
+        table_format: bool | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        retry: "RetryPolicy | None" = None,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 60.0,
+        deadline: float | None = None,
+        session_cache: SessionIdCache | None = None,
     ) -> None:
         """
         Initialize Transmission client
@@ -34,6 +273,23 @@ class TransmissionClient:
             username (str): Transmission username (optional)
             password (str): Transmission password (optional)
             base_url (str): Complete base URL (optional, overrides host/port)
+            pool_size (int): Maximum number of pooled connections (default: 10)
+            table_format (bool): Request torrent-get results in the compact
+                table format (RPC version 16+). None detects support from the
+                daemon's first answer (default: None)
+            limiter (AdaptiveLimiter): Limits concurrent RPCs by observed
+                latency; callers beyond the limit wait (optional)
+            retry (RetryPolicy): Retries connection errors, 409 and 5xx
+                answers with backoff and fails fast while the daemon's
+                circuit is open (optional)
+            connect_timeout (float): Seconds to wait for a connection (default: 10.0)
+            read_timeout (float): Seconds to wait for each read from the
+                daemon (default: 60.0)
+            deadline (float): Seconds a whole call may take, including the
+                session-id handshake and retries (optional)
+            session_cache (SessionIdCache): Starts from the session-id last
+                negotiated by any process and stores new ones, saving the
+                409 handshake while the cached id is still valid (optional)
         """
         if base_url:
             # If a complete base URL is provided, use it
@@ -45,68 +301,273 @@ class TransmissionClient:
 
         self.session = requests.Session()
 
+        # Keep enough connections alive for concurrent callers sharing the session
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
         if username and password:
             self.session.auth = (username, password)
 
-        # Get session-id on first call
-        self._get_session_id()
+        # The session-id is negotiated lazily by the first RPC (see _post)
+        self.session_cache = session_cache
+        self._username = username
+        self._handshake_lock = threading.Lock()
+        if session_cache is not None:
+            cached = session_cache.load(self.base_url, username)
+            if cached:
+                self.session.headers.update({SESSION_ID_HEADER: cached})
+
+        self._caches: dict[tuple[str, ...], TorrentStateCache] = {}
+        self.table_format = table_format
+        self.limiter = limiter
+        self.retry = retry
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+
+    def close(self) -> None:
+        """Close the HTTP connections"""
+        self.session.close()
+
+    def _update_session_id(self, response: "requests.Response") -> bool:
+        """Store the session-id from a 409 response, returning True if one was found"""
+        session_id = response.headers.get(SESSION_ID_HEADER)
+        if session_id:
+            self.session.headers.update({SESSION_ID_HEADER: session_id})
+            if self.session_cache is not None:
+                self.session_cache.store(self.base_url, self._username, session_id)
+            return True
+        return False
+
+    def _post(self, data: dict[str, Any] | None = None, body: MetainfoBody | None = None) -> "requests.Response":
+        """
+        Make a request to the Transmission API
+
+        A 409 response means the session-id is missing (first call) or has
+        been rotated by the daemon; the new id is stored on the session and
+        the request retried once. A streamed body is only sent once an id is
+        known, so a cold client doesn't upload it just to be refused. Other
+        transient failures are retried according to the retry policy, if any.
 
-    def _get_session_id(self) -> None:
-        """Gets the session-id required for API calls"""
+        Every request is bounded by the connect and read timeouts, shortened
+        to what is left of the deadline if one is set.
+
+        Args:
+            data (dict): JSON data to send
+            body (MetainfoBody): Pre-encoded JSON request body to stream
+                instead of data (optional)
+
+        Returns:
+            requests.Response: Successful HTTP response
+        """
+        if body is not None:
+            kwargs: dict[str, Any] = {"data": body, "headers": {"Content-Type": "application/json"}}
+        else:
+            kwargs = {"json": data}
+
+        method = str(data["method"]) if data is not None else "torrent-add"
+        expires = None if self.deadline is None else time.monotonic() + self.deadline
+        attempts = 0
+
+        def attempt() -> "requests.Response":
+            nonlocal attempts
+            if attempts:
+                RPC_RETRIES.inc(method=method)
+            attempts += 1
+            if body is not None and SESSION_ID_HEADER not in self.session.headers:
+                self._handshake(expires)
+            response = self._send(kwargs, method, expires)
+            if response.status_code == 409 and self._update_session_id(response):
+                response = self._send(kwargs, method, expires)
+            response.raise_for_status()
+            return response
+
+        if self.retry is None:
+            return attempt()
+        return self.retry.call(attempt, self.base_url, expires)
+
+    def _handshake(self, expires: float | None) -> None:
+        """Negotiate the session-id with a small session-get request"""
+        with self._handshake_lock:
+            # Concurrent uploads wait for the first caller's handshake
+            if SESSION_ID_HEADER in self.session.headers:
+                return
+            request = {"json": {"method": "session-get", "arguments": {"fields": ["version"]}}}
+            response = self._send(request, "session-get", expires)
+            if not (response.status_code == 409 and self._update_session_id(response)):
+                response.raise_for_status()
+
+    def _deadline_exceeded(self) -> Exception:
+        """Build the error raised once the deadline has passed"""
+        from .retry import DeadlineExceeded
+
+        return DeadlineExceeded(f"Deadline of {self.deadline}s exceeded calling {self.base_url}")
+
+    def _timeout(self, expires: float | None) -> tuple[float, float]:
+        """Get the (connect, read) timeout of a request, clipped to the deadline"""
+        if expires is None:
+            return self.connect_timeout, self.read_timeout
+        remaining = expires - time.monotonic()
+        if remaining <= 0:
+            raise self._deadline_exceeded()
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+
+    def _send(self, kwargs: dict[str, Any], method: str, expires: float | None = None) -> "requests.Response":
+        """Send one POST, holding a limiter slot and recording its latency"""
+        started = None
+        if self.limiter is not None:
+            # Waiting for a slot counts against the deadline
+            started = self.limiter.acquire(None if expires is None else max(0.0, expires - time.monotonic()))
+            if started is None:
+                raise self._deadline_exceeded()
         try:
-            response = self.session.get(self.base_url)
-            if response.status_code == 409:  # Conflict - session-id required
-                session_id = response.headers.get("X-Transmission-Session-Id")
-                if session_id:
-                    self.session.headers.update({"X-Transmission-Session-Id": session_id})
-        except requests.exceptions.RequestException as e:
-            print(f"Error connecting to Transmission: {e}")
+            kwargs = dict(kwargs, timeout=self._timeout(expires))
+        except BaseException:
+            if self.limiter is not None:
+                self.limiter.cancel()
+            raise
+        RPC_IN_FLIGHT.inc(method=method)
+        sent = time.monotonic()
+        overloaded = False
+        try:
+            response = self.session.post(self.base_url, **kwargs)
+            overloaded = response.status_code >= 500
+        except requests.exceptions.RequestException:
+            # Connection errors and timeouts are the daemon's way of saying "too much"
+            overloaded = True
+            RPC_REQUESTS.inc(method=method, status="error")
             raise
+        finally:
+            RPC_IN_FLIGHT.dec(method=method)
+            RPC_DURATION.observe(time.monotonic() - sent, method=method)
+            if self.limiter is not None and started is not None:
+                self.limiter.release(started, ok=not overloaded)
+                CONCURRENCY_LIMIT.set(self.limiter.limit, endpoint=self.base_url)
+                CONCURRENCY_P95.set(self.limiter.p95 or 0.0, endpoint=self.base_url)
+
+        duration = time.monotonic() - sent
+        bytes_sent = _request_size(kwargs, response)
+        bytes_received = len(response.content) if isinstance(response.content, bytes) else 0
+        RPC_REQUESTS.inc(method=method, status=str(response.status_code))
+        RPC_REQUEST_BYTES.inc(bytes_sent, method=method)
+        RPC_RESPONSE_BYTES.inc(bytes_received, method=method)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"   RPC {method}: HTTP {response.status_code} in {duration * 1000:.1f} ms",
+                extra={
+                    "event": "rpc",
+                    "method": method,
+                    "status": response.status_code,
+                    "duration": round(duration, 6),
+                    "bytes_sent": bytes_sent,
+                    "bytes_received": bytes_received,
+                },
+            )
+        return response
 
-    def add_torrent_file(self, torrent_file_path: str) -> Any:
+    def add_torrent_file(
+        self, torrent_file_path: str, verbose: bool = True, known_hashes: set[str] | None = None
+    ) -> Any:
         """
         Add a .torrent file to Transmission
 
         Args:
             torrent_file_path (str): Path to the .torrent file
+            verbose (bool): Log the outcome (default: True)
+            known_hashes (set): Infohashes already on the daemon, see
+                known_hashes(). A file whose infohash is in the set is not
+                uploaded, and the hashes of added torrents are added to it
+                (optional)
 
         Returns:
-            dict: API response
+            dict: API response; a skipped file returns a torrent-duplicate
+                result with "skipped" set
         """
         if not os.path.exists(torrent_file_path):
             raise FileNotFoundError(f"File {torrent_file_path} does not exist")
 
-        # Read and encode the .torrent file in base64
-        with open(torrent_file_path, "rb") as f:
-            torrent_data = base64.b64encode(f.read()).decode("utf-8")
+        started = time.monotonic()
+        torrent_hash = None
+        if known_hashes is not None:
+            try:
+                torrent_hash = file_info_hash(torrent_file_path)
+            except BencodeError:
+                # Let the daemon report what is wrong with the file
+                pass
+            if torrent_hash in known_hashes:
+                result = {
+                    "result": "success",
+                    "arguments": {"torrent-duplicate": {"hashString": torrent_hash}},
+                    "skipped": True,
+                }
+                ADD_OUTCOMES.inc(outcome="skipped")
+                if verbose:
+                    log_add_result(result, path=torrent_file_path)
+                return result
+
+        # The file is base64-encoded chunk by chunk while the request is sent
+        body = MetainfoBody(torrent_file_path)
+
+        try:
+            response = self._post(body=body)
+
+            result = response.json()
+            outcome = add_outcome(result)
+            ADD_OUTCOMES.inc(outcome=outcome)
+            if known_hashes is not None and torrent_hash and outcome != "error":
+                known_hashes.add(torrent_hash)
+            if verbose:
+                log_add_result(
+                    result,
+                    path=torrent_file_path,
+                    bytes_sent=len(body),
+                    duration=round(time.monotonic() - started, 6),
+                )
+            return result
 
-        # Prepare data for the API
+        except requests.exceptions.RequestException as e:
+            ADD_OUTCOMES.inc(outcome="error")
+            if verbose:
+                logger.error(
+                    f"❌ Error communicating with Transmission: {e}",
+                    extra={"event": "torrent-add", "outcome": "error", "path": torrent_file_path, "error": str(e)},
+                )
+            raise
+
+    def add_torrent_metainfo(self, metainfo: bytes, verbose: bool = True) -> Any:
+        """
+        Add a torrent from the contents of a .torrent file
+
+        Args:
+            metainfo (bytes): Bencoded metainfo, e.g. an uploaded .torrent file
+            verbose (bool): Log the outcome (default: True)
+
+        Returns:
+            dict: API response
+        """
+        started = time.monotonic()
         data = {
             "method": "torrent-add",
-            "arguments": {"metainfo": torrent_data},
+            "arguments": {"metainfo": base64.b64encode(metainfo).decode("ascii")},
         }
 
         try:
-            response = self.session.post(self.base_url, json=data)
-            response.raise_for_status()
+            response = self._post(data)
 
             result = response.json()
-
-            if result.get("result") == "success":
-                torrent_info = result.get("arguments", {}).get("torrent-added", {})
-                if torrent_info:
-                    print(f"✅ Torrent added successfully: {torrent_info.get('name', 'N/A')}")
-                    print(f"   ID: {torrent_info.get('id')}")
-                    print(f"   Hash: {torrent_info.get('hashString')}")
-                else:
-                    print("✅ Torrent added successfully")
-                return result
-            else:
-                print(f"❌ Error adding torrent: {result}")
-                return result
+            ADD_OUTCOMES.inc(outcome=add_outcome(result))
+            if verbose:
+                log_add_result(result, bytes_sent=len(metainfo), duration=round(time.monotonic() - started, 6))
+            return result
 
         except requests.exceptions.RequestException as e:
-            print(f"❌ Error communicating with Transmission: {e}")
+            ADD_OUTCOMES.inc(outcome="error")
+            if verbose:
+                logger.error(
+                    f"❌ Error communicating with Transmission: {e}",
+                    extra={"event": "torrent-add", "outcome": "error", "error": str(e)},
+                )
             raise
 
     def add_torrent_url(self, torrent_url: str) -> Any:
@@ -125,63 +586,436 @@ class TransmissionClient:
         }
 
         try:
-            response = self.session.post(self.base_url, json=data)
-            response.raise_for_status()
+            response = self._post(data)
 
             result = response.json()
-
-            if result.get("result") == "success":
-                torrent_info = result.get("arguments", {}).get("torrent-added", {})
-                if torrent_info:
-                    print(f"✅ Torrent added successfully: {torrent_info.get('name', 'N/A')}")
-                else:
-                    print("✅ Torrent added successfully")
-                return result
-            else:
-                print(f"❌ Error adding torrent: {result}")
-                return result
+            ADD_OUTCOMES.inc(outcome=add_outcome(result))
+            log_add_result(result, details=False, url=torrent_url)
+            return result
 
         except requests.exceptions.RequestException as e:
-            print(f"❌ Error communicating with Transmission: {e}")
+            ADD_OUTCOMES.inc(outcome="error")
+            logger.error(
+                f"❌ Error communicating with Transmission: {e}",
+                extra={"event": "torrent-add", "outcome": "error", "url": torrent_url, "error": str(e)},
+            )
             raise
 
-    def get_torrents(self) -> list[dict[str, Any]]:
+    def _call(self, method: str, arguments: dict[str, Any] | None = None) -> dict[str, Any]:
+        """
+        Perform an RPC call and return its response arguments
+
+        Args:
+            method (str): RPC method name
+            arguments (dict): Request arguments (optional)
+
+        Returns:
+            dict: Response arguments
+
+        Raises:
+            RuntimeError: If the daemon reports an error
+        """
+        data: dict[str, Any] = {"method": method}
+        if arguments:
+            data["arguments"] = arguments
+        result = self._post(data).json()
+        if result.get("result") != "success":
+            raise RuntimeError(f"{method} failed: {result.get('result')}")
+        response_arguments = result.get("arguments", {})
+        return response_arguments if isinstance(response_arguments, dict) else {}
+
+    def session_get(self, fields: Iterable[str] | None = None) -> dict[str, Any]:
+        """
+        Get the daemon's session settings
+
+        Args:
+            fields (list): Setting names to request, e.g. ["download-dir"]
+                (default: all settings)
+
+        Returns:
+            dict: Session settings
+        """
+        return self._call("session-get", {"fields": list(fields)} if fields else None)
+
+    def session_stats(self) -> dict[str, Any]:
+        """
+        Get the daemon's session statistics
+
+        Returns:
+            dict: Statistics such as activeTorrentCount, pausedTorrentCount,
+                torrentCount, downloadSpeed and uploadSpeed
+        """
+        return self._call("session-stats")
+
+    def free_space(self, path: str | None = None) -> int:
+        """
+        Get the free space of a folder on the daemon's host
+
+        Args:
+            path (str): Folder on the daemon's host (default: its download-dir)
+
+        Returns:
+            int: Free space in bytes
+        """
+        if path is None:
+            path = self.session_get(["download-dir"])["download-dir"]
+        return int(self._call("free-space", {"path": path})["size-bytes"])
+
+    def _torrent_get(self, arguments: dict[str, Any]) -> dict[str, Any]:
+        """
+        Perform a torrent-get call
+
+        Args:
+            arguments (dict): torrent-get request arguments
+
+        Returns:
+            dict: torrent-get response arguments, with table-format results
+                decoded back into a list of dicts
+        """
+        if self.table_format is not False:
+            arguments = dict(arguments, format="table")
+
+        response = self._post({"method": "torrent-get", "arguments": arguments})
+        result = response.json()
+        response_arguments = result.get("arguments", {})
+        if not isinstance(response_arguments, dict):
+            return {}
+
+        torrents = response_arguments.get("torrents")
+        if "format" in arguments and isinstance(torrents, list) and torrents:
+            if isinstance(torrents[0], list):
+                response_arguments["torrents"] = decode_table(torrents)
+            elif self.table_format is None:
+                # Daemons older than RPC version 16 ignore "format" and answer
+                # with objects; stop asking for the table format
+                self.table_format = False
+        return response_arguments
+
+    def get_torrents(
+        self,
+        fields: str | Iterable[str] | None = None,
+        cached: bool = False,
+        ids: int | str | Iterable[int | str] | None = None,
+    ) -> list[dict[str, Any]]:
         """
         Get the list of torrents
 
+        Args:
+            fields (str or list): Preset name (minimal, list, default, full) or
+                torrent field names to request (default: id, name, status,
+                percentDone and downloadDir)
+            cached (bool): Serve the list from a client-side cache that is
+                refreshed with "recently-active" deltas after the first call,
+                or fully if the previous call is more than a minute old
+                (default: False)
+            ids (list): Only return these torrents, given by id or hash string,
+                or a single id or hash. Long lists are split into several
+                requests (optional)
+
         Returns:
             list of dicts: List of torrents
+
+        Raises:
+            ValueError: If a preset or field name is unknown, or if ids is
+                combined with cached
         """
-        data = {
-            "method": "torrent-get",
-            "arguments": {
-                "fields": [
-                    "id",
-                    "name",
-                    "status",
-                    "percentDone",
-                    "downloadDir",
-                ]
-            },
-        }
+        field_list = resolve_fields(fields)
+        if cached and ids is not None:
+            raise ValueError("ids cannot be combined with cached")
 
         try:
-            response = self.session.post(self.base_url, json=data)
-            response.raise_for_status()
+            if cached:
+                key = tuple(field_list)
+                if key not in self._caches:
+                    self._caches[key] = TorrentStateCache(self._torrent_get, field_list)
+                return self._caches[key].refresh()
 
-            result = response.json()
-            torrents = result.get("arguments", {}).get("torrents", [])
-            if not isinstance(torrents, list):
-                return []
-            return [t for t in torrents if isinstance(t, dict)]
+            if ids is None:
+                return _torrent_list(self._torrent_get({"fields": field_list}))
+            if isinstance(ids, (int, str)):
+                ids = [ids]
+
+            torrents = []
+            for chunk in chunked(ids, ID_CHUNK_SIZE):
+                torrents.extend(_torrent_list(self._torrent_get({"fields": field_list, "ids": chunk})))
+            return torrents
 
         except requests.exceptions.RequestException as e:
-            print(f"❌ Error getting torrents: {e}")
+            logger.error(f"❌ Error getting torrents: {e}", extra={"event": "torrent-get", "error": str(e)})
             raise
 
+    def iter_torrents(
+        self, fields: str | Iterable[str] | None = None, chunk_size: int = ID_CHUNK_SIZE
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over all torrents, fetching them a page at a time
+
+        Only the torrent ids are downloaded up front; the requested fields are
+        then fetched chunk_size torrents per request, so memory use does not
+        grow with the number of torrents on the daemon. Torrents removed while
+        iterating are skipped.
+
+        Args:
+            fields (str or list): Preset name (minimal, list, default, full) or
+                torrent field names to request (default: id, name, status,
+                percentDone and downloadDir)
+            chunk_size (int): Number of torrents fetched per request
+                (default: ID_CHUNK_SIZE)
+
+        Yields:
+            dict: One torrent at a time
+
+        Raises:
+            ValueError: If a preset or field name is unknown, or chunk_size < 1
+        """
+        field_list = resolve_fields(fields)
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        return self._iter_torrent_pages(field_list, chunk_size)
+
+    def _iter_torrent_pages(self, field_list: list[str], chunk_size: int) -> Iterator[dict[str, Any]]:
+        """Generator behind iter_torrents, run once its arguments are validated"""
+        try:
+            ids = [t["id"] for t in _torrent_list(self._torrent_get({"fields": ["id"]})) if "id" in t]
+            for chunk in chunked(ids, chunk_size):
+                yield from _torrent_list(self._torrent_get({"fields": field_list, "ids": chunk}))
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"❌ Error getting torrents: {e}", extra={"event": "torrent-get", "error": str(e)})
+            raise
+
+    def known_hashes(self) -> set[str]:
+        """
+        Get the infohashes of every torrent on the daemon
+
+        Returns:
+            set: Lowercase hex infohashes, suitable for add_torrent_file
+        """
+        return {t["hashString"].lower() for t in self.iter_torrents(fields=["hashString"]) if "hashString" in t}
+
+
+def _process_folder(client: Any, folder_path: str, args: argparse.Namespace) -> int:
+    """
+    Upload every .torrent file in a folder
+
+    Files are uploaded while the folder is still being scanned, so memory
+    use does not depend on the number of files.
+
+    Args:
+        client (TransmissionClient): Client to upload with, or a ShardedTransmissionClient
+        folder_path (str): Folder to scan
+        args (argparse.Namespace): Parsed command line options
+
+    Returns:
+        int: Exit code
+    """
+    from .journal import IngestJournal
+
+    journal = IngestJournal(args.journal) if args.journal else None
+    found = 0
+    journaled = 0
+
+    def pending() -> Iterator[str]:
+        nonlocal found, journaled
+        candidates = iter_torrent_files(
+            folder_path,
+            recursive=args.recursive or args.max_depth is not None,
+            include=args.include or DEFAULT_INCLUDE,
+            exclude=args.exclude or (),
+            max_depth=args.max_depth,
+        )
+        for path in candidates:
+            found += 1
+            if journal is not None and journal.is_done(path):
+                journaled += 1
+                continue
+            yield path
+
+    try:
+        known_hashes = None
+        if args.skip_existing:
+            known_hashes = client.known_hashes()
+            logger.info(f"🔎 {len(known_hashes)} torrents already on Transmission")
+
+        # Process each .torrent file, uploading up to --jobs files at a time.
+        # Results are reported in scan order regardless of completion order.
+        def add_quietly(path: str) -> Any:
+            return client.add_torrent_file(path, verbose=False, known_hashes=known_hashes)
+
+        # Sharded clients upload to every backend at once and report files as
+        # they finish, so one slow daemon doesn't hold back the others
+        from .sharding import ShardedTransmissionClient
+
+        if isinstance(client, ShardedTransmissionClient):
+            results = client.add_torrent_files(pending(), known_hashes=known_hashes)
+        else:
+            results = run_ordered(add_quietly, pending(), args.jobs)
+
+        counts = {"added": 0, "duplicate": 0, "skipped": 0, "error": 0}
+        for torrent_file, result, error in results:
+            logger.info(f"\n📁 Adding: {os.path.basename(torrent_file)}")
+            if error is not None:
+                logger.error(
+                    f"❌ Error adding {os.path.basename(torrent_file)}: {error}",
+                    extra={"event": "torrent-add", "outcome": "error", "path": torrent_file, "error": str(error)},
+                )
+                counts["error"] += 1
+                if journal is not None:
+                    journal.record(torrent_file, "error", error=str(error))
+                continue
+
+            log_add_result(result, path=torrent_file)
+            outcome = add_outcome(result)
+            counts[outcome] += 1
+            if journal is not None:
+                journal.record(torrent_file, outcome, infohash=_result_hash(result), error=_result_error(result))
+    finally:
+        if journal is not None:
+            journal.close()
+
+    if not found:
+        logger.error("❌ No .torrent files found in the folder", extra=summary())
+        return 1
+
+    logger.info(f"\n📦 Found {found} .torrent files", extra=summary(found=found))
+    if journal is not None:
+        logger.info(
+            f"📓 {journaled} files already completed according to the journal", extra=summary(journaled=journaled)
+        )
+
+    breakdown = f"{counts['duplicate']} duplicates, {counts['skipped']} skipped, {counts['error']} errors"
+    if journal is not None:
+        breakdown += f", {journaled} already journaled"
+    logger.info(
+        f"✅ Successfully added {counts['added']}/{found} torrents ({breakdown})",
+        extra=summary(event="folder-summary", found=found, **counts),
+    )
+    if args.adaptive:
+        for name, limiter in _limiters(client):
+            stats = limiter.snapshot()
+            p95 = f"{stats['p95'] * 1000:.0f} ms" if stats["p95"] is not None else "n/a"
+            logger.info(f"⚙️ Concurrency{name}: limit {stats['limit']}, p95 latency {p95}", extra=summary(**stats))
+    return 0
+
+
+def _limiters(client: Any) -> list[tuple[str, AdaptiveLimiter]]:
+    """List the adaptive limiters of a client, labelled by backend for sharded clients"""
+    backends = getattr(client, "clients", None)
+    if isinstance(backends, dict):
+        return [(f" {url}", backend.limiter) for url, backend in backends.items() if backend.limiter is not None]
+    return [("", client.limiter)] if isinstance(client.limiter, AdaptiveLimiter) else []
+
+
+def _watch_folder(client: TransmissionClient, folder_path: str, args: argparse.Namespace) -> None:
+    """
+    Add .torrent files as they appear in a folder until interrupted
+
+    Args:
+        client (TransmissionClient): Client to upload with; its session stays warm
+        folder_path (str): Folder to watch
+        args (argparse.Namespace): Parsed command line options
+    """
+    from .journal import IngestJournal
+
+    watcher = create_watcher(folder_path, settle=args.settle)
+    logger.info(f"👀 Watching {folder_path} for new .torrent files ({watcher.kind}), press Ctrl-C to stop")
+
+    known_hashes = client.known_hashes() if args.skip_existing else None
+    journal = IngestJournal(args.journal) if args.journal else None
+    try:
+        for torrent_file in watcher:
+            logger.info(f"\n📁 Adding: {os.path.basename(torrent_file)}")
+            try:
+                result = client.add_torrent_file(torrent_file, known_hashes=known_hashes)
+            except Exception as e:
+                logger.error(
+                    f"❌ Error adding {os.path.basename(torrent_file)}: {e}",
+                    extra={"event": "torrent-add", "outcome": "error", "path": torrent_file, "error": str(e)},
+                )
+                if journal is not None:
+                    journal.record(torrent_file, "error", error=str(e))
+                continue
+            if journal is not None:
+                journal.record(
+                    torrent_file, add_outcome(result), infohash=_result_hash(result), error=_result_error(result)
+                )
+    except KeyboardInterrupt:
+        logger.info("\n👋 Stopped watching", extra=summary())
+    finally:
+        watcher.close()
+        if journal is not None:
+            journal.close()
+
+
+def _serve(client: Any, args: argparse.Namespace) -> None:
+    """
+    Run the local gateway until interrupted
+
+    Args:
+        client (TransmissionClient): Client whose sessions the gateway keeps
+            warm, or a ShardedTransmissionClient
+        args (argparse.Namespace): Parsed command line options
+    """
+    from .gateway import Gateway, GatewayServer
+
+    host, _, port = args.listen.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"--listen must be HOST:PORT, got {args.listen!r}")
+
+    server = GatewayServer(
+        Gateway(client, jobs=args.jobs),
+        host=host,
+        port=int(port),
+        socket_path=args.socket,
+        token=args.token or os.getenv("TRANSMISSION_GATEWAY_TOKEN") or None,
+    )
+    logger.info(f"🚪 Gateway listening on {server.address}, press Ctrl-C to stop", extra=summary())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("\n👋 Gateway stopped", extra=summary())
+    finally:
+        server.close()
+
+
+def _result_hash(result: Any) -> str | None:
+    """Get the infohash reported in a torrent-add result"""
+    arguments = result.get("arguments", {})
+    torrent_info = arguments.get("torrent-added") or arguments.get("torrent-duplicate") or {}
+    hash_string = torrent_info.get("hashString")
+    return str(hash_string) if hash_string else None
+
+
+def _result_error(result: Any) -> str | None:
+    """Get the error message of a failed torrent-add result"""
+    return None if result.get("result") == "success" else str(result.get("result"))
+
+
+def _float_option(value: float | None, env_var: str, default: D) -> float | D:
+    """Resolve a numeric option from the command line, then the environment, then the default"""
+    if value is not None:
+        return value
+    env_value = os.getenv(env_var)
+    if env_value:
+        try:
+            return float(env_value)
+        except ValueError:
+            raise ValueError(f"{env_var} must be a number, got {env_value!r}") from None
+    return default
+
 
 def main() -> int:
-    parser = argparse.ArgumentParser(description="Add torrents to Transmission")
+    # "transmission-pusher serve [options]" runs the local gateway; the
+    # positional torrent argument rules out argparse subcommands
+    argv = sys.argv[1:]
+    serve = argv[:1] == ["serve"]
+    if serve:
+        argv = argv[1:]
+
+    parser = argparse.ArgumentParser(
+        description="Add torrents to Transmission",
+        epilog="Run 'transmission-pusher serve [options]' to keep sessions warm behind a local HTTP API.",
+    )
     parser.add_argument("torrent", nargs="?", help="Path to .torrent file or URL")
     parser.add_argument(
         "--host",
@@ -198,87 +1032,263 @@ def main() -> int:
         "--base-url",
         help=("Complete base URL of Transmission " "(e.g., http://192.168.1.127:29091/transmission/web)"),
     )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        metavar="URL",
+        help="Base URL of a Transmission daemon to shard torrents across (repeatable, replaces --base-url)",
+    )
+    parser.add_argument(
+        "--placement",
+        choices=["hash", "load"],
+        default="hash",
+        help=(
+            "With several --backend options, place torrents by infohash or on the daemon with the most "
+            "free space per active torrent (default: hash)"
+        ),
+    )
     parser.add_argument("--username", help="Transmission username")
     parser.add_argument("--password", help="Transmission password")
     parser.add_argument("--folder", help="Process all .torrent files in a folder")
+    parser.add_argument("--recursive", action="store_true", help="With --folder, also scan subfolders")
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="PATTERN",
+        help="With --folder, only add files matching this glob (repeatable, default: *.torrent)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="PATTERN",
+        help="With --folder, skip files and subfolders matching this glob (repeatable)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        help="With --folder, deepest subfolder level to scan (implies --recursive, 0 = folder only)",
+    )
     parser.add_argument("--list", action="store_true", help="List existing torrents")
+    parser.add_argument("--watch", help="Keep running and add new .torrent files as they appear in a folder")
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=0.1,
+        help="With --watch, seconds a file must stay unchanged before it is added (default: 0.1)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of torrents to upload concurrently with --folder or serve (default: 1, 4 with serve)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Adjust the number of concurrent RPCs to the daemon's latency, using --jobs as the ceiling",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        help="Seconds to wait for a connection to Transmission (default: $TRANSMISSION_CONNECT_TIMEOUT or 10)",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        help="Seconds to wait for each read from Transmission (default: $TRANSMISSION_READ_TIMEOUT or 60)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help=(
+            "Seconds a single RPC may take end to end, including the session handshake, limiter wait and retries"
+            " (default: $TRANSMISSION_DEADLINE or none)"
+        ),
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Retries of an RPC after connection errors, 409 or 5xx answers (default: 3, 0 to disable)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while running (e.g. with --watch)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        help="Write Prometheus metrics to this file when done, for node_exporter's textfile collector",
+    )
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="With --folder, don't upload torrents whose infohash is already on Transmission",
+    )
+    parser.add_argument(
+        "--journal",
+        help="With --folder, record each file's outcome in this SQLite file and skip completed files on re-runs",
+    )
+
+    parser.add_argument(
+        "--log-format",
+        choices=["text", "json"],
+        default="text",
+        help="Output format: text lines or JSON lines with structured fields (default: text)",
+    )
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary and errors")
+    parser.add_argument("--verbose", action="store_true", help="Also log every RPC with its timing and size")
+    parser.add_argument(
+        "--session-cache",
+        action="store_true",
+        default=None,
+        help=(
+            "Reuse the session id of earlier runs, cached in $XDG_RUNTIME_DIR/transmission-pusher "
+            "(default: $TRANSMISSION_SESSION_CACHE)"
+        ),
+    )
+
+    parser.add_argument(
+        "--listen",
+        default="127.0.0.1:9092",
+        metavar="HOST:PORT",
+        help="With serve, address of the local HTTP API (default: 127.0.0.1:9092)",
+    )
+    parser.add_argument("--socket", help="With serve, listen on this Unix socket instead of TCP")
+    parser.add_argument(
+        "--token",
+        help="With serve, require 'Authorization: Bearer TOKEN' on requests (default: $TRANSMISSION_GATEWAY_TOKEN)",
+    )
+
+    args = parser.parse_args(argv)
+    configure_logging(args.log_format, quiet=args.quiet, verbose=args.verbose)
+
+    if args.jobs is None:
+        # The gateway is meant to take concurrent callers; match Gateway's default
+        args.jobs = 4 if serve else 1
+    if args.jobs < 1:
+        logger.error("❌ --jobs must be at least 1")
+        return 1
+
+    if args.retries < 0:
+        logger.error("❌ --retries must not be negative")
+        return 1
+
+    from dotenv import load_dotenv
 
-    args = parser.parse_args()
+    # Load environment variables
+    load_dotenv()
 
+    metrics_server = None
+    client: Any = None
     try:
         # Get credentials from environment variables if not provided
         username = args.username or os.getenv("TRANSMISSION_USERNAME")
         password = args.password or os.getenv("TRANSMISSION_PASSWORD")
         base_url = args.base_url or os.getenv("TRANSMISSION_URL")
 
+        backends = args.backend or [
+            url.strip() for url in os.getenv("TRANSMISSION_BACKENDS", "").split(",") if url.strip()
+        ]
+
+        connect_timeout = _float_option(args.connect_timeout, "TRANSMISSION_CONNECT_TIMEOUT", 10.0)
+        read_timeout = _float_option(args.read_timeout, "TRANSMISSION_READ_TIMEOUT", 60.0)
+        deadline = _float_option(args.deadline, "TRANSMISSION_DEADLINE", None)
+        if args.metrics_port is not None:
+            metrics_server = MetricsServer(REGISTRY, args.metrics_port)
+            logger.info(f"📈 Serving metrics on http://127.0.0.1:{metrics_server.port}/metrics")
+
+        from .retry import RetryPolicy
+
+        # --deadline is the only total-time bound; the client hands it to the policy with every call
+        retry = RetryPolicy(max_attempts=args.retries + 1, deadline=None) if args.retries else None
+
+        use_session_cache = args.session_cache
+        if use_session_cache is None:
+            use_session_cache = os.getenv("TRANSMISSION_SESSION_CACHE", "").lower() in ("1", "true", "yes")
+        session_cache = SessionIdCache() if use_session_cache else None
+
         # Create Transmission client
-        client = TransmissionClient(
-            host=args.host,
-            port=args.port,
-            username=username,
-            password=password,
-            base_url=base_url,
-        )
+        if len(backends) > 1:
+            from .sharding import ShardedTransmissionClient
 
-        if args.list:
-            print("📋 Listing existing torrents:")
-            torrents = client.get_torrents()
-            for torrent in torrents:
+            client = ShardedTransmissionClient(
+                backends,
+                username=username,
+                password=password,
+                jobs_per_backend=args.jobs,
+                placement=args.placement,
+                adaptive=args.adaptive,
+                retry=retry,
+                session_cache=session_cache,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                deadline=deadline,
+            )
+        else:
+            client = TransmissionClient(
+                host=args.host,
+                port=args.port,
+                username=username,
+                password=password,
+                base_url=backends[0] if backends else base_url,
+                pool_size=max(args.jobs, 10),
+                limiter=AdaptiveLimiter(max_limit=args.jobs) if args.adaptive else None,
+                retry=retry,
+                session_cache=session_cache,
+                connect_timeout=connect_timeout,
+                read_timeout=read_timeout,
+                deadline=deadline,
+            )
+
+        if serve:
+            _serve(client, args)
+        elif args.list:
+            logger.info("📋 Listing existing torrents:", extra=summary())
+            for torrent in client.iter_torrents(fields="list"):
                 status = "⏸️" if torrent.get("status") == 4 else "▶️"
                 percent = torrent.get("percentDone", 0) * 100
-                print(f"   {status} {torrent.get('name', 'N/A')} - {percent:.1f}%")
+                backend = f" [{torrent['backend']}]" if "backend" in torrent else ""
+                logger.info(
+                    f"   {status} {torrent.get('name', 'N/A')} - {percent:.1f}%{backend}",
+                    extra=summary(event="torrent", torrent=torrent),
+                )
         elif args.folder:
             # Process all .torrent files in a folder
             folder_path = args.folder
             if not os.path.exists(folder_path):
-                print(f"❌ Folder does not exist: {folder_path}")
+                logger.error(f"❌ Folder does not exist: {folder_path}")
                 return 1
 
             if not os.path.isdir(folder_path):
-                print(f"❌ Path is not a directory: {folder_path}")
+                logger.error(f"❌ Path is not a directory: {folder_path}")
                 return 1
 
-            print(f"📁 Processing folder: {folder_path}")
-
-            # Find all .torrent files in the folder
-            torrent_files = []
-            for file in os.listdir(folder_path):
-                if file.lower().endswith(".torrent"):
-                    torrent_files.append(os.path.join(folder_path, file))
+            logger.info(f"📁 Processing folder: {folder_path}")
 
-            if not torrent_files:
-                print("❌ No .torrent files found in the folder")
+            if _process_folder(client, folder_path, args) != 0:
                 return 1
 
-            print(f"📦 Found {len(torrent_files)} .torrent files")
-
-            # Process each .torrent file
-            success_count = 0
-            for torrent_file in torrent_files:
-                try:
-                    print(f"\n📁 Adding: {os.path.basename(torrent_file)}")
-                    client.add_torrent_file(torrent_file)
-                    success_count += 1
-                except Exception as e:
-                    print(f"❌ Error adding {os.path.basename(torrent_file)}: {e}")
-
-            print(f"\n✅ Successfully added {success_count}/{len(torrent_files)} torrents")
+        elif args.watch:
+            if not os.path.isdir(args.watch):
+                logger.error(f"❌ Path is not a directory: {args.watch}")
+                return 1
+            _watch_folder(client, args.watch, args)
 
         elif args.torrent:
             # Determine if it's a local file or URL
             if os.path.exists(args.torrent):
-                print(f"📁 Adding local file: {args.torrent}")
+                logger.info(f"📁 Adding local file: {args.torrent}")
                 client.add_torrent_file(args.torrent)
             elif args.torrent.startswith(("http://", "https://")):
-                print(f"🌐 Adding from URL: {args.torrent}")
+                logger.info(f"🌐 Adding from URL: {args.torrent}")
                 client.add_torrent_url(args.torrent)
             else:
-                print("❌ File does not exist and is not a valid URL")
+                logger.error("❌ File does not exist and is not a valid URL")
                 return 1
         else:
-            print(
+            logger.error(
                 "❌ You must specify a .torrent file, use --folder to process a directory, "
-                "or use --list to see existing torrents"
+                "--watch to follow one, or use --list to see existing torrents"
             )
             parser.print_help()
             return 1
@@ -286,9 +1296,20 @@ def main() -> int:
         return 0
 
     except Exception as e:
-        print(f"❌ Error: {e}")
+        logger.error(f"❌ Error: {e}")
         return 1
 
+    finally:
+        if client is not None:
+            client.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        if args.metrics_file:
+            try:
+                REGISTRY.write_textfile(args.metrics_file)
+            except OSError as e:
+                logger.error(f"❌ Could not write metrics to {args.metrics_file}: {e}")
+
 
 if __name__ == "__main__":
     exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Watch a folder for new .torrent files
+Uses Linux inotify when available and falls back to polling elsewhere
+"""
+
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+# inotify constants from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_torrent_file(name: str) -> bool:
+    """Check whether a file name looks like a .torrent file"""
+    return name.lower().endswith(".torrent")
+
+
+class FolderWatcher(ABC):
+    """
+    Base class for folder watchers
+
+    Iterating yields the path of every .torrent file written to or moved
+    into the folder, once no further writes to it have been seen for
+    settle seconds. Iteration ends after close() is called.
+    """
+
+    kind = "base"
+
+    def __init__(self, path: str, settle: float = 1.0) -> None:
+        self.path = path
+        self.settle = settle
+        self._pending: dict[str, float] = {}
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        """Yield settled .torrent files until closed"""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Stop watching; a blocked iteration returns promptly"""
+
+    def _touch(self, name: str) -> None:
+        """Note activity on a file, restarting its settle period"""
+        if is_torrent_file(name):
+            self._pending[os.path.join(self.path, name)] = time.monotonic() + self.settle
+
+    def _settled(self) -> list[str]:
+        """Remove and return the files whose settle period is over"""
+        now = time.monotonic()
+        ready = sorted(path for path, deadline in self._pending.items() if deadline <= now)
+        for path in ready:
+            del self._pending[path]
+        return [path for path in ready if os.path.isfile(path)]
+
+    def _next_timeout(self) -> float | None:
+        """Seconds until the next pending file settles, or None to wait forever"""
+        if not self._pending:
+            return None
+        return max(0.0, min(self._pending.values()) - time.monotonic())
+
+
+class InotifyWatcher(FolderWatcher):
+    """Folder watcher driven by inotify close-write and moved-to events"""
+
+    kind = "inotify"
+
+    def __init__(self, path: str, settle: float = 1.0) -> None:
+        """
+        Start watching a folder with inotify
+
+        Args:
+            path (str): Folder to watch
+            settle (float): Seconds without writes before a file is reported (default: 1.0)
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        # ctypes and ctypes.util (which pulls in subprocess) are only needed when watching
+        import ctypes.util
+
+        super().__init__(path, settle)
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError(errno.ENOSYS, "libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "inotify is not available")
+
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self._fd, os.fsencode(path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f"Cannot watch {path}")
+
+        # Writing to this pipe wakes up a blocked iteration on close()
+        self._wake_read, self._wake_write = os.pipe()
+        self._closed = False
+        self._iterating = False
+        self._released = False
+
+    def __iter__(self) -> Iterator[str]:
+        self._iterating = True
+        try:
+            while not self._closed:
+                # Block without a timeout while nothing is pending, so an idle
+                # watcher uses no CPU at all
+                readable, _, _ = select.select([self._fd, self._wake_read], [], [], self._next_timeout())
+                if self._wake_read in readable:
+                    # close() was called from another thread
+                    break
+                if self._fd in readable:
+                    self._read_events()
+                yield from self._settled()
+        finally:
+            self._iterating = False
+            self._release()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._iterating:
+            # Let the iterating thread release the descriptors it is waiting on
+            os.write(self._wake_write, b"x")
+        else:
+            self._release()
+
+    def _read_events(self) -> None:
+        """Drain queued inotify events"""
+        while True:
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return
+            offset = 0
+            while offset < len(buffer):
+                _, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost; consider every torrent in the folder
+                    for entry in os.scandir(self.path):
+                        self._touch(entry.name)
+                elif name:
+                    self._touch(os.fsdecode(name))
+
+    def _release(self) -> None:
+        """Close the file descriptors"""
+        if self._released:
+            return
+        self._released = True
+        for fd in (self._fd, self._wake_read, self._wake_write):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+class PollingWatcher(FolderWatcher):
+    """Folder watcher that rescans the folder periodically"""
+
+    kind = "polling"
+
+    def __init__(self, path: str, settle: float = 1.0, interval: float = 1.0) -> None:
+        """
+        Start watching a folder by polling
+
+        Files present when the watcher starts are not reported.
+
+        Args:
+            path (str): Folder to watch
+            settle (float): Seconds without size or mtime changes before a
+                file is reported (default: 1.0)
+            interval (float): Seconds between scans (default: 1.0)
+        """
+        super().__init__(path, settle)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._seen = self._scan()
+
+    def __iter__(self) -> Iterator[str]:
+        while not self._stop.wait(self.interval):
+            current = self._scan()
+            for name, signature in current.items():
+                if self._seen.get(name) != signature:
+                    self._touch(name)
+            self._seen = current
+            yield from self._settled()
+
+    def close(self) -> None:
+        self._stop.set()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """Return the size and mtime of every .torrent file in the folder"""
+        snapshot = {}
+        with os.scandir(self.path) as entries:
+            for entry in entries:
+                if is_torrent_file(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+
+def create_watcher(path: str, settle: float = 1.0, poll_interval: float = 1.0) -> FolderWatcher:
+    """
+    Create the best available watcher for a folder
+
+    Args:
+        path (str): Folder to watch
+        settle (float): Seconds without writes before a file is reported (default: 1.0)
+        poll_interval (float): Seconds between scans when polling (default: 1.0)
+
+    Returns:
+        FolderWatcher: An inotify watcher on Linux, a polling watcher otherwise
+    """
+    try:
+        return InotifyWatcher(path, settle)
+    except OSError:
+        return PollingWatcher(path, settle, poll_interval)
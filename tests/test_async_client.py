@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Tests for AsyncTransmissionClient class
+"""
+
+import asyncio
+import base64
+import json
+import os
+import tempfile
+from typing import Any
+
+import pytest
+
+from transmission_pusher.async_client import AsyncTransmissionClient, TransmissionHTTPError
+
+
+class FakeTransmission:
+    """Minimal keep-alive HTTP server that behaves like the Transmission RPC endpoint"""
+
+    def __init__(self, session_ids: list[str] | None = None, status: int = 200) -> None:
+        self.session_ids = session_ids or ["session-1"]
+        self.status = status
+        self.connections = 0
+        self.requests: list[dict[str, Any]] = []
+        self.auth_headers: list[str | None] = []
+        self.server: asyncio.AbstractServer | None = None
+
+    @property
+    def port(self) -> int:
+        assert self.server is not None
+        return int(self.server.sockets[0].getsockname()[1])
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+
+    async def stop(self) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line == b"\r\n":
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.auth_headers.append(headers.get("authorization"))
+                await self._respond(writer, request_line.split()[0], headers, body)
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, method: bytes, headers: dict, body: bytes) -> None:
+        current_id = self.session_ids[0]
+        if headers.get("x-transmission-session-id") != current_id:
+            writer.write(
+                f"HTTP/1.1 409 Conflict\r\nX-Transmission-Session-Id: {current_id}\r\n"
+                "Content-Length: 0\r\n\r\n".encode()
+            )
+            await writer.drain()
+            return
+
+        if method == b"POST":
+            payload = json.loads(body)
+            self.requests.append(payload)
+            if len(self.session_ids) > 1:
+                # Rotate the session id after the first successful call
+                self.session_ids.pop(0)
+        else:
+            payload = {}
+
+        if payload.get("method") == "torrent-get":
+            arguments: dict[str, Any] = {"torrents": [{"id": 1, "name": "Test Torrent", "status": 4}]}
+        else:
+            arguments = {"torrent-added": {"id": 1, "name": "Test Torrent", "hashString": "abc123"}}
+        response = json.dumps({"result": "success", "arguments": arguments}).encode()
+        writer.write(
+            f"HTTP/1.1 {self.status} OK\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(response)}\r\n\r\n".encode() + response
+        )
+        await writer.drain()
+
+
+def run(coroutine: Any) -> Any:
+    """Run a coroutine to completion in a fresh event loop"""
+    return asyncio.run(coroutine)
+
+
+class TestAsyncTransmissionClient:
+    """Test cases for AsyncTransmissionClient class"""
+
+    def test_init_with_base_url(self) -> None:
+        """Test client initialization with base URL"""
+        client = AsyncTransmissionClient(base_url="http://192.168.1.127:29091/transmission/")
+        assert client.base_url == "http://192.168.1.127:29091/transmission/rpc"
+
+    def test_add_torrent_url_negotiates_session(self) -> None:
+        """Test that a 409 is answered transparently with the new session id"""
+
+        async def scenario() -> tuple[Any, FakeTransmission]:
+            daemon = FakeTransmission()
+            await daemon.start()
+            try:
+                async with AsyncTransmissionClient(port=daemon.port, username="user", password="pass") as client:
+                    result = await client.add_torrent_url("https://example.com/test.torrent")
+            finally:
+                await daemon.stop()
+            return result, daemon
+
+        result, daemon = run(scenario())
+
+        assert result["result"] == "success"
+        assert daemon.requests[0]["arguments"]["filename"] == "https://example.com/test.torrent"
+        expected_auth = "Basic " + base64.b64encode(b"user:pass").decode()
+        assert daemon.auth_headers == [expected_auth, expected_auth]
+
+    def test_session_id_rotation(self) -> None:
+        """Test that a rotated session id is renewed without failing the call"""
+
+        async def scenario() -> FakeTransmission:
+            daemon = FakeTransmission(session_ids=["session-1", "session-2"])
+            await daemon.start()
+            try:
+                async with AsyncTransmissionClient(port=daemon.port) as client:
+                    await client.get_torrents()
+                    torrents = await client.get_torrents()
+                    assert client.session_id == "session-2"
+                    assert torrents[0]["name"] == "Test Torrent"
+            finally:
+                await daemon.stop()
+            return daemon
+
+        daemon = run(scenario())
+
+        assert len(daemon.requests) == 2
+
+    def test_connections_are_reused(self) -> None:
+        """Test that sequential calls share one keep-alive connection"""
+
+        async def scenario() -> FakeTransmission:
+            daemon = FakeTransmission()
+            await daemon.start()
+            try:
+                async with AsyncTransmissionClient(port=daemon.port) as client:
+                    await client._get_session_id()
+                    for _ in range(5):
+                        await client.get_torrents()
+            finally:
+                await daemon.stop()
+            return daemon
+
+        daemon = run(scenario())
+
+        assert daemon.connections == 1
+        assert len(daemon.requests) == 5
+
+    def test_interrupted_reused_connection_is_closed(self) -> None:
+        """Test that a reused connection failing mid-request is closed, not leaked"""
+
+        class BrokenConnection:
+            closed = False
+
+            async def request(self, *args: Any) -> None:
+                raise ValueError("bad status line")
+
+            def close(self) -> None:
+                self.closed = True
+
+        client = AsyncTransmissionClient()
+        connection = BrokenConnection()
+        client._idle.append(connection)  # type: ignore[arg-type]
+
+        with pytest.raises(ValueError):
+            run(client._send("GET"))
+
+        assert connection.closed
+        assert client._idle == []
+
+    def test_concurrency_is_bounded(self) -> None:
+        """Test that concurrent calls never open more than max_connections connections"""
+
+        async def scenario() -> FakeTransmission:
+            daemon = FakeTransmission()
+            await daemon.start()
+            try:
+                async with AsyncTransmissionClient(port=daemon.port, max_connections=3) as client:
+                    await client._get_session_id()
+                    await asyncio.gather(*(client.get_torrents() for _ in range(30)))
+            finally:
+                await daemon.stop()
+            return daemon
+
+        daemon = run(scenario())
+
+        assert daemon.connections <= 3
+        assert len(daemon.requests) == 30
+
+    def test_add_torrent_file_success(self) -> None:
+        """Test that torrent files are sent base64 encoded"""
+        torrent_content = b"d8:announce35:http://example.com/announce4:info..."
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            f.write(torrent_content)
+            torrent_file = f.name
+
+        async def scenario() -> tuple[Any, FakeTransmission]:
+            daemon = FakeTransmission()
+            await daemon.start()
+            try:
+                async with AsyncTransmissionClient(port=daemon.port) as client:
+                    result = await client.add_torrent_file(torrent_file)
+            finally:
+                await daemon.stop()
+            return result, daemon
+
+        try:
+            result, daemon = run(scenario())
+        finally:
+            os.unlink(torrent_file)
+
+        assert result["arguments"]["torrent-added"]["hashString"] == "abc123"
+        assert base64.b64decode(daemon.requests[0]["arguments"]["metainfo"]) == torrent_content
+
+    def test_add_torrent_file_file_not_found(self) -> None:
+        """Test torrent file addition with non-existent file"""
+        client = AsyncTransmissionClient()
+        with pytest.raises(FileNotFoundError):
+            run(client.add_torrent_file("/non/existent/file.torrent"))
+
+    def test_http_error(self) -> None:
+        """Test that non-2xx responses raise TransmissionHTTPError"""
+
+        async def scenario() -> None:
+            daemon = FakeTransmission(status=500)
+            await daemon.start()
+            try:
+                async with AsyncTransmissionClient(port=daemon.port) as client:
+                    await client.get_torrents()
+            finally:
+                await daemon.stop()
+
+        with pytest.raises(TransmissionHTTPError) as excinfo:
+            run(scenario())
+
+        assert excinfo.value.status == 500
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tests for the bencode parser
+"""
+
+import hashlib
+import os
+import tempfile
+
+import pytest
+
+from transmission_pusher.bencode import (
+    BencodeError,
+    decode,
+    file_info_hash,
+    file_torrent_size,
+    info_hash,
+    torrent_size,
+)
+
+INFO = b"d5:filesld6:lengthi5e4:pathl5:a.txteee4:name4:pack12:piece lengthi16384e6:pieces20:" + b"x" * 20 + b"e"
+METAINFO = b"d8:announce23:http://tracker/announce13:creation datei1700000000e4:info" + INFO + b"e"
+
+
+class TestDecode:
+    """Test cases for decode"""
+
+    def test_scalars(self) -> None:
+        """Test integers and strings"""
+        assert decode(b"i42e") == 42
+        assert decode(b"i-3e") == -3
+        assert decode(b"4:spam") == b"spam"
+        assert decode(b"0:") == b""
+
+    def test_containers(self) -> None:
+        """Test lists and dictionaries"""
+        assert decode(b"l4:spami1ee") == [b"spam", 1]
+        assert decode(b"d3:cow3:moo4:spaml1:a1:bee") == {b"cow": b"moo", b"spam": [b"a", b"b"]}
+
+    def test_metainfo(self) -> None:
+        """Test decoding a complete .torrent"""
+        metainfo = decode(METAINFO)
+        assert metainfo[b"info"][b"name"] == b"pack"
+        assert metainfo[b"info"][b"files"][0][b"length"] == 5
+
+    @pytest.mark.parametrize("data", [b"", b"i12", b"5:abc", b"l4:spam", b"x", b"i1ei2e", b"d1:ai1e", b"ie"])
+    def test_invalid(self, data: bytes) -> None:
+        """Test that malformed input raises BencodeError"""
+        with pytest.raises(BencodeError):
+            decode(data)
+
+    def test_deep_nesting(self) -> None:
+        """Test that nesting deeper than the stack raises BencodeError instead of RecursionError"""
+        with pytest.raises(BencodeError):
+            decode(b"l" * 5000 + b"e" * 5000)
+
+
+class TestInfoHash:
+    """Test cases for infohash computation"""
+
+    def test_info_hash(self) -> None:
+        """Test that the infohash is the SHA-1 of the raw info dictionary"""
+        assert info_hash(METAINFO) == hashlib.sha1(INFO).hexdigest()
+
+    def test_file_info_hash(self) -> None:
+        """Test infohash computation from a file"""
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            f.write(METAINFO)
+            torrent_file = f.name
+
+        try:
+            assert file_info_hash(torrent_file) == hashlib.sha1(INFO).hexdigest()
+        finally:
+            os.unlink(torrent_file)
+
+    def test_empty_file(self) -> None:
+        """Test that an empty file is rejected"""
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            torrent_file = f.name
+
+        try:
+            with pytest.raises(BencodeError):
+                file_info_hash(torrent_file)
+        finally:
+            os.unlink(torrent_file)
+
+    @pytest.mark.parametrize(
+        "data",
+        [b"l4:infoe", b"d8:announce3:fooe", b"d4:info4:spame", b"d4:infod4:name", b"d8:announce3:foo4:info"],
+    )
+    def test_invalid_metainfo(self, data: bytes) -> None:
+        """Test that metainfo without a valid info dictionary is rejected"""
+        with pytest.raises(BencodeError):
+            info_hash(data)
+
+
+class TestTorrentSize:
+    """Test cases for torrent payload size"""
+
+    def test_multi_file(self) -> None:
+        """Test that the lengths of all files are summed"""
+        info = b"d5:filesld6:lengthi5e4:pathl1:aeed6:lengthi7e4:pathl1:beee4:name4:packe"
+        assert torrent_size(b"d4:info" + info + b"e") == 12
+
+    def test_single_file(self) -> None:
+        """Test single-file torrents and reading from a file"""
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            f.write(b"d4:infod6:lengthi1048576e4:name1:xee")
+            torrent_file = f.name
+
+        try:
+            assert file_torrent_size(torrent_file) == 1048576
+        finally:
+            os.unlink(torrent_file)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"d4:infod4:name1:xee",
+            b"d4:infod6:lengthi-1eee",
+            b"d4:infod6:length1:xee",
+            b"d4:infod5:filesld4:pathl1:aeeeee",
+            b"d4:infod5:filesli1eeee",
+        ],
+    )
+    def test_invalid(self, data: bytes) -> None:
+        """Test that info dictionaries without valid lengths are rejected"""
+        with pytest.raises(BencodeError):
+            torrent_size(data)
+
+    def test_deep_nesting(self) -> None:
+        """Test that deeply nested values next to the lengths don't exhaust the stack"""
+        nested = b"l" * 5000 + b"e" * 5000
+        assert torrent_size(b"d4:infod6:lengthi1e1:x" + nested + b"ee") == 1
+        info = b"d5:filesld6:lengthi2e4:path" + nested + b"ed6:lengthi3eee4:name1:xe"
+        assert torrent_size(b"d4:info" + info + b"e") == 5
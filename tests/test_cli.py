@@ -3,11 +3,12 @@
 Tests for command line interface functionality
 """
 
+import json
 import os
 import shutil
 import tempfile
 from io import StringIO
-from typing import Generator
+from typing import Any, Generator
 from unittest.mock import Mock, patch
 
 import pytest
@@ -26,6 +27,7 @@ class TestCLI:
             {"id": 1, "name": "Test Torrent 1", "status": 4, "percentDone": 0.5, "downloadDir": "/downloads"},
             {"id": 2, "name": "Test Torrent 2", "status": 6, "percentDone": 1.0, "downloadDir": "/downloads"},
         ]
+        mock.iter_torrents.side_effect = lambda *args, **kwargs: iter(mock.get_torrents.return_value)
         return mock
 
     @pytest.fixture
@@ -51,6 +53,22 @@ class TestCLI:
                 assert "Test Torrent 2" in output
                 assert "50.0%" in output
                 assert "100.0%" in output
+                mock_client.iter_torrents.assert_called_once_with(fields="list")
+                mock_client.close.assert_called_once_with()
+
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_deadline_bounds_retries(self, mock_client_class: Mock, mock_client: Mock) -> None:
+        """Test --deadline is the only total-time bound, so the retry policy has none of its own"""
+        mock_client_class.return_value = mock_client
+
+        with patch("sys.argv", ["transmission_client.py", "--list", "--deadline", "20", "--retries", "2"]):
+            with patch("sys.stdout", new=StringIO()):
+                assert main() == 0
+
+        kwargs = mock_client_class.call_args[1]
+        assert kwargs["deadline"] == 20.0
+        assert kwargs["retry"].max_attempts == 3
+        assert kwargs["retry"].deadline is None
 
     @patch("transmission_pusher.transmission_client.TransmissionClient")
     def test_add_local_file(self, mock_client_class: Mock, mock_client: Mock) -> None:
@@ -124,6 +142,27 @@ class TestCLI:
                 assert "Found 3 .torrent files" in output
                 assert "Successfully added 3/3 torrents" in output
 
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_process_folder_recursive(self, mock_client_class: Mock, mock_client: Mock, temp_dir: str) -> None:
+        """Test --recursive with --exclude scans subfolders and skips excluded ones"""
+        mock_client_class.return_value = mock_client
+        mock_client.add_torrent_file.return_value = {"result": "success"}
+        for relative in ["top.torrent", "nested/deep.torrent", "skip/ignored.torrent"]:
+            path = os.path.join(temp_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(b"d8:announce35:http://example.com/announce4:info...")
+
+        argv = ["transmission_client.py", "--folder", temp_dir, "--recursive", "--exclude", "skip"]
+        with patch("sys.argv", argv):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                result = main()
+
+                assert result == 0
+                added = sorted(os.path.basename(call[0][0]) for call in mock_client.add_torrent_file.call_args_list)
+                assert added == ["deep.torrent", "top.torrent"]
+                assert "Successfully added 2/2 torrents" in mock_stdout.getvalue()
+
     @patch("transmission_pusher.transmission_client.TransmissionClient")
     def test_process_folder_no_torrents(self, mock_client_class: Mock, mock_client: Mock, temp_dir: str) -> None:
         """Test --folder functionality with no torrent files"""
@@ -206,6 +245,272 @@ class TestCLI:
                 output = mock_stdout.getvalue()
                 assert "Successfully added 2/3 torrents" in output
 
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_process_folder_parallel_jobs(self, mock_client_class: Mock, mock_client: Mock, temp_dir: str) -> None:
+        """Test --folder with --jobs reports results in folder order"""
+        mock_client_class.return_value = mock_client
+
+        def add_torrent_file(path: str, **kwargs: Any) -> dict:
+            name = os.path.basename(path)
+            if name == "test3.torrent":
+                raise Exception("API Error")
+            return {"result": "success", "arguments": {"torrent-added": {"name": name}}}
+
+        mock_client.add_torrent_file.side_effect = add_torrent_file
+
+        for i in range(6):
+            with open(os.path.join(temp_dir, f"test{i}.torrent"), "wb") as f:
+                f.write(b"d8:announce35:http://example.com/announce4:info...")
+
+        with patch("sys.argv", ["transmission_client.py", "--folder", temp_dir, "--jobs", "4"]):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                result = main()
+
+                assert result == 0
+                assert mock_client.add_torrent_file.call_count == 6
+                output = mock_stdout.getvalue()
+                assert "Successfully added 5/6 torrents" in output
+                assert "Error adding test3.torrent: API Error" in output
+
+                # Every "Adding" line is immediately followed by its own result
+                lines = [line for line in output.splitlines() if line.strip()]
+                for index, line in enumerate(lines):
+                    if "Adding:" in line:
+                        name = line.split("Adding: ")[1]
+                        assert name in lines[index + 1]
+
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_process_folder_adaptive(self, mock_client_class: Mock, mock_client: Mock, temp_dir: str) -> None:
+        """Test --adaptive gives the client a limiter capped at --jobs and reports it"""
+
+        def create_client(**kwargs: Any) -> Mock:
+            mock_client.limiter = kwargs["limiter"]
+            return mock_client
+
+        mock_client_class.side_effect = create_client
+        mock_client.add_torrent_file.return_value = {"result": "success", "arguments": {"torrent-added": {}}}
+        with open(os.path.join(temp_dir, "test.torrent"), "wb") as f:
+            f.write(b"d8:announce35:http://example.com/announce4:info...")
+
+        with patch("sys.argv", ["transmission_client.py", "--folder", temp_dir, "--jobs", "6", "--adaptive"]):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                result = main()
+
+                assert result == 0
+                limiter = mock_client_class.call_args[1]["limiter"]
+                assert limiter.max_limit == 6
+                assert "Concurrency: limit 1, p95 latency n/a" in mock_stdout.getvalue()
+
+    @patch("transmission_pusher.sharding.TransmissionClient")
+    def test_process_folder_sharded(self, mock_client_class: Mock, temp_dir: str) -> None:
+        """Test --folder with several --backend options spreads files over the daemons"""
+        backends = {url: Mock(name=url) for url in ("http://a:9091/transmission", "http://b:9091/transmission")}
+        for mock in backends.values():
+            mock.add_torrent_file.return_value = {"result": "success", "arguments": {"torrent-added": {"name": "t"}}}
+        mock_client_class.side_effect = lambda **kwargs: backends[kwargs["base_url"]]
+
+        for i in range(8):
+            with open(os.path.join(temp_dir, f"test{i}.torrent"), "wb") as f:
+                f.write(b"d4:infod4:name5:test" + str(i).encode() + b"ee")
+
+        argv = ["transmission_client.py", "--folder", temp_dir]
+        for url in backends:
+            argv += ["--backend", url]
+        with patch("sys.argv", argv):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                result = main()
+
+                assert result == 0
+                output = mock_stdout.getvalue()
+                assert "Successfully added 8/8 torrents" in output
+                assert sum(mock.add_torrent_file.call_count for mock in backends.values()) == 8
+                for url in backends:
+                    assert f"Backend: {url}" in output
+
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_process_folder_skip_existing(self, mock_client_class: Mock, mock_client: Mock, temp_dir: str) -> None:
+        """Test --skip-existing fetches known hashes once and reports outcome counts"""
+        mock_client_class.return_value = mock_client
+        known: set[str] = {"abc"}
+        mock_client.known_hashes.return_value = known
+        mock_client.add_torrent_file.side_effect = [
+            {"result": "success", "arguments": {"torrent-added": {"name": "new"}}},
+            {"result": "success", "arguments": {"torrent-duplicate": {"name": "old"}}},
+            {"result": "success", "arguments": {"torrent-duplicate": {"hashString": "abc"}}, "skipped": True},
+        ]
+
+        for i in range(3):
+            with open(os.path.join(temp_dir, f"test{i}.torrent"), "wb") as f:
+                f.write(b"d8:announce35:http://example.com/announce4:info...")
+
+        with patch("sys.argv", ["transmission_client.py", "--folder", temp_dir, "--skip-existing"]):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                result = main()
+
+                assert result == 0
+                mock_client.known_hashes.assert_called_once_with()
+                for call in mock_client.add_torrent_file.call_args_list:
+                    assert call[1]["known_hashes"] is known
+                output = mock_stdout.getvalue()
+                assert "Torrent already exists: old" in output
+                assert "Successfully added 1/3 torrents (1 duplicates, 1 skipped, 0 errors)" in output
+
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_process_folder_journal_resume(self, mock_client_class: Mock, mock_client: Mock, temp_dir: str) -> None:
+        """Test --journal skips completed files and retries failed ones on re-runs"""
+        mock_client_class.return_value = mock_client
+        torrent_dir = os.path.join(temp_dir, "torrents")
+        os.mkdir(torrent_dir)
+        for i in range(3):
+            with open(os.path.join(torrent_dir, f"test{i}.torrent"), "wb") as f:
+                f.write(b"d8:announce35:http://example.com/announce4:info...")
+
+        def add_torrent_file(path: str, **kwargs: Any) -> dict:
+            if os.path.basename(path) == "test1.torrent":
+                raise Exception("Connection reset")
+            return {"result": "success", "arguments": {"torrent-added": {"hashString": "abc"}}}
+
+        mock_client.add_torrent_file.side_effect = add_torrent_file
+        argv = ["transmission_client.py", "--folder", torrent_dir, "--journal", os.path.join(temp_dir, "journal.db")]
+
+        with patch("sys.argv", argv):
+            with patch("sys.stdout", new=StringIO()):
+                assert main() == 0
+        assert mock_client.add_torrent_file.call_count == 3
+
+        mock_client.add_torrent_file.reset_mock()
+        mock_client.add_torrent_file.side_effect = None
+        mock_client.add_torrent_file.return_value = {"result": "success", "arguments": {}}
+
+        with patch("sys.argv", argv):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                assert main() == 0
+
+                # Only the failed file is uploaded again
+                mock_client.add_torrent_file.assert_called_once()
+                assert mock_client.add_torrent_file.call_args[0][0].endswith("test1.torrent")
+                output = mock_stdout.getvalue()
+                assert "2 files already completed according to the journal" in output
+                assert "Successfully added 1/3 torrents" in output
+
+    @patch("transmission_pusher.transmission_client.create_watcher")
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_watch_folder(
+        self, mock_client_class: Mock, mock_create_watcher: Mock, mock_client: Mock, temp_dir: str
+    ) -> None:
+        """Test --watch adds every file reported by the watcher over one client"""
+        mock_client_class.return_value = mock_client
+        mock_client.add_torrent_file.side_effect = [{"result": "success"}, Exception("API Error")]
+        watcher = Mock()
+        watcher.kind = "inotify"
+        watcher.__iter__ = Mock(return_value=iter([f"{temp_dir}/a.torrent", f"{temp_dir}/b.torrent"]))
+        mock_create_watcher.return_value = watcher
+
+        with patch("sys.argv", ["transmission_client.py", "--watch", temp_dir]):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                result = main()
+
+                assert result == 0
+                mock_client_class.assert_called_once()
+                assert mock_client.add_torrent_file.call_count == 2
+                watcher.close.assert_called_once_with()
+                output = mock_stdout.getvalue()
+                assert "Watching" in output
+                assert "Error adding b.torrent: API Error" in output
+
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_quiet_and_json_output(self, mock_client_class: Mock, mock_client: Mock, temp_dir: str) -> None:
+        """Test --quiet prints only the summary and --log-format json prints parseable lines"""
+        mock_client_class.return_value = mock_client
+        mock_client.add_torrent_file.return_value = {
+            "result": "success",
+            "arguments": {"torrent-added": {"id": 5, "name": "t", "hashString": "abc"}},
+        }
+        for i in range(3):
+            with open(os.path.join(temp_dir, f"test{i}.torrent"), "wb") as f:
+                f.write(b"d8:announce35:http://example.com/announce4:info...")
+
+        with patch("sys.argv", ["transmission_client.py", "--folder", temp_dir, "--quiet"]):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                assert main() == 0
+                lines = [line for line in mock_stdout.getvalue().splitlines() if line.strip()]
+                assert lines == [
+                    "📦 Found 3 .torrent files",
+                    "✅ Successfully added 3/3 torrents (0 duplicates, 0 skipped, 0 errors)",
+                ]
+
+        with patch("sys.argv", ["transmission_client.py", "--folder", temp_dir, "--log-format", "json"]):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                assert main() == 0
+                entries = [json.loads(line) for line in mock_stdout.getvalue().splitlines()]
+                added = [entry for entry in entries if entry.get("outcome") == "added"]
+                assert len(added) == 3
+                assert added[0]["torrent_id"] == 5 and added[0]["hash"] == "abc"
+                assert entries[-1]["event"] == "folder-summary" and entries[-1]["added"] == 3
+
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_metrics_file(self, mock_client_class: Mock, mock_client: Mock, temp_dir: str) -> None:
+        """Test --metrics-file writes the metrics when the run ends"""
+        mock_client_class.return_value = mock_client
+        metrics_file = os.path.join(temp_dir, "pusher.prom")
+
+        with patch("sys.argv", ["transmission_client.py", "--list", "--metrics-file", metrics_file]):
+            with patch("sys.stdout", new=StringIO()):
+                assert main() == 0
+
+        with open(metrics_file) as f:
+            assert "# TYPE transmission_rpc_duration_seconds histogram" in f.read()
+
+    @patch("transmission_pusher.gateway.GatewayServer")
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_serve(self, mock_client_class: Mock, mock_server_class: Mock, mock_client: Mock, temp_dir: str) -> None:
+        """Test serve runs the gateway around one client until interrupted"""
+        mock_client_class.return_value = mock_client
+        server = mock_server_class.return_value
+        server.address = "unix:///run/pusher.sock"
+        server.serve_forever.side_effect = KeyboardInterrupt
+
+        argv = ["transmission_client.py", "serve", "--socket", "/run/pusher.sock", "--jobs", "8", "--token", "t"]
+        with patch("sys.argv", argv):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                assert main() == 0
+                assert "Gateway listening on unix:///run/pusher.sock" in mock_stdout.getvalue()
+
+        gateway = mock_server_class.call_args[0][0]
+        assert gateway.client is mock_client
+        assert gateway.jobs == 8
+        assert mock_server_class.call_args[1] == {
+            "host": "127.0.0.1",
+            "port": 9092,
+            "socket_path": "/run/pusher.sock",
+            "token": "t",
+        }
+        server.close.assert_called_once_with()
+
+    @patch("transmission_pusher.gateway.GatewayServer")
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_serve_default_jobs(self, mock_client_class: Mock, mock_server_class: Mock) -> None:
+        """Test serve runs adds in parallel unless told otherwise"""
+        mock_server_class.return_value.serve_forever.side_effect = KeyboardInterrupt
+
+        with patch("sys.argv", ["transmission_client.py", "serve"]):
+            with patch("sys.stdout", new=StringIO()):
+                assert main() == 0
+
+        assert mock_server_class.call_args[0][0].jobs == 4
+        assert mock_client_class.call_args[1]["pool_size"] == 10
+
+    @patch("transmission_pusher.transmission_client.TransmissionClient")
+    def test_invalid_jobs(self, mock_client_class: Mock, temp_dir: str) -> None:
+        """Test --jobs rejects values below 1"""
+        with patch("sys.argv", ["transmission_client.py", "--folder", temp_dir, "--jobs", "0"]):
+            with patch("sys.stdout", new=StringIO()) as mock_stdout:
+                result = main()
+
+                assert result == 1
+                assert "--jobs must be at least 1" in mock_stdout.getvalue()
+                mock_client_class.assert_not_called()
+
     @patch("transmission_pusher.transmission_client.TransmissionClient")
     def test_no_arguments(self, mock_client_class: Mock) -> None:
         """Test running without arguments"""
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for torrent field selection
+"""
+
+import pytest
+
+from transmission_pusher.fields import DEFAULT_FIELDS, FIELD_PRESETS, TORRENT_FIELDS, resolve_fields
+
+
+class TestResolveFields:
+    """Test cases for resolve_fields"""
+
+    def test_default_fields(self) -> None:
+        """Test that None selects the default fields"""
+        assert resolve_fields() == DEFAULT_FIELDS
+
+    def test_presets(self) -> None:
+        """Test that preset names expand to their field lists"""
+        assert resolve_fields("minimal") == ["id", "status"]
+        assert resolve_fields("list") == ["name", "status", "percentDone"]
+
+    def test_presets_only_use_known_fields(self) -> None:
+        """Test that every preset field is a valid torrent-get field"""
+        for fields in FIELD_PRESETS.values():
+            assert set(fields) <= TORRENT_FIELDS
+
+    def test_explicit_fields_are_deduplicated(self) -> None:
+        """Test that repeated field names are dropped while keeping order"""
+        assert resolve_fields(["rateDownload", "id", "rateDownload"]) == ["rateDownload", "id"]
+
+    def test_unknown_preset(self) -> None:
+        """Test that an unknown preset name is rejected"""
+        with pytest.raises(ValueError, match="Unknown field preset"):
+            resolve_fields("everything")
+
+    def test_unknown_field(self) -> None:
+        """Test that unknown field names are rejected"""
+        with pytest.raises(ValueError, match="Unknown torrent field\\(s\\): bogus"):
+            resolve_fields(["id", "bogus"])
+
+    def test_empty_fields(self) -> None:
+        """Test that an empty field list is rejected"""
+        with pytest.raises(ValueError, match="At least one"):
+            resolve_fields([])
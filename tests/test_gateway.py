@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Tests for the local RPC gateway
+"""
+
+import http.client
+import json
+import socket
+import threading
+from typing import Any, Generator
+from unittest.mock import Mock
+
+import pytest
+
+from transmission_pusher.bencode import info_hash
+from transmission_pusher.gateway import Gateway, GatewayServer, SingleFlight, add_response
+from transmission_pusher.transmission_client import TransmissionClient
+
+METAINFO = b"d4:infod6:lengthi1e4:name5:alphaee"
+
+ADDED = {
+    "result": "success",
+    "arguments": {"torrent-added": {"id": 7, "name": "alpha", "hashString": info_hash(METAINFO)}},
+}
+
+
+class UnixConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix socket"""
+
+    def __init__(self, path: str) -> None:
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def request(
+    connection: http.client.HTTPConnection, method: str, path: str, body: Any = None, headers: Any = None
+) -> tuple[int, Any]:
+    """Send a request and decode the JSON answer"""
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight"""
+
+    def test_concurrent_calls_share_result(self) -> None:
+        """Test callers arriving while a call runs get its result without calling again"""
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow() -> str:
+            calls.append(1)
+            started.set()
+            assert release.wait(5)
+            return "result"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flights.do("key", slow))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        assert started.wait(5)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert len(calls) <= 5
+        assert all(result == "result" for result, _ in results)
+        assert sum(1 for _, shared in results if not shared) == len(calls)
+        # Once finished, the next call runs again
+        assert flights.do("key", lambda: "again") == ("again", False)
+
+    def test_error_shared(self) -> None:
+        """Test the leader's error is raised in waiting callers too"""
+        flights = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing() -> None:
+            started.set()
+            assert release.wait(5)
+            raise ConnectionError("refused")
+
+        errors = []
+
+        def call() -> None:
+            try:
+                flights.do("key", failing)
+            except ConnectionError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        assert started.wait(5)
+        follower = threading.Thread(target=call)
+        follower.start()
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        assert len(errors) == 2
+
+
+class TestGateway:
+    """Test cases for Gateway"""
+
+    @pytest.fixture
+    def client(self) -> Mock:
+        """Create a mock TransmissionClient"""
+        client = Mock(spec=TransmissionClient)
+        client.base_url = "http://localhost:9091/transmission/rpc"
+        client.add_torrent_metainfo.return_value = ADDED
+        client.add_torrent_url.return_value = {"result": "success", "arguments": {"torrent-duplicate": {"id": 3}}}
+        client.get_torrents.return_value = [{"id": 1, "name": "alpha"}]
+        return client
+
+    def test_add_response(self) -> None:
+        """Test add results are summarized"""
+        assert add_response(ADDED) == {"outcome": "added", "id": 7, "name": "alpha", "hash": info_hash(METAINFO)}
+        failed = add_response({"result": "invalid or corrupt torrent file", "backend": "http://a"})
+        assert failed == {"outcome": "error", "error": "invalid or corrupt torrent file", "backend": "http://a"}
+
+    def test_adds(self, client: Mock, tmp_path: Any) -> None:
+        """Test uploads, paths and URLs reach the client"""
+        gateway = Gateway(client)
+        assert gateway.add_metainfo(METAINFO)["outcome"] == "added"
+        client.add_torrent_metainfo.assert_called_once_with(METAINFO)
+
+        path = tmp_path / "alpha.torrent"
+        path.write_bytes(METAINFO)
+        client.add_torrent_file.return_value = ADDED
+        assert gateway.add_file(str(path))["id"] == 7
+        client.add_torrent_file.assert_called_once_with(str(path))
+
+        assert gateway.add_url("magnet:?xt=urn:btih:abc") == {"outcome": "duplicate", "id": 3}
+        assert gateway.status()["requests"] == 3
+
+    def test_list_uses_cache(self, client: Mock) -> None:
+        """Test lists are served from the client's torrent cache"""
+        assert Gateway(client).list_torrents() == [{"id": 1, "name": "alpha"}]
+        client.get_torrents.assert_called_once_with(["name", "status", "percentDone"], cached=True)
+
+    def test_concurrent_lists_coalesced(self, client: Mock) -> None:
+        """Test lists arriving while one is in flight share its torrent-get"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_list(fields: Any, cached: bool) -> list:
+            started.set()
+            assert release.wait(5)
+            return [{"id": 1}]
+
+        client.get_torrents.side_effect = slow_list
+        gateway = Gateway(client)
+        results: list = []
+        leader = threading.Thread(target=lambda: results.append(gateway.list_torrents()))
+        leader.start()
+        assert started.wait(5)
+        followers = [threading.Thread(target=lambda: results.append(gateway.list_torrents())) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        while gateway.status()["in_flight"] < 4:
+            pass
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        assert results == [[{"id": 1}]] * 4
+        assert client.get_torrents.call_count == 1
+        assert gateway.status()["coalesced"] == 3
+
+    def test_job_limit(self, client: Mock) -> None:
+        """Test no more than jobs adds run at once"""
+        running = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def add(url: str) -> dict:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            threading.Event().wait(0.01)
+            with lock:
+                running -= 1
+            return ADDED
+
+        client.add_torrent_url.side_effect = add
+        gateway = Gateway(client, jobs=2)
+        threads = [threading.Thread(target=gateway.add_url, args=(f"http://x/{i}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        assert peak == 2
+
+
+class TestGatewayServer:
+    """Test cases for GatewayServer"""
+
+    @pytest.fixture
+    def client(self) -> Mock:
+        """Create a mock TransmissionClient"""
+        client = Mock(spec=TransmissionClient)
+        client.base_url = "http://localhost:9091/transmission/rpc"
+        client.add_torrent_metainfo.return_value = ADDED
+        client.add_torrent_url.return_value = ADDED
+        client.get_torrents.return_value = [{"id": 1, "name": "alpha"}]
+        return client
+
+    def serve(self, server: GatewayServer) -> Generator[GatewayServer, None, None]:
+        """Run a server in the background for the duration of a test"""
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield server
+        finally:
+            server.close()
+            thread.join(5)
+
+    @pytest.fixture
+    def server(self, client: Mock) -> Generator[GatewayServer, None, None]:
+        """Serve the gateway on a free TCP port"""
+        yield from self.serve(GatewayServer(Gateway(client), port=0))
+
+    @pytest.fixture
+    def connection(self, server: GatewayServer) -> http.client.HTTPConnection:
+        """Open a connection to the server"""
+        return http.client.HTTPConnection(server.address.removeprefix("http://"), timeout=5)
+
+    def test_endpoints(self, client: Mock, connection: http.client.HTTPConnection) -> None:
+        """Test every endpoint over one kept-alive connection"""
+        status, body = request(connection, "POST", "/torrents", METAINFO, {"Content-Type": "application/x-bittorrent"})
+        assert status == 200
+        assert body["outcome"] == "added"
+        client.add_torrent_metainfo.assert_called_once_with(METAINFO)
+
+        url_job = json.dumps({"url": "http://x/a.torrent"})
+        status, body = request(connection, "POST", "/torrents", url_job, {"Content-Type": "application/json"})
+        assert (status, body["id"]) == (200, 7)
+
+        status, body = request(connection, "GET", "/torrents?fields=id,name")
+        assert body == {"torrents": [{"id": 1, "name": "alpha"}]}
+        client.get_torrents.assert_called_once_with(["id", "name"], cached=True)
+
+        status, body = request(connection, "GET", "/status")
+        assert status == 200
+        assert body["requests"] == 3
+        assert body["backends"] == [client.base_url]
+
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert b"transmission_torrent_add_outcomes_total" in response.read()
+
+    def test_bad_requests(self, client: Mock, connection: http.client.HTTPConnection) -> None:
+        """Test malformed requests are answered with client errors"""
+        assert request(connection, "GET", "/nope")[0] == 404
+        assert request(connection, "POST", "/status")[0] == 405
+        assert request(connection, "POST", "/torrents", "x", {"Content-Type": "text/plain"})[0] == 415
+        assert request(connection, "POST", "/torrents", "{}", {"Content-Type": "application/json"})[0] == 400
+        assert request(connection, "GET", "/torrents?fields=nope")[0] == 400
+        path_job = json.dumps({"path": "/no/such.torrent"})
+        status, body = request(connection, "POST", "/torrents", path_job, {"Content-Type": "application/json"})
+        assert status == 400
+        assert "does not exist" in body["error"]
+
+    def test_daemon_error(self, client: Mock, connection: http.client.HTTPConnection) -> None:
+        """Test Transmission failures are answered with 502"""
+        client.get_torrents.side_effect = ConnectionError("refused")
+        assert request(connection, "GET", "/torrents") == (502, {"error": "refused"})
+
+    def raw(self, server: GatewayServer, data: bytes) -> bytes:
+        """Send raw bytes and read until the server closes the connection"""
+        host, port = server.address.removeprefix("http://").rsplit(":", 1)
+        with socket.create_connection((host, int(port)), timeout=5) as sock:
+            sock.sendall(data)
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def test_host_checked(self, client: Mock, server: GatewayServer, connection: http.client.HTTPConnection) -> None:
+        """Test requests naming another host are refused, so DNS rebinding can't reach the gateway"""
+        assert request(connection, "GET", "/status", headers={"Host": "evil.example:9092"})[0] == 421
+        assert request(connection, "GET", "/status", headers={"Host": "localhost"})[0] == 200
+        assert request(connection, "GET", "/status", headers={"Host": "[::1]:9092"})[0] == 200
+
+        url_job = json.dumps({"url": "http://x/a.torrent"})
+        headers = {"Host": "evil.example", "Content-Type": "application/json"}
+        assert request(connection, "POST", "/torrents", url_job, headers)[0] == 421
+        client.add_torrent_url.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "framing, status",
+        [
+            (b"Content-Length: -5", b"400"),
+            (b"Content-Length: abc", b"400"),
+            (b"Transfer-Encoding: chunked", b"411"),
+            (b"Content-Length: 999999999", b"413"),
+        ],
+    )
+    def test_bad_framing_closes(self, server: GatewayServer, framing: bytes, status: bytes) -> None:
+        """Test bodies that can't be read safely are refused and the connection closed"""
+        head = b"POST /torrents HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        response = self.raw(server, head + framing + b"\r\n\r\n5\r\nhello\r\n0\r\n\r\n")
+
+        # One answer, then EOF: the unread body is never parsed as a request
+        assert response.startswith(b"HTTP/1.1 " + status)
+        assert response.count(b"HTTP/1.1") == 1
+
+    def test_token_checked_before_body(self, client: Mock) -> None:
+        """Test an unauthenticated upload is refused without reading its body"""
+        for server in self.serve(GatewayServer(Gateway(client), port=0, token="secret")):
+            head = b"POST /torrents HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/x-bittorrent\r\n"
+            response = self.raw(server, head + b"Content-Length: 1000000\r\n\r\n")
+
+            assert response.startswith(b"HTTP/1.1 401")
+            client.add_torrent_metainfo.assert_not_called()
+
+    def test_token(self, client: Mock) -> None:
+        """Test a configured token is required"""
+        for server in self.serve(GatewayServer(Gateway(client), port=0, token="secret")):
+            connection = http.client.HTTPConnection(server.address.removeprefix("http://"), timeout=5)
+            assert request(connection, "GET", "/status")[0] == 401
+            assert request(connection, "GET", "/status", headers={"Authorization": "Bearer wrong"})[0] == 401
+            assert request(connection, "GET", "/status", headers={"Authorization": "Bearer secret"})[0] == 200
+            # A token makes any Host acceptable, e.g. when exposed to other machines
+            headers = {"Authorization": "Bearer secret", "Host": "nas.lan:9092"}
+            assert request(connection, "GET", "/status", headers=headers)[0] == 200
+
+    def test_unix_socket(self, client: Mock, tmp_path: Any) -> None:
+        """Test serving on a Unix socket, replacing a stale one and removing it on close"""
+        path = str(tmp_path / "gateway.sock")
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+
+        for server in self.serve(GatewayServer(Gateway(client), socket_path=path)):
+            assert server.address == f"unix://{path}"
+            status, body = request(UnixConnection(path), "GET", "/torrents")
+            assert (status, body["torrents"][0]["id"]) == (200, 1)
+        assert not (tmp_path / "gateway.sock").exists()
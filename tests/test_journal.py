@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for IngestJournal class
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Generator
+
+import pytest
+
+from transmission_pusher.journal import IngestJournal
+
+
+class TestIngestJournal:
+    """Test cases for IngestJournal class"""
+
+    @pytest.fixture
+    def temp_dir(self) -> Generator[str, None, None]:
+        """Create a temporary directory for testing"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def _torrent(self, temp_dir: str, name: str = "test.torrent", content: bytes = b"d4:infode") -> str:
+        path = os.path.join(temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_unknown_file_is_not_done(self, temp_dir: str) -> None:
+        """Test that files never recorded are pending"""
+        with IngestJournal(os.path.join(temp_dir, "journal.db")) as journal:
+            assert not journal.is_done(self._torrent(temp_dir))
+
+    @pytest.mark.parametrize("outcome", ["added", "duplicate", "skipped"])
+    def test_completed_outcomes(self, temp_dir: str, outcome: str) -> None:
+        """Test that completed files are done"""
+        path = self._torrent(temp_dir)
+        with IngestJournal(os.path.join(temp_dir, "journal.db")) as journal:
+            journal.record(path, outcome, infohash="abc")
+            assert journal.is_done(path)
+
+    def test_failed_files_are_retried(self, temp_dir: str) -> None:
+        """Test that failed files are not done"""
+        path = self._torrent(temp_dir)
+        with IngestJournal(os.path.join(temp_dir, "journal.db")) as journal:
+            journal.record(path, "error", error="Connection refused")
+            assert not journal.is_done(path)
+            assert journal.outcome(path) == "error"
+
+    def test_changed_file_is_not_done(self, temp_dir: str) -> None:
+        """Test that a file replaced after being recorded is uploaded again"""
+        path = self._torrent(temp_dir)
+        with IngestJournal(os.path.join(temp_dir, "journal.db")) as journal:
+            journal.record(path, "added")
+            self._torrent(temp_dir, content=b"d4:infod4:name3:newee")
+            assert not journal.is_done(path)
+
+    def test_outcomes_persist_across_runs(self, temp_dir: str) -> None:
+        """Test that a reopened journal remembers earlier outcomes"""
+        path = self._torrent(temp_dir)
+        journal_path = os.path.join(temp_dir, "journal.db")
+        with IngestJournal(journal_path) as journal:
+            journal.record(path, "added")
+
+        with IngestJournal(journal_path) as journal:
+            assert journal.is_done(path)
+            assert journal.outcome(path) == "added"
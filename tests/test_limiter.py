@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive concurrency limiter
+"""
+
+import threading
+import time
+
+import pytest
+
+from transmission_pusher.limiter import AdaptiveLimiter, percentile
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(limiter: AdaptiveLimiter, clock: FakeClock, latency: float, ok: bool = True) -> None:
+    """Simulate one request taking latency seconds"""
+    started = limiter.acquire()
+    clock.now += latency
+    limiter.release(started, ok=ok)
+
+
+class TestPercentile:
+    """Test cases for percentile"""
+
+    def test_nearest_rank(self) -> None:
+        """Test the nearest-rank percentile"""
+        samples = [float(i) for i in range(1, 101)]
+        assert percentile(samples, 0.95) == 95.0
+        assert percentile(samples, 0.5) == 50.0
+        assert percentile([3.0], 0.95) == 3.0
+
+
+class TestAdaptiveLimiter:
+    """Test cases for AdaptiveLimiter"""
+
+    def test_additive_increase(self) -> None:
+        """Test the limit grows while latency stays flat, up to max_limit"""
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(max_limit=8, clock=clock)
+        for _ in range(10):
+            run(limiter, clock, 0.01)
+        assert 3 <= limiter.limit < 8
+
+        for _ in range(200):
+            run(limiter, clock, 0.01)
+        assert limiter.limit == 8
+
+    def test_backoff_on_spike(self) -> None:
+        """Test a latency spike halves the limit"""
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(initial_limit=8, max_limit=8, clock=clock)
+        for _ in range(20):
+            run(limiter, clock, 0.01)
+        assert limiter.limit == 8
+
+        run(limiter, clock, 0.5)
+        assert limiter.limit == 4
+        assert limiter.baseline == pytest.approx(0.01, rel=0.1)
+
+    def test_backoff_on_error(self) -> None:
+        """Test failures halve the limit, but never below min_limit"""
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(initial_limit=8, min_limit=2, max_limit=8, clock=clock)
+        run(limiter, clock, 0.01, ok=False)
+        assert limiter.limit == 4
+        for _ in range(5):
+            run(limiter, clock, 0.01, ok=False)
+        assert limiter.limit == 2
+
+    def test_one_decrease_per_congestion_event(self) -> None:
+        """Test requests started before a decrease don't decrease the limit again"""
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(initial_limit=8, max_limit=8, clock=clock)
+        started = [limiter.acquire() for _ in range(4)]
+        clock.now += 1
+        for start in started:
+            limiter.release(start, ok=False)
+        assert limiter.limit == 4
+
+    def test_blocks_at_limit(self) -> None:
+        """Test callers wait while the limit is reached"""
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+        started = limiter.acquire()
+        acquired = threading.Event()
+
+        def worker() -> None:
+            limiter.release(limiter.acquire())
+            acquired.set()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        time.sleep(0.05)
+        assert not acquired.is_set()
+        limiter.release(started)
+        thread.join(1)
+        assert acquired.is_set()
+
+    def test_acquire_timeout_and_cancel(self) -> None:
+        """Test acquire gives up after its timeout and cancel frees a slot without a sample"""
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+        assert limiter.acquire() is not None
+
+        assert limiter.acquire(timeout=0.01) is None
+        limiter.cancel()
+
+        assert limiter.in_flight == 0
+        assert limiter.p95 is None
+        assert limiter.acquire(timeout=0.01) is not None
+
+    def test_snapshot(self) -> None:
+        """Test the exposed statistics"""
+        clock = FakeClock()
+        limiter = AdaptiveLimiter(clock=clock)
+        assert limiter.snapshot() == {"limit": 1, "in_flight": 0, "p50": None, "p95": None, "baseline": None}
+        for latency in (0.01, 0.02, 0.03):
+            run(limiter, clock, latency)
+        snapshot = limiter.snapshot()
+        assert snapshot["p50"] == pytest.approx(0.02)
+        assert snapshot["p95"] == pytest.approx(0.03)
+        assert limiter.p95 == pytest.approx(0.03)
+
+    def test_invalid_limits(self) -> None:
+        """Test inconsistent limits are rejected"""
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(min_limit=4, max_limit=2)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Tests for logging setup
+"""
+
+import json
+import logging
+from io import StringIO
+
+from transmission_pusher.log import LOGGER_NAME, JsonFormatter, configure_logging, summary
+
+
+class TestLogging:
+    """Test cases for the log formatters and configuration"""
+
+    def test_json_formatter(self) -> None:
+        """Test that JSON lines carry the structured fields"""
+        record = logging.LogRecord(LOGGER_NAME, logging.INFO, __file__, 1, "\n✅ Added", None, None)
+        record.torrent_id = 7
+        record.hash = "abc"
+        record.duration = 0.25
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "✅ Added"
+        assert entry["level"] == "info"
+        assert entry["torrent_id"] == 7
+        assert entry["hash"] == "abc"
+        assert entry["duration"] == 0.25
+        assert "time" in entry
+
+    def test_quiet_mode(self) -> None:
+        """Test that quiet mode keeps only summaries and errors"""
+        stream = StringIO()
+        configure_logging(quiet=True, stream=stream)
+        logger = logging.getLogger(f"{LOGGER_NAME}.test")
+
+        logger.info("per-file detail")
+        logger.info("final summary", extra=summary())
+        logger.error("an error")
+
+        assert stream.getvalue().splitlines() == ["final summary", "an error"]
+
+    def test_reconfigure_replaces_handler(self) -> None:
+        """Test that configuring twice doesn't duplicate output"""
+        first, second = StringIO(), StringIO()
+        configure_logging(stream=first)
+        configure_logging(log_format="json", stream=second)
+
+        logging.getLogger(f"{LOGGER_NAME}.test").info("hello")
+
+        assert first.getvalue() == ""
+        assert json.loads(second.getvalue())["message"] == "hello"
+
+    def test_library_is_silent(self) -> None:
+        """Test that the package installs a NullHandler for library users"""
+        import transmission_pusher  # noqa: F401
+
+        handlers = logging.getLogger(LOGGER_NAME).handlers
+        assert any(isinstance(handler, logging.NullHandler) for handler in handlers)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for Prometheus-style metrics
+"""
+
+import os
+import urllib.error
+import urllib.request
+
+import pytest
+
+from transmission_pusher.metrics import MetricsServer, Registry
+
+
+class TestMetrics:
+    """Test cases for counters, gauges and histograms"""
+
+    def test_counter(self) -> None:
+        """Test counters render one sample per label set"""
+        registry = Registry()
+        counter = registry.counter("requests_total", "Requests sent", ["method"])
+        counter.inc(method="torrent-get")
+        counter.inc(2, method="torrent-add")
+
+        assert counter.value(method="torrent-get") == 1
+        assert registry.render() == (
+            "# HELP requests_total Requests sent\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{method="torrent-add"} 2\n'
+            'requests_total{method="torrent-get"} 1\n'
+        )
+        with pytest.raises(ValueError):
+            counter.inc(-1, method="torrent-get")
+
+    def test_labels_checked(self) -> None:
+        """Test that label names must match and values are escaped"""
+        registry = Registry()
+        counter = registry.counter("errors_total", "Errors", ["reason"])
+        with pytest.raises(ValueError):
+            counter.inc(method="x")
+        counter.inc(reason='say "hi"\n')
+        assert 'errors_total{reason="say \\"hi\\"\\n"} 1' in registry.render()
+
+    def test_gauge(self) -> None:
+        """Test gauges go up and down"""
+        registry = Registry()
+        gauge = registry.gauge("in_flight", "Requests in flight")
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        assert gauge.value() == 1
+        gauge.set(0.5)
+        assert "in_flight 0.5\n" in registry.render()
+
+    def test_histogram(self) -> None:
+        """Test histograms render cumulative buckets, sum and count"""
+        registry = Registry()
+        histogram = registry.histogram("duration_seconds", "Duration", ["method"], buckets=[0.1, 1])
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value, method="m")
+
+        assert histogram.count(method="m") == 3
+        lines = registry.render().splitlines()
+        assert 'duration_seconds_bucket{method="m",le="0.1"} 1' in lines
+        assert 'duration_seconds_bucket{method="m",le="1"} 2' in lines
+        assert 'duration_seconds_bucket{method="m",le="+Inf"} 3' in lines
+        assert 'duration_seconds_sum{method="m"} 5.55' in lines
+        assert 'duration_seconds_count{method="m"} 3' in lines
+
+    def test_register_returns_existing(self) -> None:
+        """Test that registering a name twice returns the first metric"""
+        registry = Registry()
+        first = registry.counter("c", "C")
+        assert registry.counter("c", "C") is first
+
+    def test_register_checks_type(self) -> None:
+        """Test that a name registered as one kind of metric is not handed out as another"""
+        registry = Registry()
+        registry.gauge("g", "G")
+
+        with pytest.raises(ValueError, match="already registered as a gauge"):
+            registry.counter("g", "G")
+
+    def test_write_textfile(self, tmp_path: str) -> None:
+        """Test that the textfile is written completely and without leftovers"""
+        registry = Registry()
+        registry.counter("c_total", "C").inc()
+        path = os.path.join(tmp_path, "pusher.prom")
+
+        registry.write_textfile(path)
+
+        with open(path) as f:
+            assert f.read() == registry.render()
+        assert os.listdir(tmp_path) == ["pusher.prom"]
+
+    def test_http_server(self) -> None:
+        """Test that /metrics serves the registry and other paths 404"""
+        registry = Registry()
+        registry.gauge("up", "Up").set(1)
+        server = MetricsServer(registry, 0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as response:
+                assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+                assert response.read().decode() == registry.render()
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://127.0.0.1:{server.port}/", timeout=5)
+        finally:
+            server.close()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Tests for the retry policy and circuit breaker
+"""
+
+from unittest.mock import Mock
+
+import pytest
+import requests
+
+from transmission_pusher.retry import CircuitBreaker, CircuitOpenError, DeadlineExceeded, RetryPolicy, is_retryable
+
+ENDPOINT = "http://localhost:9091/transmission/rpc"
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def http_error(status: int) -> requests.exceptions.HTTPError:
+    """Build an HTTPError carrying a response with the given status"""
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(f"{status}", response=response)
+
+
+class TestIsRetryable:
+    """Test cases for is_retryable"""
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            requests.exceptions.ConnectionError("reset"),
+            requests.exceptions.ReadTimeout("slow"),
+            http_error(409),
+            http_error(503),
+        ],
+    )
+    def test_retryable(self, error: Exception) -> None:
+        """Test transient failures are retried"""
+        assert is_retryable(error)
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            http_error(401),
+            http_error(404),
+            CircuitOpenError("open"),
+            DeadlineExceeded("late"),
+            ValueError("bad"),
+            OSError("disk"),
+        ],
+    )
+    def test_not_retryable(self, error: Exception) -> None:
+        """Test permanent failures are not retried"""
+        assert not is_retryable(error)
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker"""
+
+    def test_opens_and_recovers(self) -> None:
+        """Test the breaker opens at the threshold and lets one trial through after the timeout"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        assert breaker.state == "closed"
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert not breaker.allow()
+
+        clock.now += 10
+        assert breaker.state == "half-open"
+        assert breaker.allow()
+        assert not breaker.allow()  # Only one trial at a time
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self) -> None:
+        """Test a failing trial call opens the circuit again"""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now += 10
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == "open"
+
+
+class TestRetryPolicy:
+    """Test cases for RetryPolicy"""
+
+    @pytest.fixture
+    def clock(self) -> FakeClock:
+        """Create a fake clock"""
+        return FakeClock()
+
+    def test_retries_until_success(self, clock: FakeClock) -> None:
+        """Test transient failures are retried with growing backoff"""
+        policy = RetryPolicy(max_attempts=4, base_delay=1, clock=clock, sleep=clock.sleep)
+        func = Mock(side_effect=[requests.exceptions.ConnectionError("reset"), http_error(502), "ok"])
+
+        assert policy.call(func, ENDPOINT) == "ok"
+        assert func.call_count == 3
+        assert clock.now <= 1 + 2
+
+    def test_gives_up_after_max_attempts(self, clock: FakeClock) -> None:
+        """Test the last error is raised once attempts run out"""
+        policy = RetryPolicy(max_attempts=3, clock=clock, sleep=clock.sleep)
+        func = Mock(side_effect=requests.exceptions.ConnectionError("refused"))
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            policy.call(func, ENDPOINT)
+        assert func.call_count == 3
+
+    def test_deadline(self, clock: FakeClock) -> None:
+        """Test no retry starts past the deadline"""
+        policy = RetryPolicy(max_attempts=100, base_delay=1, max_delay=1, deadline=5, clock=clock, sleep=clock.sleep)
+
+        def slow_failure() -> None:
+            clock.now += 2
+            raise requests.exceptions.ReadTimeout("slow")
+
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            policy.call(slow_failure, ENDPOINT)
+        assert clock.now < 5 + 2
+
+    def test_caller_expiry(self, clock: FakeClock) -> None:
+        """Test the caller's own expiry stops retries before the policy deadline"""
+        policy = RetryPolicy(max_attempts=100, base_delay=1, max_delay=1, deadline=60, clock=clock, sleep=clock.sleep)
+        func = Mock(side_effect=requests.exceptions.ConnectionError("refused"))
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            policy.call(func, ENDPOINT, expires=3)
+        assert clock.now < 3
+
+    def test_permanent_errors_not_retried(self, clock: FakeClock) -> None:
+        """Test non-retryable errors are raised at once and don't trip the breaker"""
+        policy = RetryPolicy(failure_threshold=1, clock=clock, sleep=clock.sleep)
+        func = Mock(side_effect=http_error(401))
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            policy.call(func, ENDPOINT)
+        assert func.call_count == 1
+        assert policy.breaker(ENDPOINT).state == "closed"
+
+    def test_circuit_fails_fast(self, clock: FakeClock) -> None:
+        """Test a dead endpoint fails fast, per endpoint"""
+        policy = RetryPolicy(max_attempts=2, failure_threshold=2, reset_timeout=30, clock=clock, sleep=clock.sleep)
+        func = Mock(side_effect=requests.exceptions.ConnectionError("refused"))
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            policy.call(func, ENDPOINT)
+        with pytest.raises(CircuitOpenError):
+            policy.call(func, ENDPOINT)
+        assert func.call_count == 2
+
+        assert policy.call(lambda: "ok", "http://other:9091/transmission/rpc") == "ok"
+
+    def test_backoff_bounds(self) -> None:
+        """Test jittered delays stay within the exponential envelope"""
+        policy = RetryPolicy(base_delay=0.5, max_delay=3)
+        for retry in range(6):
+            assert 0 <= policy.backoff(retry) <= min(3, 0.5 * 2**retry)
+
+    def test_invalid_attempts(self) -> None:
+        """Test at least one attempt is required"""
+        with pytest.raises(ValueError):
+            RetryPolicy(max_attempts=0)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming directory scanner
+"""
+
+import os
+import shutil
+import tempfile
+from typing import Generator
+
+import pytest
+
+from transmission_pusher.scan import iter_torrent_files
+
+
+class TestIterTorrentFiles:
+    """Test cases for iter_torrent_files"""
+
+    @pytest.fixture
+    def tree(self) -> Generator[str, None, None]:
+        """Create a nested folder of torrent and non-torrent files"""
+        root = tempfile.mkdtemp()
+        for relative in [
+            "top.torrent",
+            "UPPER.TORRENT",
+            "notes.txt",
+            "a/one.torrent",
+            "a/b/two.torrent",
+            "a/b/c/three.torrent",
+            "tmp/partial.torrent",
+        ]:
+            path = os.path.join(root, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(b"d4:infode")
+        yield root
+        shutil.rmtree(root)
+
+    def _relative(self, root: str, paths: list[str]) -> list[str]:
+        return sorted(os.path.relpath(path, root) for path in paths)
+
+    def test_flat_scan(self, tree: str) -> None:
+        """Test that only the top folder is scanned by default"""
+        assert self._relative(tree, list(iter_torrent_files(tree))) == ["UPPER.TORRENT", "top.torrent"]
+
+    def test_recursive_scan(self, tree: str) -> None:
+        """Test that subfolders are scanned when recursive"""
+        found = self._relative(tree, list(iter_torrent_files(tree, recursive=True)))
+        assert found == [
+            "UPPER.TORRENT",
+            "a/b/c/three.torrent",
+            "a/b/two.torrent",
+            "a/one.torrent",
+            "tmp/partial.torrent",
+            "top.torrent",
+        ]
+
+    def test_max_depth(self, tree: str) -> None:
+        """Test that max_depth limits how deep the scan goes"""
+        found = self._relative(tree, list(iter_torrent_files(tree, recursive=True, max_depth=1)))
+        assert found == ["UPPER.TORRENT", "a/one.torrent", "tmp/partial.torrent", "top.torrent"]
+
+    def test_exclude_prunes_folders(self, tree: str) -> None:
+        """Test that excluded folders are not entered"""
+        found = self._relative(tree, list(iter_torrent_files(tree, recursive=True, exclude=["tmp", "b"])))
+        assert found == ["UPPER.TORRENT", "a/one.torrent", "top.torrent"]
+
+    def test_include_by_relative_path(self, tree: str) -> None:
+        """Test that include patterns can match the relative path"""
+        found = self._relative(tree, list(iter_torrent_files(tree, recursive=True, include=["a/b/*.torrent"])))
+        # As with fnmatch, "*" also matches "/"
+        assert found == ["a/b/c/three.torrent", "a/b/two.torrent"]
+
+    def test_is_lazy(self, tree: str) -> None:
+        """Test that files are yielded before the scan completes"""
+        iterator = iter_torrent_files(tree, recursive=True)
+        first = next(iterator)
+        assert first.lower().endswith(".torrent")
+        iterator.close()
+
+    def test_skips_symlinked_folders(self, tree: str) -> None:
+        """Test that symbolic links to folders are not followed"""
+        os.symlink(tree, os.path.join(tree, "a", "loop"))
+        found = list(iter_torrent_files(tree, recursive=True))
+        assert len(found) == 6
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-process session id cache
+"""
+
+import os
+import stat
+from typing import Any
+
+import pytest
+
+from transmission_pusher.session_cache import SessionIdCache, default_cache_dir
+
+ENDPOINT = "http://localhost:9091/transmission/rpc"
+
+
+class TestSessionIdCache:
+    """Test cases for SessionIdCache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path: Any) -> SessionIdCache:
+        """Create a cache in a temporary directory"""
+        return SessionIdCache(str(tmp_path / "cache"))
+
+    def test_default_dir(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the cache lives under XDG_RUNTIME_DIR when it is set"""
+        monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1000")
+        assert default_cache_dir() == "/run/user/1000/transmission-pusher"
+        monkeypatch.delenv("XDG_RUNTIME_DIR")
+        assert default_cache_dir().endswith(f"transmission-pusher-{os.getuid()}")
+
+    def test_round_trip(self, cache: SessionIdCache) -> None:
+        """Test a stored id is loaded back for the same endpoint and user only"""
+        assert cache.load(ENDPOINT, "alice") is None
+
+        cache.store(ENDPOINT, "alice", "id-1")
+        assert cache.load(ENDPOINT, "alice") == "id-1"
+        assert cache.load(ENDPOINT, "bob") is None
+        assert cache.load("http://other:9091/transmission/rpc", "alice") is None
+
+        cache.store(ENDPOINT, "alice", "id-2")
+        assert cache.load(ENDPOINT, "alice") == "id-2"
+
+    def test_permissions(self, cache: SessionIdCache) -> None:
+        """Test the directory and files are private and no temporary files are left"""
+        cache.store(ENDPOINT, None, "id")
+        assert stat.S_IMODE(os.stat(cache.directory).st_mode) == 0o700
+        assert stat.S_IMODE(os.stat(cache.path(ENDPOINT)).st_mode) == 0o600
+        assert os.listdir(cache.directory) == [os.path.basename(cache.path(ENDPOINT))]
+
+    def test_shared_directory_ignored(self, cache: SessionIdCache) -> None:
+        """Test a directory other users can access is neither read nor written"""
+        cache.store(ENDPOINT, None, "id")
+        os.chmod(cache.directory, 0o755)
+
+        assert cache.load(ENDPOINT) is None
+        cache.store(ENDPOINT, None, "other")
+        with open(cache.path(ENDPOINT)) as f:
+            assert f.read() == "id"
+
+    def test_errors_ignored(self, tmp_path: Any) -> None:
+        """Test an unusable cache location doesn't raise"""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        cache = SessionIdCache(str(blocker / "cache"))
+        cache.store(ENDPOINT, None, "id")
+        assert cache.load(ENDPOINT) is None
+
+    def test_without_user_ids(self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the cache works on platforms without os.getuid, like Windows"""
+        monkeypatch.delattr(os, "getuid")
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+        assert default_cache_dir() == str(tmp_path / "transmission-pusher")
+
+        cache = SessionIdCache()
+        cache.store(ENDPOINT, None, "id")
+        assert cache.load(ENDPOINT) == "id"
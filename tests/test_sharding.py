@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Tests for sharded ingestion across several daemons
+"""
+
+import os
+import threading
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+
+from transmission_pusher.bencode import file_info_hash
+from transmission_pusher.sharding import BackendError, BackendLoad, HashRing, ShardedTransmissionClient
+
+BACKENDS = ["http://a:9091/transmission", "http://b:9091/transmission", "http://c:9091/transmission"]
+
+
+def write_torrent(folder: str, name: str, size: int = 1) -> str:
+    """Write a small valid .torrent file and return its path"""
+    info = b"d6:lengthi" + str(size).encode() + b"e4:name" + str(len(name)).encode() + b":" + name.encode() + b"e"
+    path = os.path.join(folder, f"{name}.torrent")
+    with open(path, "wb") as f:
+        f.write(b"d4:info" + info + b"e")
+    return path
+
+
+class TestHashRing:
+    """Test cases for HashRing"""
+
+    def test_stable_placement(self) -> None:
+        """Test the same key always lands on the same node"""
+        ring = HashRing(BACKENDS)
+        other = HashRing(reversed(BACKENDS))
+        for key in (f"key-{i}" for i in range(100)):
+            assert ring.node_for(key) == other.node_for(key)
+
+    def test_spread(self) -> None:
+        """Test keys are spread over every node"""
+        ring = HashRing(BACKENDS)
+        placed = [ring.node_for(f"key-{i}") for i in range(3000)]
+        for node in BACKENDS:
+            assert placed.count(node) > 600
+
+    def test_minimal_movement(self) -> None:
+        """Test adding or removing a node only moves that node's keys"""
+        ring = HashRing(BACKENDS[:2])
+        keys = [f"key-{i}" for i in range(2000)]
+        before = {key: ring.node_for(key) for key in keys}
+
+        ring.add(BACKENDS[2])
+        after = {key: ring.node_for(key) for key in keys}
+        moved = [key for key in keys if before[key] != after[key]]
+        assert all(after[key] == BACKENDS[2] for key in moved)
+        assert len(moved) < len(keys) / 2
+
+        ring.remove(BACKENDS[2])
+        assert {key: ring.node_for(key) for key in keys} == before
+        assert ring.nodes == sorted(BACKENDS[:2])
+
+    def test_empty(self) -> None:
+        """Test an empty ring refuses to place keys"""
+        with pytest.raises(ValueError):
+            HashRing().node_for("key")
+
+
+class TestShardedTransmissionClient:
+    """Test cases for ShardedTransmissionClient"""
+
+    @pytest.fixture
+    def clients(self) -> Any:
+        """Patch TransmissionClient with one mock per backend"""
+        mocks = {url: Mock(name=url) for url in BACKENDS}
+        with patch(
+            "transmission_pusher.sharding.TransmissionClient", side_effect=lambda **kwargs: mocks[kwargs["base_url"]]
+        ):
+            yield mocks
+
+    def test_requires_backends(self) -> None:
+        """Test at least one backend is needed"""
+        with pytest.raises(ValueError):
+            ShardedTransmissionClient([])
+
+    def test_routes_by_infohash(self, clients: dict[str, Mock], tmp_path: Any) -> None:
+        """Test files are routed by infohash, not by path"""
+        path = write_torrent(str(tmp_path), "alpha")
+        backend = HashRing(BACKENDS).node_for(file_info_hash(path))
+        clients[backend].add_torrent_file.return_value = {"result": "success"}
+
+        with ShardedTransmissionClient(BACKENDS) as client:
+            assert client.backend_for(path) == backend
+            result = client.add_torrent_file(path, verbose=False)
+
+        assert result == {"result": "success", "backend": backend}
+        clients[backend].add_torrent_file.assert_called_once_with(path, False, None)
+        for url, mock in clients.items():
+            if url != backend:
+                mock.add_torrent_file.assert_not_called()
+
+    def test_routes_metainfo_by_infohash(self, clients: dict[str, Mock], tmp_path: Any) -> None:
+        """Test uploaded metainfo goes where the same file would"""
+        path = write_torrent(str(tmp_path), "alpha")
+        with open(path, "rb") as f:
+            metainfo = f.read()
+        backend = HashRing(BACKENDS).node_for(file_info_hash(path))
+        clients[backend].add_torrent_metainfo.return_value = {"result": "success"}
+
+        with ShardedTransmissionClient(BACKENDS) as client:
+            assert client.backend_for_metainfo(metainfo) == client.backend_for(path) == backend
+            assert client.add_torrent_metainfo(metainfo)["backend"] == backend
+        clients[backend].add_torrent_metainfo.assert_called_once_with(metainfo, True)
+
+    def test_slow_backend_does_not_stall_others(self, clients: dict[str, Mock], tmp_path: Any) -> None:
+        """Test healthy backends keep receiving files while one backend hangs"""
+        paths = [write_torrent(str(tmp_path), f"torrent{i}") for i in range(30)]
+        client = ShardedTransmissionClient(BACKENDS, jobs_per_backend=2)
+        slow = client.backend_for(paths[0])
+        release = threading.Event()
+
+        def hang(path: str, verbose: bool, known_hashes: Any) -> dict:
+            assert release.wait(5)
+            return {"result": "success"}
+
+        for url, mock in clients.items():
+            if url == slow:
+                mock.add_torrent_file.side_effect = hang
+            else:
+                mock.add_torrent_file.return_value = {"result": "success"}
+
+        slow_count = sum(1 for path in paths if client.backend_for(path) == slow)
+        assert slow_count > 4
+        fast_count = len(paths) - slow_count
+        read = []
+
+        def scan() -> Any:
+            for path in paths:
+                read.append(path)
+                yield path
+
+        results = client.add_torrent_files(scan())
+        try:
+            # Every healthy backend's result comes through while the slow one still hangs
+            for _ in range(fast_count):
+                _, result, error = next(results)
+                assert error is None
+                assert result["backend"] != slow
+            # At most 2 * jobs_per_backend uploads were handed to the slow backend; the rest wait parked
+            assert clients[slow].add_torrent_file.call_count <= 4
+            release.set()
+            remaining = list(results)
+        finally:
+            release.set()
+            client.close()
+
+        assert len(read) == len(paths)
+        assert len(remaining) == slow_count
+        assert all(result["backend"] == slow for _, result, _ in remaining)
+        assert clients[slow].add_torrent_file.call_count == slow_count
+
+    def test_backend_errors(self, clients: dict[str, Mock], tmp_path: Any) -> None:
+        """Test a dead backend's errors name the backend"""
+        path = write_torrent(str(tmp_path), "beta")
+        client = ShardedTransmissionClient(BACKENDS)
+        backend = client.backend_for(path)
+        clients[backend].add_torrent_file.side_effect = ConnectionError("refused")
+
+        [(result_path, result, error)] = list(client.add_torrent_files([path]))
+        client.close()
+
+        assert result_path == path
+        assert result is None
+        assert isinstance(error, BackendError)
+        assert error.backend == backend
+        assert str(error) == f"{backend}: refused"
+
+    def test_known_hashes_and_iter(self, clients: dict[str, Mock]) -> None:
+        """Test listing merges every backend"""
+        for index, mock in enumerate(clients.values()):
+            mock.known_hashes.return_value = {f"hash{index}"}
+            mock.iter_torrents.side_effect = lambda fields=None, i=index: iter([{"id": i}])
+
+        with ShardedTransmissionClient(BACKENDS) as client:
+            assert client.known_hashes() == {"hash0", "hash1", "hash2"}
+            torrents = list(client.iter_torrents(fields="list"))
+
+        assert sorted(torrent["backend"] for torrent in torrents) == BACKENDS
+        for mock in clients.values():
+            mock.close.assert_called_once_with()
+
+    def test_listing_skips_failed_backends(self, clients: dict[str, Mock], caplog: Any) -> None:
+        """Test an unreachable backend is logged and skipped instead of aborting the listing"""
+        dead = BACKENDS[1]
+        for index, (url, mock) in enumerate(clients.items()):
+            if url == dead:
+                mock.known_hashes.side_effect = ConnectionError("refused")
+                mock.iter_torrents.side_effect = ConnectionError("refused")
+            else:
+                mock.known_hashes.return_value = {f"hash{index}"}
+                mock.iter_torrents.side_effect = lambda fields=None, i=index: iter([{"id": i}])
+
+        with ShardedTransmissionClient(BACKENDS) as client:
+            with caplog.at_level("WARNING", logger="transmission_pusher.sharding"):
+                assert client.known_hashes() == {"hash0", "hash2"}
+                torrents = list(client.iter_torrents(fields="list"))
+
+        assert sorted(torrent["id"] for torrent in torrents) == [0, 2]
+        assert [record.backend for record in caplog.records] == [dead, dead]
+
+    def test_listing_fails_without_backends(self, clients: dict[str, Mock]) -> None:
+        """Test listing raises when no backend answers, and bad fields are rejected up front"""
+        for mock in clients.values():
+            mock.known_hashes.side_effect = ConnectionError("refused")
+
+        with ShardedTransmissionClient(BACKENDS) as client:
+            with pytest.raises(BackendError, match="refused"):
+                client.known_hashes()
+            with pytest.raises(ValueError):
+                client.iter_torrents(fields="nope")
+
+        for mock in clients.values():
+            mock.iter_torrents.assert_not_called()
+
+
+class TestLoadPlacement:
+    """Test cases for load-aware placement"""
+
+    @pytest.fixture
+    def clients(self) -> Any:
+        """Patch TransmissionClient with one mock per backend reporting its load"""
+        loads = {BACKENDS[0]: (1000, 0), BACKENDS[1]: (5000, 4), BACKENDS[2]: (3000, 0)}
+        mocks = {}
+        for url, (free, active) in loads.items():
+            mock = Mock(name=url)
+            mock.free_space.return_value = free
+            mock.session_stats.return_value = {"activeTorrentCount": active, "torrentCount": active + 1}
+            mocks[url] = mock
+        with patch(
+            "transmission_pusher.sharding.TransmissionClient", side_effect=lambda **kwargs: mocks[kwargs["base_url"]]
+        ):
+            yield mocks
+
+    def test_headroom(self) -> None:
+        """Test headroom shares free space among active torrents"""
+        load = BackendLoad(free_bytes=1000, active_torrents=1, torrent_count=3)
+        assert load.headroom(200) == 400
+        load.reserved = 900
+        assert load.headroom(200) < 0
+
+    def test_most_headroom_wins(self, clients: dict[str, Mock], tmp_path: Any) -> None:
+        """Test torrents go to the daemon with the most headroom, and reservations spread a batch"""
+        with ShardedTransmissionClient(BACKENDS, placement="load") as client:
+            # 3000 free and idle beats 5000 free shared by 4 active torrents
+            assert client.backend_for(write_torrent(str(tmp_path), "one", 500)) == BACKENDS[2]
+            # 2500 left on c still beats 4500 shared by 5 on b
+            assert client.backend_for(write_torrent(str(tmp_path), "two", 500)) == BACKENDS[2]
+            # Too big for c once reserved, only b can hold it
+            assert client.backend_for(write_torrent(str(tmp_path), "big", 4000)) == BACKENDS[1]
+
+        # Loads are cached between placements
+        for mock in clients.values():
+            mock.free_space.assert_called_once_with()
+            mock.session_stats.assert_called_once_with()
+
+    def test_deeply_nested_file_is_placed(self, clients: dict[str, Mock], tmp_path: Any) -> None:
+        """Test a file nested deeper than the stack is sized and placed instead of aborting the run"""
+        path = os.path.join(str(tmp_path), "nested.torrent")
+        with open(path, "wb") as f:
+            f.write(b"d4:infod6:lengthi500e1:x" + b"l" * 5000 + b"e" * 5000 + b"ee")
+
+        with ShardedTransmissionClient(BACKENDS, placement="load") as client:
+            assert client.backend_for(path) == BACKENDS[2]
+
+    def test_dead_backend_skipped(self, clients: dict[str, Mock], tmp_path: Any) -> None:
+        """Test daemons that don't answer are left out, falling back to hashing if none answer"""
+        clients[BACKENDS[2]].session_stats.side_effect = ConnectionError("refused")
+        path = write_torrent(str(tmp_path), "one", 500)
+        with ShardedTransmissionClient(BACKENDS, placement="load") as client:
+            assert client.backend_for(path) == BACKENDS[1]
+
+        for mock in clients.values():
+            mock.session_stats.side_effect = ConnectionError("refused")
+        with ShardedTransmissionClient(BACKENDS, placement="load") as client:
+            assert client.backend_for(path) == HashRing(BACKENDS).node_for(file_info_hash(path))
+
+    def test_refresh_after_ttl(self, clients: dict[str, Mock], tmp_path: Any) -> None:
+        """Test stale snapshots are fetched again"""
+        path = write_torrent(str(tmp_path), "one")
+        with ShardedTransmissionClient(BACKENDS, placement="load", load_ttl=0) as client:
+            client.backend_for(path)
+            client.backend_for(path)
+        assert clients[BACKENDS[0]].free_space.call_count == 2
+
+    def test_unknown_placement(self) -> None:
+        """Test unknown placement strategies are rejected"""
+        with pytest.raises(ValueError):
+            ShardedTransmissionClient(BACKENDS, placement="random")
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Tests for the standalone n8n script
+"""
+
+import importlib.util
+import io
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Generator, Iterator
+
+import pytest
+
+STANDALONE_PATH = os.path.join(os.path.dirname(__file__), os.pardir, "n8n", "transmission_standalone.py")
+
+# The script lives outside the package, so load it from its path
+_spec = importlib.util.spec_from_file_location("transmission_standalone", STANDALONE_PATH)
+assert _spec is not None and _spec.loader is not None
+standalone = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(standalone)
+
+
+class FakeTransmission(ThreadingHTTPServer):
+    """Keep-alive HTTP server that behaves like the Transmission RPC endpoint"""
+
+    daemon_threads = True
+
+    def __init__(self, drop_idle: bool = False) -> None:
+        """
+        Args:
+            drop_idle (bool): Close every connection after answering, without
+                telling the client, like a daemon dropping idle connections
+        """
+        self.drop_idle = drop_idle
+        self.connections = 0
+        self.handshakes = 0
+        self.requests: list[dict[str, Any]] = []
+        super().__init__(("127.0.0.1", 0), FakeHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/transmission"
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeTransmission
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self) -> None:
+        self.server.handshakes += 1
+        self._send(409, b"")
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("X-Transmission-Session-Id") != "session-1":
+            self._send(409, b"")
+            return
+        payload = json.loads(body)
+        self.server.requests.append(payload)
+        arguments = payload["arguments"]
+        if payload["method"] == "torrent-get":
+            ids = arguments.get("ids", [1])
+            response: dict[str, Any] = {"torrents": [{"id": i, "name": f"torrent {i}"} for i in ids]}
+        elif arguments.get("filename") == "http://example.com/duplicate.torrent":
+            response = {"torrent-duplicate": {"id": 2, "name": "dup"}}
+        else:
+            response = {"torrent-added": {"id": 1, "name": "added", "hashString": "abc"}}
+        self._send(200, json.dumps({"result": "success", "arguments": response}).encode())
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("X-Transmission-Session-Id", "session-1")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.drop_idle:
+            self.close_connection = True
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def serve(server: FakeTransmission) -> Generator[FakeTransmission, None, None]:
+    """Run a fake daemon for the duration of a test"""
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def daemon() -> Generator[FakeTransmission, None, None]:
+    yield from serve(FakeTransmission())
+
+
+@pytest.fixture
+def dropping_daemon() -> Generator[FakeTransmission, None, None]:
+    yield from serve(FakeTransmission(drop_idle=True))
+
+
+class TestStandaloneClient:
+    """Test cases for the standalone TransmissionClient"""
+
+    def test_connection_is_kept_alive(self, daemon: FakeTransmission) -> None:
+        """Test that the handshake and later requests share one connection"""
+        with standalone.TransmissionClient(base_url=daemon.url) as client:
+            for _ in range(3):
+                client.get_torrents()
+
+        assert daemon.connections == 1
+        assert len(daemon.requests) == 3
+
+    def test_reconnects_after_idle_close(self, dropping_daemon: FakeTransmission) -> None:
+        """Test that a connection the daemon closed while idle is replaced once"""
+        with standalone.TransmissionClient(base_url=dropping_daemon.url) as client:
+            assert client.get_torrents() == [{"id": 1, "name": "torrent 1"}]
+            assert client.get_torrents(ids="abc") == [{"id": "abc", "name": "torrent abc"}]
+
+        # One connection for the handshake, then one per request
+        assert dropping_daemon.connections == 3
+        assert len(dropping_daemon.requests) == 2
+
+    def test_fresh_connection_failure_is_raised(self) -> None:
+        """Test that a failure on a new connection is not retried"""
+        server = FakeTransmission()
+        url = server.url
+        server.server_close()
+
+        with pytest.raises(ConnectionRefusedError):
+            standalone.TransmissionClient(base_url=url)
+
+    def test_read_timeout(self) -> None:
+        """Test that a daemon accepting the connection but never answering fails after the read timeout"""
+        with socket.create_server(("127.0.0.1", 0)) as listener:
+            url = f"http://127.0.0.1:{listener.getsockname()[1]}/transmission"
+            started = time.monotonic()
+            with pytest.raises(TimeoutError):
+                standalone.TransmissionClient(base_url=url, connect_timeout=5, read_timeout=0.2)
+
+        assert time.monotonic() - started < 2
+
+
+class TestSessionCache:
+    """Test cases for the standalone session id cache"""
+
+    def test_shares_layout_with_package(self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test ids cached by the script are found by the package and the other way around"""
+        from transmission_pusher.session_cache import SessionIdCache
+
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        url = "http://nas:9091/transmission/rpc"
+
+        standalone.store_session_id(url, "alice", "id-1")
+        assert SessionIdCache().load(url, "alice") == "id-1"
+        SessionIdCache().store(url, "alice", "id-2")
+        assert standalone.load_cached_session_id(url, "alice") == "id-2"
+        assert standalone.load_cached_session_id(url, "bob") is None
+
+    def test_shared_directory_ignored(self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test a cache directory other users can access is not read"""
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        standalone.store_session_id("http://nas/rpc", None, "id")
+        os.chmod(tmp_path / "transmission-pusher", 0o755)
+
+        assert standalone.load_cached_session_id("http://nas/rpc", None) is None
+
+    def test_without_user_ids(self, tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test the cache works on platforms without os.getuid, like Windows"""
+        monkeypatch.delattr(os, "getuid")
+        monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+        monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+        standalone.store_session_id("http://nas/rpc", None, "id")
+        assert standalone.load_cached_session_id("http://nas/rpc", None) == "id"
+        assert os.listdir(tmp_path) == ["transmission-pusher"]
+
+    def test_cached_id_skips_handshake(self, daemon: FakeTransmission, tmp_path: Any, monkeypatch: Any) -> None:
+        """Test a client with a cached id sends its first request without a handshake"""
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        with standalone.TransmissionClient(base_url=daemon.url, session_cache=True) as client:
+            client.get_torrents()
+        with standalone.TransmissionClient(base_url=daemon.url, session_cache=True) as client:
+            assert client.session_id == "session-1"
+            client.get_torrents()
+
+        assert daemon.handshakes == 1
+
+
+class TestBatch:
+    """Test cases for run_job and run_batch"""
+
+    def test_run_job(self, daemon: FakeTransmission, tmp_path: Any) -> None:
+        """Test every job action and its result"""
+        torrent = tmp_path / "a.torrent"
+        torrent.write_bytes(b"d4:infod4:name1:aee")
+
+        with standalone.TransmissionClient(base_url=daemon.url) as client:
+            added = standalone.run_job(
+                client, {"action": "add-file", "path": str(torrent), "options": {"paused": True}}
+            )
+            duplicate = standalone.run_job(client, {"action": "add-url", "url": "http://example.com/duplicate.torrent"})
+            listed = standalone.run_job(client, {"action": "list", "ids": [3]})
+            with pytest.raises(ValueError):
+                standalone.run_job(client, {"action": "remove"})
+
+        assert added == {"ok": True, "status": "added", "result": {"id": 1, "name": "added", "hashString": "abc"}}
+        assert daemon.requests[0]["arguments"]["paused"] is True
+        assert duplicate == {"ok": True, "status": "duplicate", "result": {"id": 2, "name": "dup"}}
+        assert listed == {"ok": True, "result": [{"id": 3, "name": "torrent 3"}]}
+
+    def test_run_batch(self, daemon: FakeTransmission) -> None:
+        """Test that every job gets one result line carrying its line number and id"""
+        lines = [
+            json.dumps({"id": "a", "action": "add-url", "url": "http://example.com/a.torrent"}),
+            "",
+            "not json",
+            json.dumps({"action": "list", "ids": "abc"}),
+            json.dumps({"id": "b", "action": "add-file", "path": "/non/existent.torrent"}),
+        ]
+        output = io.StringIO()
+
+        with standalone.TransmissionClient(base_url=daemon.url) as client:
+            status = standalone.run_batch(client, (line + "\n" for line in lines), output, jobs=3)
+
+        results = {entry["line"]: entry for entry in map(json.loads, output.getvalue().splitlines())}
+        assert status == 1
+        assert sorted(results) == [1, 3, 4, 5]
+        assert results[1]["ok"] and results[1]["id"] == "a" and results[1]["status"] == "added"
+        assert not results[3]["ok"]
+        assert results[4]["result"] == [{"id": "abc", "name": "torrent abc"}]
+        assert not results[5]["ok"] and results[5]["id"] == "b"
+        # The workers beyond the first use clones with their own connections
+        assert daemon.connections <= 3
+
+    def test_run_batch_malformed_jobs(self, daemon: FakeTransmission) -> None:
+        """Test that jobs missing their path or url get a clear error without reaching the daemon"""
+        lines = [
+            json.dumps({"id": "a", "action": "add-url"}),
+            json.dumps({"id": "b", "action": "add-file", "options": {"paused": True}}),
+            json.dumps({"id": "c", "action": "add-url", "url": 5}),
+        ]
+        output = io.StringIO()
+
+        with standalone.TransmissionClient(base_url=daemon.url) as client:
+            status = standalone.run_batch(client, lines, output)
+
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert status == 1
+        assert results == [
+            {"line": 1, "id": "a", "ok": False, "error": "job is missing 'url'"},
+            {"line": 2, "id": "b", "ok": False, "error": "job is missing 'path'"},
+            {"line": 3, "id": "c", "ok": False, "error": "job 'url' must be a string"},
+        ]
+        assert daemon.requests == []
+
+    def test_run_batch_reads_ahead_boundedly(self) -> None:
+        """Test that lines are only read as fast as jobs finish"""
+        release = threading.Event()
+        read = []
+
+        class SlowClient:
+            def clone(self) -> "SlowClient":
+                return self
+
+            def close(self) -> None:
+                pass
+
+            def add_torrent_url(self, url: str, options: Any) -> dict[str, Any]:
+                assert release.wait(5)
+                return {"result": "success", "arguments": {"torrent-added": {"id": 1}}}
+
+        def lines() -> Iterator[str]:
+            for number in range(50):
+                read.append(number)
+                yield json.dumps({"action": "add-url", "url": f"http://example.com/{number}.torrent"})
+
+        output = io.StringIO()
+        thread = threading.Thread(target=standalone.run_batch, args=(SlowClient(), lines(), output, 2))
+        thread.start()
+        try:
+            time.sleep(0.2)
+            # 2 jobs running, 2 queued, and the line waiting for a slot
+            assert len(read) == 5
+        finally:
+            release.set()
+            thread.join(5)
+
+        assert len(output.getvalue().splitlines()) == 50
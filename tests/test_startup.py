@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the command line tools' startup cost
+"""
+
+import subprocess
+import sys
+
+# Cumulative import time of the CLI module, in microseconds. Measured at about
+# 40 ms; the budget leaves room for slow CI machines and bytecode compilation.
+IMPORT_BUDGET_US = 150_000
+
+# Modules only some code paths need; importing them up front costs every run
+DEFERRED_MODULES = ("requests", "urllib3", "dotenv", "sqlite3", "asyncio", "http.server")
+
+
+def import_times(*args: str) -> dict[str, int]:
+    """
+    Run Python with -X importtime
+
+    Args:
+        *args: Arguments after -X importtime
+
+    Returns:
+        dict: Cumulative import time in microseconds by module name
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], capture_output=True, text=True, timeout=60, check=False
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup:
+    """Test cases for cold-start imports"""
+
+    def test_package_import_is_lazy(self) -> None:
+        """Test importing the package imports none of its submodules"""
+        times = import_times("-c", "import transmission_pusher")
+        assert "transmission_pusher" in times
+        assert not [name for name in times if name.startswith("transmission_pusher.")]
+
+    def test_package_exports(self) -> None:
+        """Test the public names still resolve"""
+        import transmission_pusher
+        from transmission_pusher.transmission_client import TransmissionClient
+
+        assert transmission_pusher.TransmissionClient is TransmissionClient
+        assert "AsyncTransmissionClient" in dir(transmission_pusher)
+        assert not hasattr(transmission_pusher, "NoSuchName")
+
+    def test_help_skips_heavy_imports(self) -> None:
+        """Test --help doesn't import HTTP, .env or database libraries"""
+        # Run as __main__, so the module itself doesn't show up in the list
+        times = import_times("-m", "transmission_pusher.transmission_client", "--help")
+        assert "transmission_pusher.log" in times
+        assert not [name for name in DEFERRED_MODULES if name in times]
+
+    def test_import_budget(self) -> None:
+        """Test the CLI module imports within its time budget"""
+        times = import_times("-c", "import transmission_pusher.transmission_client")
+        assert times["transmission_pusher.transmission_client"] < IMPORT_BUDGET_US
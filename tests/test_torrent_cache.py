@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for TorrentStateCache class
+"""
+
+from typing import Any
+from unittest.mock import Mock, patch
+
+from transmission_pusher.torrent_cache import TorrentStateCache
+
+
+class TestTorrentStateCache:
+    """Test cases for TorrentStateCache class"""
+
+    def test_first_refresh_is_full_sync(self) -> None:
+        """Test that the first refresh requests every torrent"""
+        torrent_get = Mock(return_value={"torrents": [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]})
+        cache = TorrentStateCache(torrent_get, ["id", "name"])
+
+        torrents = cache.refresh()
+
+        assert [t["name"] for t in torrents] == ["A", "B"]
+        torrent_get.assert_called_once_with({"fields": ["id", "name"]})
+
+    def test_refresh_applies_deltas(self) -> None:
+        """Test that later refreshes merge recently-active torrents and drop removed ids"""
+        responses: list[dict[str, Any]] = [
+            {"torrents": [{"id": 1, "percentDone": 0.1}, {"id": 2, "percentDone": 0.2}, {"id": 3, "percentDone": 1.0}]},
+            {"torrents": [{"id": 1, "percentDone": 0.5}, {"id": 4, "percentDone": 0.0}], "removed": [3]},
+        ]
+        torrent_get = Mock(side_effect=responses)
+        cache = TorrentStateCache(torrent_get, ["id", "percentDone"])
+
+        cache.refresh()
+        torrents = cache.refresh()
+
+        assert {t["id"]: t["percentDone"] for t in torrents} == {1: 0.5, 2: 0.2, 4: 0.0}
+        assert torrent_get.call_args_list[1][0][0] == {"fields": ["id", "percentDone"], "ids": "recently-active"}
+
+    def test_stale_cache_does_full_sync(self) -> None:
+        """Test that a refresh after the recently-active window downloads the full list again"""
+        responses: list[dict[str, Any]] = [
+            {"torrents": [{"id": 1}, {"id": 2}]},
+            {"torrents": [], "removed": []},
+            {"torrents": [{"id": 2}]},
+        ]
+        torrent_get = Mock(side_effect=responses)
+        cache = TorrentStateCache(torrent_get, ["id"], max_delta_age=60.0)
+
+        with patch("transmission_pusher.torrent_cache.time.monotonic", side_effect=[1000.0, 1059.0, 1119.0]):
+            cache.refresh()
+            cache.refresh()
+            torrents = cache.refresh()
+
+        # Torrent 1 was removed while nobody was asking; only a full sync notices
+        assert torrents == [{"id": 2}]
+        assert [call[0][0].get("ids") for call in torrent_get.call_args_list] == [None, "recently-active", None]
+
+    def test_id_field_is_always_requested(self) -> None:
+        """Test that the id field is added when missing"""
+        cache = TorrentStateCache(Mock(return_value={"torrents": []}), ["name"])
+
+        assert cache.fields == ["id", "name"]
+
+    def test_invalidate_forces_full_sync(self) -> None:
+        """Test that invalidate drops the cache and triggers a full sync"""
+        torrent_get = Mock(return_value={"torrents": [{"id": 1}]})
+        cache = TorrentStateCache(torrent_get, ["id"])
+
+        cache.refresh()
+        cache.invalidate()
+
+        assert cache.torrents == []
+        cache.refresh()
+        assert all("ids" not in call[0][0] for call in torrent_get.call_args_list)
+
+    def test_ignores_malformed_torrents(self) -> None:
+        """Test that entries without an id are skipped"""
+        cache = TorrentStateCache(Mock(return_value={"torrents": [{"name": "no id"}, "junk", {"id": 7}]}), ["id"])
+
+        assert cache.refresh() == [{"id": 7}]
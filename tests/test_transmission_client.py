@@ -4,15 +4,24 @@ Tests for TransmissionClient class
 """
 
 import base64
+import hashlib
+import json
 import os
 import shutil
 import tempfile
-from typing import Generator
+import threading
+import time
+from typing import Any, Generator
 from unittest.mock import Mock, patch
 
 import pytest
+import requests
 
-from transmission_pusher.transmission_client import TransmissionClient
+from transmission_pusher.limiter import AdaptiveLimiter
+from transmission_pusher.metrics import ADD_OUTCOMES, RPC_DURATION, RPC_REQUESTS, RPC_RESPONSE_BYTES, RPC_RETRIES
+from transmission_pusher.retry import DeadlineExceeded, RetryPolicy
+from transmission_pusher.session_cache import SessionIdCache
+from transmission_pusher.transmission_client import MetainfoBody, TransmissionClient, add_outcome, run_ordered
 
 
 class TestTransmissionClient:
@@ -52,39 +61,59 @@ class TestTransmissionClient:
             TransmissionClient(username="test_user", password="test_pass")
             assert mock_session.auth == ("test_user", "test_pass")
 
-    def test_get_session_id_success(self, client: TransmissionClient, mock_session: Mock) -> None:
-        """Test successful session ID retrieval"""
-        mock_response = Mock()
-        mock_response.status_code = 409
-        mock_response.headers = {"X-Transmission-Session-Id": "test-session-id"}
-        mock_session.get.return_value = mock_response
+    def test_init_is_lazy(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that constructing a client makes no request"""
+        mock_session.get.assert_not_called()
+        mock_session.post.assert_not_called()
+
+    def test_post_renews_session_id_on_409(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that a 409 stores the new session id and retries the request once"""
+        conflict = Mock()
+        conflict.status_code = 409
+        conflict.headers = {"X-Transmission-Session-Id": "rotated-id"}
+        success = Mock()
+        success.status_code = 200
+        success.json.return_value = {"arguments": {"torrents": []}}
+        mock_session.post.side_effect = [conflict, success]
 
-        client._get_session_id()
+        torrents = client.get_torrents()
 
-        assert mock_session.headers["X-Transmission-Session-Id"] == "test-session-id"
-        # The method is called twice: once in __init__ and once in _get_session_id
-        assert mock_session.get.call_count == 2
-        assert mock_session.get.call_args_list[0][0][0] == client.base_url
-        assert mock_session.get.call_args_list[1][0][0] == client.base_url
+        assert torrents == []
+        assert mock_session.post.call_count == 2
+        assert mock_session.headers["X-Transmission-Session-Id"] == "rotated-id"
+        mock_session.get.assert_not_called()
 
-    def test_get_session_id_no_session_id(self, client: TransmissionClient, mock_session: Mock) -> None:
-        """Test session ID retrieval when no session ID is returned"""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_session.get.return_value = mock_response
+    def test_post_retries_only_once(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that a second 409 is surfaced instead of retried forever"""
+        conflict = Mock()
+        conflict.status_code = 409
+        conflict.headers = {"X-Transmission-Session-Id": "rotated-id"}
+        conflict.raise_for_status.side_effect = requests.exceptions.HTTPError("409 Conflict")
+        mock_session.post.return_value = conflict
 
-        client._get_session_id()
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get_torrents()
 
-        # Should not update headers if no session ID
-        assert "X-Transmission-Session-Id" not in mock_session.headers
+        assert mock_session.post.call_count == 2
 
-    def test_get_session_id_connection_error(self, client: TransmissionClient, mock_session: Mock) -> None:
-        """Test session ID retrieval with connection error"""
-        mock_session.get.side_effect = Exception("Connection failed")
+    def test_session_cache(self, mock_session: Mock, tmp_path: str) -> None:
+        """Test a cached session id is used from the start and renewed ids are cached"""
+        cache = SessionIdCache(str(tmp_path))
+        cache.store("http://localhost:9091/transmission/rpc", "user", "cached-id")
+        with patch("transmission_pusher.transmission_client.requests.Session", return_value=mock_session):
+            client = TransmissionClient(username="user", password="pass", session_cache=cache)
+        assert mock_session.headers["X-Transmission-Session-Id"] == "cached-id"
 
-        with pytest.raises(Exception, match="Connection failed"):
-            client._get_session_id()
+        conflict = Mock()
+        conflict.status_code = 409
+        conflict.headers = {"X-Transmission-Session-Id": "rotated-id"}
+        success = Mock()
+        success.status_code = 200
+        success.json.return_value = {"arguments": {"torrents": []}}
+        mock_session.post.side_effect = [conflict, success]
+
+        assert client.get_torrents() == []
+        assert cache.load(client.base_url, "user") == "rotated-id"
 
     def test_add_torrent_file_success(self, client: TransmissionClient, mock_session: Mock) -> None:
         """Test successful torrent file addition"""
@@ -101,6 +130,7 @@ class TestTransmissionClient:
                 "arguments": {"torrent-added": {"id": 1, "name": "Test Torrent", "hashString": "abc123"}},
             }
             mock_session.post.return_value = mock_response
+            mock_session.headers["X-Transmission-Session-Id"] = "session-id"
 
             result = client.add_torrent_file(torrent_file)
 
@@ -110,11 +140,238 @@ class TestTransmissionClient:
             # Verify the request data
             call_args = mock_session.post.call_args
             assert call_args[0][0] == client.base_url
-            assert "metainfo" in call_args[1]["json"]["arguments"]
+            assert "metainfo" in json.loads(b"".join(call_args[1]["data"]))["arguments"]
+
+        finally:
+            os.unlink(torrent_file)
+
+    def test_add_torrent_file_retry_restreams_body(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that a 409 after an id rotation sends the complete body again"""
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            f.write(b"d8:announce35:http://example.com/announce4:info...")
+            torrent_file = f.name
+
+        mock_session.headers["X-Transmission-Session-Id"] = "old-id"
+        bodies = []
+
+        def respond(url: str, data: MetainfoBody, headers: dict, **kwargs: object) -> Mock:
+            bodies.append(b"".join(data))
+            mock_response = Mock()
+            mock_response.status_code = 409 if len(bodies) == 1 else 200
+            mock_response.headers = {"X-Transmission-Session-Id": "new-id"}
+            mock_response.json.return_value = {"result": "success", "arguments": {}}
+            return mock_response
+
+        mock_session.post.side_effect = respond
+
+        try:
+            client.add_torrent_file(torrent_file)
+        finally:
+            os.unlink(torrent_file)
+
+        assert len(bodies) == 2
+        assert bodies[0] == bodies[1]
+
+    def test_add_torrent_file_handshakes_before_streaming(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that a cold client gets its session id before streaming the body, so it is sent once"""
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            f.write(b"d8:announce35:http://example.com/announce4:info...")
+            torrent_file = f.name
+
+        methods = []
+
+        def respond(url: str, **kwargs: Any) -> Mock:
+            mock_response = Mock()
+            mock_response.headers = {"X-Transmission-Session-Id": "new-id"}
+            mock_response.json.return_value = {"result": "success", "arguments": {}}
+            if "json" in kwargs:
+                methods.append(kwargs["json"]["method"])
+            else:
+                methods.append(json.loads(b"".join(kwargs["data"]))["method"])
+            known = mock_session.headers.get("X-Transmission-Session-Id") == "new-id"
+            mock_response.status_code = 200 if known else 409
+            return mock_response
+
+        mock_session.post.side_effect = respond
+
+        try:
+            client.add_torrent_file(torrent_file)
+            client.add_torrent_file(torrent_file)
+        finally:
+            os.unlink(torrent_file)
+
+        assert methods == ["session-get", "torrent-add", "torrent-add"]
+
+    def test_add_torrent_file_skips_known_hash(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that a torrent whose infohash is known is not uploaded"""
+        info = b"d4:name4:test12:piece lengthi16384e6:pieces0:e"
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            f.write(b"d4:info" + info + b"e")
+            torrent_file = f.name
 
+        torrent_hash = hashlib.sha1(info).hexdigest()
+        try:
+            result = client.add_torrent_file(torrent_file, known_hashes={torrent_hash})
         finally:
             os.unlink(torrent_file)
 
+        assert add_outcome(result) == "skipped"
+        assert result["arguments"]["torrent-duplicate"]["hashString"] == torrent_hash
+        mock_session.post.assert_not_called()
+
+    def test_add_torrent_file_records_added_hash(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that added torrents join the known hashes, so repeats are skipped"""
+        info = b"d4:name4:test12:piece lengthi16384e6:pieces0:e"
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            f.write(b"d4:info" + info + b"e")
+            torrent_file = f.name
+
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"result": "success", "arguments": {"torrent-added": {"id": 1}}}
+        mock_session.post.return_value = mock_response
+        mock_session.headers["X-Transmission-Session-Id"] = "session-id"
+
+        known: set[str] = set()
+        try:
+            first = client.add_torrent_file(torrent_file, known_hashes=known)
+            second = client.add_torrent_file(torrent_file, known_hashes=known)
+        finally:
+            os.unlink(torrent_file)
+
+        assert add_outcome(first) == "added"
+        assert add_outcome(second) == "skipped"
+        assert known == {hashlib.sha1(info).hexdigest()}
+        mock_session.post.assert_called_once()
+
+    def test_add_outcome(self) -> None:
+        """Test classification of torrent-add results"""
+        assert add_outcome({"result": "success", "arguments": {"torrent-added": {}}}) == "added"
+        assert add_outcome({"result": "success", "arguments": {"torrent-duplicate": {}}}) == "duplicate"
+        assert add_outcome({"result": "invalid or corrupt torrent file", "arguments": {}}) == "error"
+
+    def test_known_hashes(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that known hashes are fetched with the hashString field only"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"arguments": {"torrents": [{"id": 1, "hashString": "ABC"}]}}
+        mock_session.post.return_value = mock_response
+
+        assert client.known_hashes() == {"abc"}
+        assert mock_session.post.call_args[1]["json"]["arguments"]["fields"] == ["hashString"]
+
+    def test_free_space_and_stats(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test free-space defaults to the daemon's download folder"""
+        answers = {
+            "session-get": {"download-dir": "/downloads"},
+            "free-space": {"path": "/downloads", "size-bytes": 4096},
+            "session-stats": {"activeTorrentCount": 3, "torrentCount": 7},
+        }
+
+        def post(url: str, json: dict, **kwargs: object) -> Mock:
+            response = Mock(status_code=200)
+            response.json.return_value = {"result": "success", "arguments": answers[json["method"]]}
+            return response
+
+        mock_session.post.side_effect = post
+
+        assert client.free_space() == 4096
+        assert mock_session.post.call_args[1]["json"]["arguments"] == {"path": "/downloads"}
+        assert client.session_stats()["activeTorrentCount"] == 3
+
+        mock_session.post.side_effect = None
+        mock_session.post.return_value = Mock(status_code=200)
+        mock_session.post.return_value.json.return_value = {"result": "directory not found"}
+        with pytest.raises(RuntimeError):
+            client.free_space("/missing")
+
+    def test_limiter_feedback(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that RPCs hold a limiter slot and report 5xx answers and connection errors as overload"""
+        client.limiter = Mock(spec=AdaptiveLimiter)
+        client.limiter.acquire.return_value = 1.0
+        ok_response = Mock(status_code=200)
+        ok_response.json.return_value = {"arguments": {"torrents": []}}
+        mock_session.post.return_value = ok_response
+
+        client.get_torrents()
+        client.limiter.release.assert_called_once_with(1.0, ok=True)
+
+        mock_session.post.return_value = Mock(status_code=503)
+        mock_session.post.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("503")
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get_torrents()
+        client.limiter.release.assert_called_with(1.0, ok=False)
+
+        mock_session.post.side_effect = requests.exceptions.ConnectionError("reset")
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.get_torrents()
+        assert client.limiter.release.call_count == 3
+        client.limiter.release.assert_called_with(1.0, ok=False)
+
+    def test_retry_policy(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that a daemon restart mid-call is retried instead of failing the call"""
+        client.retry = RetryPolicy(sleep=lambda seconds: None)
+        ok_response = Mock(status_code=200)
+        ok_response.json.return_value = {"arguments": {"torrents": [{"id": 1}]}}
+        mock_session.post.side_effect = [requests.exceptions.ConnectionError("reset"), ok_response]
+
+        assert client.get_torrents() == [{"id": 1}]
+        assert mock_session.post.call_count == 2
+
+    def test_timeouts_and_deadline(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that every request carries timeouts, clipped to the call's deadline"""
+        ok_response = Mock(status_code=200)
+        ok_response.json.return_value = {"arguments": {"torrents": []}}
+        mock_session.post.return_value = ok_response
+
+        client.get_torrents()
+        assert mock_session.post.call_args[1]["timeout"] == (10.0, 60.0)
+
+        client.deadline = 5.0
+        client.get_torrents()
+        connect, read = mock_session.post.call_args[1]["timeout"]
+        assert 4.0 < connect <= 5.0 and 4.0 < read <= 5.0
+
+        client.deadline = 0.0
+        with pytest.raises(DeadlineExceeded):
+            client.get_torrents()
+
+    def test_deadline_covers_limiter_wait(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that time queued behind the limiter counts against the deadline"""
+        client.limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+        client.deadline = 0.05
+        held = client.limiter.acquire()
+
+        with pytest.raises(DeadlineExceeded):
+            client.get_torrents()
+
+        mock_session.post.assert_not_called()
+        assert held is not None and client.limiter.in_flight == 1
+
+    def test_metrics(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that RPCs record latency, status, bytes, retries and outcomes"""
+        before = {
+            "duration": RPC_DURATION.count(method="torrent-add"),
+            "ok": RPC_REQUESTS.value(method="torrent-add", status="200"),
+            "error": RPC_REQUESTS.value(method="torrent-add", status="error"),
+            "bytes": RPC_RESPONSE_BYTES.value(method="torrent-add"),
+            "retries": RPC_RETRIES.value(method="torrent-add"),
+            "added": ADD_OUTCOMES.value(outcome="added"),
+        }
+        ok_response = Mock(status_code=200, content=b'{"result": "success"}')
+        ok_response.json.return_value = {"result": "success", "arguments": {"torrent-added": {}}}
+        mock_session.post.side_effect = [requests.exceptions.ConnectionError("reset"), ok_response]
+        client.retry = RetryPolicy(sleep=lambda seconds: None)
+
+        client.add_torrent_url("https://example.com/test.torrent")
+
+        assert RPC_DURATION.count(method="torrent-add") == before["duration"] + 2
+        assert RPC_REQUESTS.value(method="torrent-add", status="200") == before["ok"] + 1
+        assert RPC_REQUESTS.value(method="torrent-add", status="error") == before["error"] + 1
+        assert RPC_RESPONSE_BYTES.value(method="torrent-add") == before["bytes"] + len(ok_response.content)
+        assert RPC_RETRIES.value(method="torrent-add") == before["retries"] + 1
+        assert ADD_OUTCOMES.value(outcome="added") == before["added"] + 1
+
     def test_add_torrent_file_file_not_found(self, client: TransmissionClient) -> None:
         """Test torrent file addition with non-existent file"""
         with pytest.raises(FileNotFoundError):
@@ -160,6 +417,20 @@ class TestTransmissionClient:
         assert call_args[0][0] == client.base_url
         assert call_args[1]["json"]["arguments"]["filename"] == "https://example.com/test.torrent"
 
+    def test_add_torrent_metainfo(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test adding a torrent from .torrent file contents"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"result": "success", "arguments": {"torrent-added": {"id": 4}}}
+        mock_session.post.return_value = mock_response
+
+        result = client.add_torrent_metainfo(b"d4:infod4:name1:xee")
+
+        assert result["arguments"]["torrent-added"]["id"] == 4
+        sent = mock_session.post.call_args[1]["json"]
+        assert sent["method"] == "torrent-add"
+        assert base64.b64decode(sent["arguments"]["metainfo"]) == b"d4:infod4:name1:xee"
+
     def test_add_torrent_url_api_error(self, client: TransmissionClient, mock_session: Mock) -> None:
         """Test torrent URL addition with API error"""
         mock_response = Mock()
@@ -202,6 +473,164 @@ class TestTransmissionClient:
 
         assert len(torrents) == 0
 
+    def test_get_torrents_fields(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that only the requested fields are asked for"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"arguments": {"torrents": [{"id": 1, "totalSize": 1024}]}}
+        mock_session.post.return_value = mock_response
+
+        torrents = client.get_torrents(fields=["id", "totalSize"])
+
+        assert torrents == [{"id": 1, "totalSize": 1024}]
+        assert mock_session.post.call_args[1]["json"]["arguments"]["fields"] == ["id", "totalSize"]
+
+    def test_get_torrents_invalid_fields(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that invalid field names fail before any request is made"""
+        with pytest.raises(ValueError):
+            client.get_torrents(fields=["id", "notAField"])
+
+        mock_session.post.assert_not_called()
+
+    def test_get_torrents_by_ids(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that ids and hashes are passed to torrent-get"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"arguments": {"torrents": [{"id": 3}, {"id": 7}]}}
+        mock_session.post.return_value = mock_response
+
+        torrents = client.get_torrents(ids=[3, "abc123"])
+
+        assert torrents == [{"id": 3}, {"id": 7}]
+        assert mock_session.post.call_args[1]["json"]["arguments"]["ids"] == [3, "abc123"]
+
+    def test_get_torrents_by_single_hash(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that a single hash string is sent whole, not split into characters"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"arguments": {"torrents": [{"id": 3}]}}
+        mock_session.post.return_value = mock_response
+
+        client.get_torrents(ids="abc123")
+
+        assert mock_session.post.call_args[1]["json"]["arguments"]["ids"] == ["abc123"]
+
+    def test_get_torrents_by_ids_chunked(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that long id lists are split across several requests"""
+
+        def respond(url: str, json: dict, **kwargs: object) -> Mock:
+            mock_response = Mock()
+            mock_response.status_code = 200
+            mock_response.json.return_value = {"arguments": {"torrents": [{"id": i} for i in json["arguments"]["ids"]]}}
+            return mock_response
+
+        mock_session.post.side_effect = respond
+
+        with patch("transmission_pusher.transmission_client.ID_CHUNK_SIZE", 4):
+            torrents = client.get_torrents(ids=range(10))
+
+        assert [t["id"] for t in torrents] == list(range(10))
+        sent = [call[1]["json"]["arguments"]["ids"] for call in mock_session.post.call_args_list]
+        assert sent == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+    def test_get_torrents_empty_ids(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that an empty id list makes no request"""
+        assert client.get_torrents(ids=[]) == []
+        mock_session.post.assert_not_called()
+
+    def test_iter_torrents_pages_by_id(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that iter_torrents fetches ids first and then one page per chunk"""
+
+        def respond(url: str, json: dict, **kwargs: object) -> Mock:
+            arguments = json["arguments"]
+            mock_response = Mock()
+            mock_response.status_code = 200
+            if "ids" in arguments:
+                torrents = [{"id": i, "name": f"Torrent {i}"} for i in arguments["ids"] if i != 4]
+            else:
+                torrents = [{"id": i} for i in range(1, 6)]
+            mock_response.json.return_value = {"arguments": {"torrents": torrents}}
+            return mock_response
+
+        mock_session.post.side_effect = respond
+
+        iterator = client.iter_torrents(fields=["id", "name"], chunk_size=2)
+        mock_session.post.assert_not_called()
+        torrents = list(iterator)
+
+        # Torrent 4 was removed between the id listing and its page
+        assert [t["name"] for t in torrents] == ["Torrent 1", "Torrent 2", "Torrent 3", "Torrent 5"]
+        sent = [call[1]["json"]["arguments"] for call in mock_session.post.call_args_list]
+        assert sent[0]["fields"] == ["id"]
+        assert [page["ids"] for page in sent[1:]] == [[1, 2], [3, 4], [5]]
+
+    def test_iter_torrents_validates_eagerly(self, client: TransmissionClient) -> None:
+        """Test that invalid arguments fail when iter_torrents is called, not when iterated"""
+        with pytest.raises(ValueError):
+            client.iter_torrents(chunk_size=0)
+        with pytest.raises(ValueError):
+            client.iter_torrents(fields="bogus")
+
+    def test_get_torrents_table_format(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that table-format results are decoded into dicts"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "arguments": {"torrents": [["id", "name"], [1, "Test Torrent 1"], [2, "Test Torrent 2"]]}
+        }
+        mock_session.post.return_value = mock_response
+
+        torrents = client.get_torrents(fields=["id", "name"])
+        client.get_torrents(fields=["id", "name"])
+
+        assert torrents == [{"id": 1, "name": "Test Torrent 1"}, {"id": 2, "name": "Test Torrent 2"}]
+        assert all(call[1]["json"]["arguments"]["format"] == "table" for call in mock_session.post.call_args_list)
+
+    def test_get_torrents_table_format_fallback(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that daemons answering with objects are no longer asked for tables"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"arguments": {"torrents": [{"id": 1}]}}
+        mock_session.post.return_value = mock_response
+
+        assert client.get_torrents(fields=["id"]) == [{"id": 1}]
+        assert client.get_torrents(fields=["id"]) == [{"id": 1}]
+
+        assert client.table_format is False
+        first, second = (call[1]["json"]["arguments"] for call in mock_session.post.call_args_list)
+        assert first["format"] == "table"
+        assert "format" not in second
+
+    def test_get_torrents_table_format_disabled(self, mock_session: Mock) -> None:
+        """Test that table_format=False never requests the table format"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"arguments": {"torrents": []}}
+        mock_session.post.return_value = mock_response
+
+        with patch("transmission_pusher.transmission_client.requests.Session", return_value=mock_session):
+            client = TransmissionClient(table_format=False)
+        client.get_torrents()
+
+        assert "format" not in mock_session.post.call_args[1]["json"]["arguments"]
+
+    def test_get_torrents_cached(self, client: TransmissionClient, mock_session: Mock) -> None:
+        """Test that cached polling only requests recently-active torrents after the first call"""
+        full = Mock()
+        full.status_code = 200
+        full.json.return_value = {"arguments": {"torrents": [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]}}
+        delta = Mock()
+        delta.status_code = 200
+        delta.json.return_value = {"arguments": {"torrents": [{"id": 2, "name": "B2"}], "removed": [1]}}
+        mock_session.post.side_effect = [full, delta]
+
+        client.get_torrents(cached=True)
+        torrents = client.get_torrents(cached=True)
+
+        assert torrents == [{"id": 2, "name": "B2"}]
+        assert "ids" not in mock_session.post.call_args_list[0][1]["json"]["arguments"]
+        assert mock_session.post.call_args_list[1][1]["json"]["arguments"]["ids"] == "recently-active"
+
     def test_get_torrents_connection_error(self, client: TransmissionClient, mock_session: Mock) -> None:
         """Test torrent list retrieval with connection error"""
         mock_session.post.side_effect = Exception("Connection failed")
@@ -244,8 +673,84 @@ class TestTransmissionClientIntegration:
 
             # Verify the request was made with base64 encoded data
             call_args = mock_session.post.call_args
-            request_data = call_args[1]["json"]["arguments"]["metainfo"]
+            request_data = json.loads(b"".join(call_args[1]["data"]))["arguments"]["metainfo"]
 
             # Decode and verify
             decoded_data = base64.b64decode(request_data)
             assert decoded_data == torrent_content
+
+
+class TestRunOrdered:
+    """Test cases for the bounded ordered worker pool"""
+
+    def test_preserves_input_order(self) -> None:
+        """Test that results come back in input order regardless of completion order"""
+
+        def slow_square(value: int) -> int:
+            time.sleep(0.001 * (10 - value))
+            return value * value
+
+        results = list(run_ordered(slow_square, range(10), jobs=4))
+
+        assert [item for item, _, _ in results] == list(range(10))
+        assert [result for _, result, _ in results] == [value * value for value in range(10)]
+        assert all(error is None for _, _, error in results)
+
+    def test_captures_errors_per_item(self) -> None:
+        """Test that an exception only affects its own item"""
+
+        def fail_on_two(value: int) -> int:
+            if value == 2:
+                raise ValueError("boom")
+            return value
+
+        results = list(run_ordered(fail_on_two, range(4), jobs=2))
+
+        assert results[2][1] is None
+        assert isinstance(results[2][2], ValueError)
+        assert [result for _, result, _ in results if result is not None] == [0, 1, 3]
+
+    def test_bounds_in_flight_work(self) -> None:
+        """Test that no more than jobs workers run at the same time"""
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def track(value: int) -> int:
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.005)
+            with lock:
+                active -= 1
+            return value
+
+        list(run_ordered(track, range(20), jobs=3))
+
+        assert peak <= 3
+
+
+class TestMetainfoBody:
+    """Test cases for the streaming torrent-add request body"""
+
+    @pytest.mark.parametrize("size", [0, 1, 2, 3, MetainfoBody.CHUNK_SIZE - 1, MetainfoBody.CHUNK_SIZE * 2 + 1])
+    def test_body_matches_json_encoding(self, size: int) -> None:
+        """Test that the streamed body is the JSON request with the file base64 encoded"""
+        content = bytes(i % 251 for i in range(size))
+        with tempfile.NamedTemporaryFile(suffix=".torrent", delete=False) as f:
+            f.write(content)
+            torrent_file = f.name
+
+        try:
+            body = MetainfoBody(torrent_file)
+            chunks = list(body)
+        finally:
+            os.unlink(torrent_file)
+
+        encoded = b"".join(chunks)
+        assert len(body) == len(encoded)
+        request = json.loads(encoded)
+        assert request["method"] == "torrent-add"
+        assert base64.b64decode(request["arguments"]["metainfo"]) == content
+        assert max(len(chunk) for chunk in chunks) <= 4 * MetainfoBody.CHUNK_SIZE // 3
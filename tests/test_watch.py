@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Tests for folder watchers
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Generator
+
+import pytest
+
+from transmission_pusher.watch import FolderWatcher, InotifyWatcher, PollingWatcher, create_watcher
+
+
+def collect(watcher: FolderWatcher, count: int, timeout: float = 5.0) -> list[str]:
+    """Iterate a watcher in a thread until count paths arrive or timeout expires"""
+    found: list[str] = []
+    done = threading.Event()
+
+    def run() -> None:
+        for path in watcher:
+            found.append(path)
+            if len(found) >= count:
+                break
+        done.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    finished = done.wait(timeout)
+    watcher.close()
+    thread.join(timeout)
+    assert finished, f"Expected {count} files, got {found}"
+    return found
+
+
+def inotify_available() -> bool:
+    try:
+        watcher = InotifyWatcher(tempfile.gettempdir())
+    except OSError:
+        return False
+    watcher.close()
+    return True
+
+
+class TestWatchers:
+    """Test cases for folder watchers"""
+
+    @pytest.fixture
+    def temp_dir(self) -> Generator[str, None, None]:
+        """Create a temporary directory for testing"""
+        temp_dir = tempfile.mkdtemp()
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    def _write_later(self, temp_dir: str, names: list[str], delay: float = 0.1) -> None:
+        def write() -> None:
+            time.sleep(delay)
+            for name in names:
+                with open(os.path.join(temp_dir, name), "wb") as f:
+                    f.write(b"d4:infode")
+
+        threading.Thread(target=write, daemon=True).start()
+
+    def test_polling_watcher_reports_new_torrents(self, temp_dir: str) -> None:
+        """Test that the polling watcher reports new .torrent files only"""
+        with open(os.path.join(temp_dir, "existing.torrent"), "wb") as f:
+            f.write(b"d4:infode")
+        watcher = PollingWatcher(temp_dir, settle=0.05, interval=0.05)
+
+        self._write_later(temp_dir, ["notes.txt", "new.torrent"])
+        found = collect(watcher, 1)
+
+        assert found == [os.path.join(temp_dir, "new.torrent")]
+
+    @pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+    def test_inotify_watcher_reports_closed_files(self, temp_dir: str) -> None:
+        """Test that the inotify watcher reports .torrent files once written"""
+        watcher = InotifyWatcher(temp_dir, settle=0.01)
+
+        self._write_later(temp_dir, ["a.torrent", "b.txt", "c.TORRENT"])
+        found = collect(watcher, 2)
+
+        assert sorted(found) == [os.path.join(temp_dir, "a.torrent"), os.path.join(temp_dir, "c.TORRENT")]
+
+    @pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+    def test_inotify_watcher_reports_moved_files(self, temp_dir: str) -> None:
+        """Test that files moved into the folder are reported"""
+        staging = os.path.join(temp_dir, "staging")
+        watched = os.path.join(temp_dir, "watched")
+        os.mkdir(staging)
+        os.mkdir(watched)
+        with open(os.path.join(staging, "moved.torrent"), "wb") as f:
+            f.write(b"d4:infode")
+        watcher = InotifyWatcher(watched, settle=0.01)
+
+        def move() -> None:
+            time.sleep(0.1)
+            os.rename(os.path.join(staging, "moved.torrent"), os.path.join(watched, "moved.torrent"))
+
+        threading.Thread(target=move, daemon=True).start()
+        found = collect(watcher, 1)
+
+        assert found == [os.path.join(watched, "moved.torrent")]
+
+    @pytest.mark.skipif(not inotify_available(), reason="inotify not available")
+    def test_inotify_watcher_close_wakes_idle_iteration(self, temp_dir: str) -> None:
+        """Test that close() ends an iteration blocked on an idle folder"""
+        watcher = InotifyWatcher(temp_dir)
+        finished = threading.Event()
+
+        def run() -> None:
+            list(watcher)
+            finished.set()
+
+        threading.Thread(target=run, daemon=True).start()
+        time.sleep(0.05)
+        watcher.close()
+
+        assert finished.wait(2)
+
+    def test_create_watcher(self, temp_dir: str) -> None:
+        """Test that create_watcher returns a usable watcher"""
+        watcher = create_watcher(temp_dir)
+        try:
+            assert watcher.kind in ("inotify", "polling")
+        finally:
+            watcher.close()